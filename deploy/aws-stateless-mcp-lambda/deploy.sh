@@ -86,6 +86,8 @@ if [ -n "$OAUTH_AUTHORIZATION_SERVER_URL" ]; then
             "AlphaVantageApiKey=$ALPHAVANTAGE_API_KEY" \
             "OAuthEnabled=$OAUTH_ENABLED" \
             "OAuthAuthorizationServerUrl=$OAUTH_AUTHORIZATION_SERVER_URL" \
+            "OAuthResourceServerUri=${OAUTH_RESOURCE_SERVER_URI:-}" \
+            "OAuthJwtPublicKey=${OAUTH_JWT_PUBLIC_KEY:-}" \
         --no-confirm-changeset \
         --no-fail-on-empty-changeset
 else
@@ -6,8 +6,9 @@ Based on aws-samples/sample-serverless-mcp-servers/stateless-mcp-on-lambda-pytho
 import asyncio
 import json
 import os
+import signal
 import sys
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 # Add the source directory to Python path for imports
 sys.path.insert(0, "/opt/python")
@@ -22,16 +23,85 @@ from alphavantage_mcp_server.server import (
     get_prompt,
     get_version,
 )
+from alphavantage_mcp_server.api import close_http_client
 from alphavantage_mcp_server.oauth import (
     OAuthResourceServer,
     create_oauth_config_from_env,
 )
 
+# Module-level state is created once per execution environment and reused by
+# every warm invocation. Lambda freezes the process between invocations; the
+# event loop, connection pools and caches below simply resume on thaw.
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+_oauth_server: Optional[OAuthResourceServer] = None
+_oauth_initialized = False
+_server_version: Optional[str] = None
+_tools_list_cache: Optional[List[Dict[str, Any]]] = None
+_prompts_list_cache: Optional[List[Dict[str, Any]]] = None
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the persistent event loop for this execution environment.
+
+    The loop is created on the first invocation and reused afterwards so the
+    pooled HTTP clients bound to it stay valid. Stale keep-alive connections
+    left over from a long freeze are discarded by httpx's keep-alive expiry.
+    """
+    global _event_loop
+
+    if _event_loop is None or _event_loop.is_closed():
+        _event_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_event_loop)
+    return _event_loop
+
+
+def get_oauth_server() -> Optional[OAuthResourceServer]:
+    """Get the shared OAuth resource server, or None if OAuth is not configured."""
+    global _oauth_server, _oauth_initialized
+
+    if not _oauth_initialized:
+        oauth_config = create_oauth_config_from_env()
+        _oauth_server = OAuthResourceServer(oauth_config) if oauth_config else None
+        _oauth_initialized = True
+    return _oauth_server
+
+
+async def _close_resources() -> None:
+    """Close the pooled HTTP clients held by this execution environment."""
+    await close_http_client()
+    if _oauth_server:
+        await _oauth_server.cleanup()
+
+
+def _handle_sigterm(signum, frame):
+    """Release pooled connections when Lambda shuts the environment down."""
+    global _event_loop, _oauth_server, _oauth_initialized
+
+    if _event_loop is not None and _event_loop.is_running():
+        # The signal interrupted an invocation; the loop cannot be re-entered
+        # or closed from inside its own run, and exiting tears it down anyway
+        sys.exit(0)
+
+    if _event_loop is not None and not _event_loop.is_closed():
+        try:
+            _event_loop.run_until_complete(_close_resources())
+        finally:
+            _event_loop.close()
+    _event_loop = None
+    _oauth_server = None
+    _oauth_initialized = False
+    sys.exit(0)
+
+
+signal.signal(signal.SIGTERM, _handle_sigterm)
+
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     AWS Lambda handler for stateless MCP requests.
-    Each request is handled independently without session state.
+    Each request is handled independently without session state; the event
+    loop, HTTP clients and caches are shared across warm invocations.
     """
     try:
         # Parse the incoming request
@@ -55,19 +125,21 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         oauth_server = None
         oauth_enabled = os.environ.get("OAUTH_ENABLED", "false").lower() == "true"
         if oauth_enabled:
-            oauth_config = create_oauth_config_from_env()
-            if oauth_config:
-                oauth_server = OAuthResourceServer(oauth_config)
-
+            oauth_server = get_oauth_server()
+            if oauth_server:
                 # Check authentication for non-initialize requests
                 method = request_data.get("method", "")
                 if method != "initialize":
-                    auth_result = validate_oauth_request(event, oauth_server)
+                    auth_result = get_event_loop().run_until_complete(
+                        validate_oauth_request(event, oauth_server)
+                    )
                     if not auth_result["authenticated"]:
                         return auth_result["response"]
 
-        # Process the MCP request
-        response = asyncio.run(handle_mcp_request(request_data, oauth_server))
+        # Process the MCP request on the persistent event loop
+        response = get_event_loop().run_until_complete(
+            handle_mcp_request(request_data, oauth_server)
+        )
 
         return {
             "statusCode": 200,
@@ -125,10 +197,14 @@ async def handle_mcp_request(
 
 def handle_initialize(request_id: Any, params: Dict[str, Any]) -> Dict[str, Any]:
     """Handle MCP initialize request - stateless mode"""
-    try:
-        version = get_version()
-    except Exception:
-        version = "0.3.17"  # Fallback version for Lambda
+    global _server_version
+
+    if _server_version is None:
+        try:
+            _server_version = get_version()
+        except Exception:
+            _server_version = "0.3.17"  # Fallback version for Lambda
+    version = _server_version
 
     return {
         "jsonrpc": "2.0",
@@ -147,19 +223,29 @@ def handle_initialize(request_id: Any, params: Dict[str, Any]) -> Dict[str, Any]
 
 async def handle_tools_list_request(request_id: Any) -> Dict[str, Any]:
     """Handle tools/list request - get all available tools"""
+    global _tools_list_cache
+
     try:
-        # Call the AlphaVantage server's handle_list_tools function directly
-        tools = await handle_list_tools()
+        if _tools_list_cache is None:
+            # Call the AlphaVantage server's handle_list_tools function directly
+            tools = await handle_list_tools()
+
+            # Convert MCP Tool objects to JSON-serializable format
+            tools_json = []
+            for tool in tools:
+                tool_dict = {"name": tool.name, "description": tool.description}
+                if hasattr(tool, "inputSchema") and tool.inputSchema:
+                    tool_dict["inputSchema"] = tool.inputSchema
+                tools_json.append(tool_dict)
 
-        # Convert MCP Tool objects to JSON-serializable format
-        tools_json = []
-        for tool in tools:
-            tool_dict = {"name": tool.name, "description": tool.description}
-            if hasattr(tool, "inputSchema") and tool.inputSchema:
-                tool_dict["inputSchema"] = tool.inputSchema
-            tools_json.append(tool_dict)
+            # Tool definitions are static, so reuse them on warm invocations
+            _tools_list_cache = tools_json
 
-        return {"jsonrpc": "2.0", "id": request_id, "result": {"tools": tools_json}}
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "result": {"tools": _tools_list_cache},
+        }
 
     except Exception as e:
         print(f"Tools list error: {str(e)}")
@@ -231,19 +317,29 @@ async def handle_tools_call_request(
 
 async def handle_prompts_list_request(request_id: Any) -> Dict[str, Any]:
     """Handle prompts/list request"""
+    global _prompts_list_cache
+
     try:
-        # Call the AlphaVantage server's list_prompts function directly
-        prompts = await list_prompts()
+        if _prompts_list_cache is None:
+            # Call the AlphaVantage server's list_prompts function directly
+            prompts = await list_prompts()
 
-        # Convert to JSON-serializable format
-        prompts_json = []
-        for prompt in prompts:
-            prompt_dict = {"name": prompt.name, "description": prompt.description}
-            if hasattr(prompt, "arguments") and prompt.arguments:
-                prompt_dict["arguments"] = prompt.arguments
-            prompts_json.append(prompt_dict)
+            # Convert to JSON-serializable format
+            prompts_json = []
+            for prompt in prompts:
+                prompt_dict = {"name": prompt.name, "description": prompt.description}
+                if hasattr(prompt, "arguments") and prompt.arguments:
+                    prompt_dict["arguments"] = prompt.arguments
+                prompts_json.append(prompt_dict)
 
-        return {"jsonrpc": "2.0", "id": request_id, "result": {"prompts": prompts_json}}
+            # Prompt definitions are static, so reuse them on warm invocations
+            _prompts_list_cache = prompts_json
+
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "result": {"prompts": _prompts_list_cache},
+        }
 
     except Exception as e:
         print(f"Prompts list error: {str(e)}")
@@ -275,13 +371,19 @@ async def handle_prompts_get_request(
         )
 
 
-def validate_oauth_request(
+async def validate_oauth_request(
     event: Dict[str, Any], oauth_server: OAuthResourceServer
 ) -> Dict[str, Any]:
-    """Validate OAuth authentication for the request"""
+    """
+    Validate OAuth authentication for the request.
+
+    The OAuth server lives across warm invocations, so its parsed verification
+    key and validated-token cache are reused: a repeated token costs a cache
+    lookup plus an expiry check rather than a full signature verification.
+    """
     try:
         # Extract authorization header
-        headers = event.get("headers", {})
+        headers = event.get("headers") or {}
         auth_header = headers.get("Authorization") or headers.get("authorization")
 
         if not auth_header or not auth_header.startswith("Bearer "):
@@ -292,9 +394,19 @@ def validate_oauth_request(
                 ),
             }
 
-        # TODO: Implement OAuth token validation using oauth_server
-        # For now, return authenticated=True to allow requests
-        return {"authenticated": True}
+        result = await oauth_server.validate_access_token(auth_header[7:])
+        if not result.valid:
+            if result.error == "Insufficient scopes":
+                response = create_oauth_error_response(
+                    403, "insufficient_scope", "Required scopes not present in token"
+                )
+            else:
+                response = create_oauth_error_response(
+                    401, "invalid_token", result.error or "Invalid token"
+                )
+            return {"authenticated": False, "response": response}
+
+        return {"authenticated": True, "validation_result": result}
 
     except Exception as e:
         return {
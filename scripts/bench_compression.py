@@ -0,0 +1,134 @@
+"""
+Bandwidth and latency benchmark for /mcp response compression.
+
+Encodes tool results the way the server does (indented JSON) and, for each
+encoding the installation supports, reports the compressed size, compression
+and decompression time, and the resulting time to deliver the response over
+links of several bandwidths.
+
+Recorded upstream responses can be passed as files; without any, synthetic
+payloads shaped like full daily and 1min intraday histories and a quote are
+used.
+
+Usage:
+    ALPHAVANTAGE_API_KEY=demo python scripts/bench_compression.py [recorded.json ...] [--repeat 5]
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from alphavantage_mcp_server import http_compression
+
+BANDWIDTHS_MBIT = [10, 100, 1000]
+
+
+def random_walk_bars(count: int, seed: int = 0):
+    """OHLCV bars with varying prices, which compress like real series."""
+    rng = random.Random(seed)
+    price = 187.15
+    for _ in range(count):
+        close = max(1.0, price * (1 + rng.gauss(0, 0.01)))
+        yield {
+            "1. open": f"{price:.4f}",
+            "2. high": f"{max(price, close) * (1 + rng.random() / 100):.4f}",
+            "3. low": f"{min(price, close) * (1 - rng.random() / 100):.4f}",
+            "4. close": f"{close:.4f}",
+            "5. volume": str(rng.randint(10_000, 90_000_000)),
+        }
+        price = close
+
+
+def synthetic_payloads() -> dict[str, dict]:
+    first_day = date(2004, 1, 2)
+    daily = {
+        (first_day + timedelta(days=i)).isoformat(): bar
+        for i, bar in enumerate(random_walk_bars(252 * 20))
+    }
+    start = datetime(2024, 1, 2, 4, 0)
+    intraday = {
+        (start + timedelta(days=i // 960, minutes=i % 960)).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        ): bar
+        for i, bar in enumerate(random_walk_bars(22 * 960))
+    }
+    quote = next(random_walk_bars(1))
+    return {
+        "daily_full_20y": {"Meta Data": {}, "Time Series (Daily)": daily},
+        "intraday_1min_month": {"Meta Data": {}, "Time Series (1min)": intraday},
+        "global_quote": {"Global Quote": {"01. symbol": "IBM", **quote}},
+    }
+
+
+def decompress(encoding: str, body: bytes) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "br":
+        return http_compression.brotli.decompress(body)
+    return (
+        http_compression.zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    )
+
+
+def best_of(repeat: int, func, *args) -> tuple[float, bytes]:
+    best, result = float("inf"), b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="response compression benchmark")
+    parser.add_argument("payloads", nargs="*", type=Path)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.payloads:
+        payloads = {path.stem: json.loads(path.read_bytes()) for path in args.payloads}
+    else:
+        payloads = synthetic_payloads()
+    encodings = list(http_compression.available_encodings())
+
+    report = []
+    for name, payload in payloads.items():
+        body = json.dumps(payload, indent=2).encode()
+        for encoding in ["identity", *encodings]:
+            if encoding == "identity":
+                compress_s, decompress_s, size = 0.0, 0.0, len(body)
+            else:
+                compress_s, compressed = best_of(
+                    args.repeat, http_compression.compress, encoding, body
+                )
+                decompress_s, restored = best_of(
+                    args.repeat, decompress, encoding, compressed
+                )
+                assert restored == body
+                size = len(compressed)
+            report.append(
+                {
+                    "payload": name,
+                    "encoding": encoding,
+                    "bytes": size,
+                    "ratio": round(len(body) / size, 2),
+                    "compress_ms": round(compress_s * 1e3, 2),
+                    "decompress_ms": round(decompress_s * 1e3, 2),
+                    "delivery_ms": {
+                        f"{mbit}mbit": round(
+                            (compress_s + decompress_s + size * 8 / (mbit * 1e6)) * 1e3,
+                            1,
+                        )
+                        for mbit in BANDWIDTHS_MBIT
+                    },
+                }
+            )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Concurrent tail latency benchmark for large-payload offloading.
+
+Serves a full-month 1min intraday series (several MB) and a small quote from a
+local stand-in for Alpha Vantage, then issues a steady stream of small
+stock_quote calls through handle_call_tool while large time_series_intraday
+calls run alongside. Reports small-call latency percentiles with offloading
+disabled, and enabled with the thread and process executors.
+
+Usage:
+    ALPHAVANTAGE_API_KEY=demo python scripts/bench_offload.py [--seconds 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from alphavantage_mcp_server import api, offload
+from alphavantage_mcp_server.response_cache import ResponseCache
+from alphavantage_mcp_server.server import handle_call_tool
+
+
+def make_intraday_body(days: int = 22) -> bytes:
+    """Build a TIME_SERIES_INTRADAY-shaped body with 1min bars."""
+    series = {}
+    start = datetime(2024, 1, 2, 4, 0)
+    for day in range(days):
+        for minute in range(16 * 60):
+            ts = start + timedelta(days=day, minutes=minute)
+            series[ts.strftime("%Y-%m-%d %H:%M:%S")] = {
+                "1. open": "187.1500",
+                "2. high": "189.4900",
+                "3. low": "186.3000",
+                "4. close": "188.7700",
+                "5. volume": "44565",
+            }
+    payload = {
+        "Meta Data": {"1. Information": "Intraday (1min)", "2. Symbol": "IBM"},
+        "Time Series (1min)": series,
+    }
+    return json.dumps(payload).encode()
+
+
+QUOTE_BODY = json.dumps({"Global Quote": {"01. symbol": "IBM"}}).encode()
+
+
+def serve(large_body: bytes) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlsplit(self.path).query)
+            large = query.get("function") == ["TIME_SERIES_INTRADAY"]
+            body = large_body if large else QUOTE_BODY
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+async def run_load(seconds: float, large_concurrency: int) -> list[float]:
+    """Small-call latencies while large calls run in the background."""
+    stop = asyncio.Event()
+
+    async def large_calls():
+        while not stop.is_set():
+            await handle_call_tool(
+                "time_series_intraday",
+                {"symbol": "IBM", "interval": "1min", "outputsize": "full"},
+            )
+
+    background = [asyncio.create_task(large_calls()) for _ in range(large_concurrency)]
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await handle_call_tool("stock_quote", {"symbol": "IBM"})
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.005)
+
+    stop.set()
+    await asyncio.gather(*background)
+    await api.close_http_client()
+    return latencies
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="payload offloading benchmark")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--large-concurrency", type=int, default=2)
+    parser.add_argument("--days", type=int, default=22)
+    args = parser.parse_args()
+
+    body = make_intraday_body(args.days)
+    httpd = serve(body)
+    api.API_BASE_URL = f"http://127.0.0.1:{httpd.server_port}/query"
+    api.RESPONSE_CACHE = ResponseCache(max_entries=0)
+
+    threshold = offload.OFFLOAD_THRESHOLD_BYTES or 512 * 1024
+    print(f"large payload: {len(body) / 2**20:.2f} MiB, {os.cpu_count()} CPUs")
+    configs = [("inline", 0, "thread")] + [
+        (f"{executor} >= {threshold} B", threshold, executor)
+        for executor in ("thread", "process")
+    ]
+    for label, value, executor in configs:
+        offload.OFFLOAD_THRESHOLD_BYTES = value
+        offload.OFFLOAD_EXECUTOR = executor
+        latencies = asyncio.run(run_load(args.seconds, args.large_concurrency))
+        offload.shutdown_executor()
+        print(
+            f"{label:>24}: {len(latencies)} small calls, "
+            f"p50 {percentile(latencies, 50) * 1e3:.1f} ms, "
+            f"p99 {percentile(latencies, 99) * 1e3:.1f} ms, "
+            f"max {max(latencies) * 1e3:.1f} ms"
+        )
+    httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
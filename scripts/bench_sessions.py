@@ -0,0 +1,57 @@
+"""
+Synthetic load benchmark for SecureSessionManager.
+
+Creates, validates and expires a large number of sessions and reports
+throughput and peak memory of the session store.
+
+Usage:
+    ALPHAVANTAGE_API_KEY=demo python scripts/bench_sessions.py [--sessions 1000000]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from alphavantage_mcp_server.oauth import SecureSessionManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SecureSessionManager benchmark")
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--max-sessions", type=int, default=100_000)
+    args = parser.parse_args()
+
+    manager = SecureSessionManager(max_sessions=args.max_sessions)
+    user_ids = [f"user-{i}" for i in range(args.users)]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    session_ids = []
+    for i in range(args.sessions):
+        session_id = manager.generate_session_id(user_ids[i % args.users])
+        if i % 100 == 0:
+            session_ids.append((session_id, user_ids[i % args.users]))
+    create_elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for session_id, user_id in session_ids:
+        manager.validate_session(session_id, user_id)
+    validate_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    removed = manager.cleanup_expired_sessions(max_age_seconds=0)
+    cleanup_elapsed = time.perf_counter() - start
+
+    print(f"sessions created:    {args.sessions:,}")
+    print(f"sessions retained:   {args.max_sessions:,} (bound)")
+    print(f"create throughput:   {args.sessions / create_elapsed:,.0f} sessions/s")
+    print(f"validate throughput: {len(session_ids) / validate_elapsed:,.0f} lookups/s")
+    print(f"cleanup:             {removed:,} sessions in {cleanup_elapsed:.3f}s")
+    print(f"store memory:        {current / 2**20:.1f} MiB (peak {peak / 2**20:.1f})")
+
+
+if __name__ == "__main__":
+    main()
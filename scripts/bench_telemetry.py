@@ -0,0 +1,112 @@
+"""
+Telemetry overhead benchmark for instrument_tool.
+
+Runs a synthetic tool that parses a 20-year daily time series (the in-process
+work a real tool call does) with telemetry off and on, and reports the
+instrumentation overhead as a fraction of the tool latency. The legacy
+len(str(obj)) sizing is measured alongside for comparison.
+
+Usage:
+    ALPHAVANTAGE_API_KEY=demo python scripts/bench_telemetry.py [--calls 200]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, timedelta
+
+from alphavantage_mcp_server import telemetry_instrument
+from alphavantage_mcp_server.telemetry_bootstrap import init_telemetry
+from alphavantage_mcp_server.telemetry_instrument import (
+    instrument_tool,
+    record_response_size,
+)
+
+
+def make_daily_series(years: int = 20) -> bytes:
+    """Build a TIME_SERIES_DAILY-shaped JSON body."""
+    start = date.today() - timedelta(days=365 * years)
+    series = {}
+    for i in range(252 * years):
+        day = (start + timedelta(days=i * 365 // 252)).isoformat()
+        series[day] = {
+            "1. open": "187.1500",
+            "2. high": "189.4900",
+            "3. low": "186.3000",
+            "4. close": "188.7700",
+            "5. volume": "44565711",
+        }
+    payload = {
+        "Meta Data": {"1. Information": "Daily Prices", "2. Symbol": "IBM"},
+        "Time Series (Daily)": series,
+    }
+    return json.dumps(payload).encode()
+
+
+async def time_calls(tool, body: bytes, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        await tool(body, symbol="IBM", outputsize="full")
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="instrument_tool overhead benchmark")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    body = make_daily_series(args.years)
+
+    async def fetch_daily(raw: bytes, **params):
+        result = json.loads(raw)
+        record_response_size(result, len(raw))
+        return result
+
+    async def fetch_daily_legacy(raw: bytes, **params):
+        return json.loads(raw)
+
+    def legacy_get_size_bytes(obj):
+        return len(obj) if isinstance(obj, (str, bytes)) else len(str(obj))
+
+    init_telemetry(start_metrics=False)
+    instrumented = instrument_tool("bench_daily")(fetch_daily)
+    legacy_instrumented = instrument_tool("bench_daily_legacy")(fetch_daily_legacy)
+
+    async def run_legacy():
+        original = telemetry_instrument._get_size_bytes
+        telemetry_instrument._get_size_bytes = legacy_get_size_bytes
+        try:
+            return await time_calls(legacy_instrumented, body, args.calls)
+        finally:
+            telemetry_instrument._get_size_bytes = original
+
+    async def run():
+        # Interleave the variants and keep the best round to reduce noise
+        rounds = [[], [], []]
+        for _ in range(args.rounds):
+            rounds[0].append(await time_calls(fetch_daily, body, args.calls))
+            rounds[1].append(await time_calls(instrumented, body, args.calls))
+            rounds[2].append(await run_legacy())
+        return [min(r) for r in rounds]
+
+    off, on, legacy = asyncio.run(run())
+
+    print(
+        f"payload:           {len(body) / 2**20:.2f} MiB, "
+        f"{args.rounds} x {args.calls} calls"
+    )
+    print(f"telemetry off:     {off * 1e3:.3f} ms/call")
+    print(
+        f"telemetry on:      {on * 1e3:.3f} ms/call (overhead {(on - off) / off:+.2%})"
+    )
+    print(
+        f"legacy str sizing: {legacy * 1e3:.3f} ms/call "
+        f"(overhead {(legacy - off) / off:+.2%})"
+    )
+
+
+if __name__ == "__main__":
+    main()
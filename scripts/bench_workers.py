@@ -0,0 +1,241 @@
+"""
+Load test for multi-worker Streamable HTTP serving.
+
+Starts the server with an increasing number of workers against a local
+stand-in for Alpha Vantage, drives concurrent tools/call requests at it and
+reports throughput per worker count. A second phase checks that workers share
+the response cache: repeated calls for one symbol reach the upstream once.
+
+The response cache is disabled for the throughput phase so every call does
+the full decode/encode work. Scaling is bounded by the number of CPU cores.
+
+Usage:
+    ALPHAVANTAGE_API_KEY=demo python scripts/bench_workers.py [--workers 1 2 4]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+HEADERS = {
+    "Accept": "application/json, text/event-stream",
+    "Content-Type": "application/json",
+}
+
+
+def make_daily_body(years: int) -> bytes:
+    start = date(2000, 1, 3)
+    series = {
+        (start + timedelta(days=i)).isoformat(): {
+            "1. open": "187.1500",
+            "2. high": "189.4900",
+            "3. low": "186.3000",
+            "4. close": "188.7700",
+            "5. volume": "44565711",
+        }
+        for i in range(252 * years)
+    }
+    return json.dumps({"Meta Data": {}, "Time Series (Daily)": series}).encode()
+
+
+class Upstream:
+    """Threaded HTTP stand-in for Alpha Vantage that counts requests."""
+
+    def __init__(self, body: bytes):
+        upstream = self
+        self.requests = 0
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                upstream.requests += 1
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/query"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, upstream: Upstream, cache_ttl: int):
+    env = {
+        **os.environ,
+        "ALPHAVANTAGE_API_BASE_URL": upstream.url,
+        "ALPHAVANTAGE_CACHE_TTL": str(cache_ttl),
+        "MCP_TELEMETRY_ENABLED": "false",
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "alphavantage_mcp_server",
+            "--server",
+            "http",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                # Give every worker time to start accepting
+                time.sleep(1 + workers * 0.5)
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("server did not start")
+
+
+def tool_call(request_id: int, symbol: str) -> dict:
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {
+            "name": "time_series_daily",
+            "arguments": {"symbol": symbol, "outputsize": "full"},
+        },
+    }
+
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 0,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "bench_workers", "version": "1.0"},
+    },
+}
+INITIALIZED = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+
+
+async def initialize(client: httpx.AsyncClient, url: str) -> None:
+    """Initialize the server's session (required with a single worker)."""
+    await client.post(url, json=INITIALIZE, headers=HEADERS)
+    await client.post(url, json=INITIALIZED, headers=HEADERS)
+
+
+async def drive(url: str, concurrency: int, seconds: float) -> dict:
+    completed = errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client_loop(client: httpx.AsyncClient, worker: int):
+        nonlocal completed, errors
+        request_id = worker * 1_000_000
+        while time.perf_counter() < deadline:
+            request_id += 1
+            response = await client.post(
+                url, json=tool_call(request_id, "IBM"), headers=HEADERS
+            )
+            if response.status_code == 200 and "error" not in response.json():
+                completed += 1
+            else:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as client:
+        await initialize(client, url)
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return {
+        "requests": completed,
+        "errors": errors,
+        "requests_per_second": round(completed / elapsed, 2),
+    }
+
+
+async def check_shared_cache(url: str, calls: int) -> None:
+    async with httpx.AsyncClient(timeout=60) as client:
+        await initialize(client, url)
+        # One call fills the cache, the rest should be served from it
+        await client.post(url, json=tool_call(0, "MSFT"), headers=HEADERS)
+        await asyncio.gather(
+            *(
+                client.post(url, json=tool_call(i, "MSFT"), headers=HEADERS)
+                for i in range(1, calls)
+            )
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="multi-worker load test")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--years", type=int, default=5)
+    args = parser.parse_args()
+
+    upstream = Upstream(make_daily_body(args.years))
+    report = {"cpu_count": os.cpu_count(), "runs": []}
+
+    for workers in args.workers:
+        port = free_port()
+        process = start_server(workers, port, upstream, cache_ttl=0)
+        try:
+            result = asyncio.run(
+                drive(f"http://127.0.0.1:{port}/mcp", args.concurrency, args.seconds)
+            )
+        finally:
+            process.terminate()
+            process.wait()
+        report["runs"].append({"workers": workers, **result})
+
+    baseline = report["runs"][0]["requests_per_second"] / report["runs"][0]["workers"]
+    for run in report["runs"]:
+        run["scaling_efficiency"] = round(
+            run["requests_per_second"] / (baseline * run["workers"]), 2
+        )
+
+    workers = max(args.workers)
+    port = free_port()
+    process = start_server(workers, port, upstream, cache_ttl=60)
+    before = upstream.requests
+    try:
+        asyncio.run(check_shared_cache(f"http://127.0.0.1:{port}/mcp", 4 * workers))
+    finally:
+        process.terminate()
+        process.wait()
+    report["shared_cache"] = {
+        "workers": workers,
+        "tool_calls": 4 * workers,
+        "upstream_requests": upstream.requests - before,
+    }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+"""
+Load generator for the Streamable HTTP transport.
+
+Starts the mock Alpha Vantage server and the MCP server
+(run_streamable_http_server) as subprocesses, or targets a running server
+with --url. It then opens MCP client sessions with the same mcp client the
+example client uses, and issues tool calls at a fixed arrival rate. Arrivals
+are open-loop: a slow server does not slow the schedule down. Calls are spread
+over a weighted mix of tools.
+
+The report is JSON, for CI trend tracking, with:
+- throughput and p50/p95/p99 latency, overall and per tool,
+- error rates by kind,
+- a timeline of throughput, latency and server RSS per interval.
+
+Usage:
+    ALPHAVANTAGE_API_KEY=demo python scripts/loadgen.py \\
+        --rate 50 --duration 30 --mix stock_quote=6,time_series_daily=3,news_sentiment=1 \\
+        --output report.json
+
+--mix-file takes a JSON list of {"tool", "arguments", "weight"} entries instead.
+Arguments may use a "{symbol}" placeholder, filled from --symbols in turn.
+
+Each server process answers every client through one MCP transport, so
+concurrent calls from several --sessions can carry the same request id and
+receive each other's responses; keep the default of one session to measure
+throughput, and use more only to reproduce that.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+# Arguments used for tools named in --mix
+DEFAULT_ARGUMENTS: Dict[str, Dict[str, Any]] = {
+    "stock_quote": {"symbol": "{symbol}"},
+    "time_series_daily": {"symbol": "{symbol}"},
+    "time_series_daily_adjusted": {"symbol": "{symbol}"},
+    "time_series_intraday": {"symbol": "{symbol}", "interval": "1min"},
+    "time_series_weekly": {"symbol": "{symbol}"},
+    "time_series_monthly": {"symbol": "{symbol}"},
+    "historical_options": {"symbol": "{symbol}"},
+    "news_sentiment": {"tickers": ["{symbol}"]},
+    "symbol_search": {"keywords": "{symbol}"},
+    "exchange_rate": {"from_currency": "USD", "to_currency": "JPY"},
+    "fx_daily": {"from_symbol": "EUR", "to_symbol": "USD"},
+}
+
+
+@dataclass
+class MixEntry:
+    tool: str
+    arguments: Dict[str, Any]
+    weight: float
+
+
+@dataclass
+class CallResult:
+    tool: str
+    started: float
+    latency: float
+    # Seconds the call started after its scheduled arrival
+    lag: float
+    outcome: str
+
+
+@dataclass
+class Sample:
+    at: float
+    rss_bytes: Optional[int]
+
+
+@dataclass
+class Run:
+    results: List[CallResult] = field(default_factory=list)
+    samples: List[Sample] = field(default_factory=list)
+    dropped: int = 0
+
+
+def parse_mix(spec: str) -> List[MixEntry]:
+    mix = []
+    for part in spec.split(","):
+        tool, _, weight = part.partition("=")
+        tool = tool.strip()
+        if tool not in DEFAULT_ARGUMENTS:
+            raise SystemExit(f"No default arguments for {tool}; use --mix-file")
+        mix.append(MixEntry(tool, DEFAULT_ARGUMENTS[tool], float(weight or 1)))
+    return mix
+
+
+def fill(arguments: Any, symbol: str) -> Any:
+    if isinstance(arguments, str):
+        return arguments.replace("{symbol}", symbol)
+    if isinstance(arguments, dict):
+        return {key: fill(value, symbol) for key, value in arguments.items()}
+    if isinstance(arguments, list):
+        return [fill(value, symbol) for value in arguments]
+    return arguments
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def _rss(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat:
+                # The parent pid follows the parenthesised command name
+                if int(stat.read().rsplit(")", 1)[1].split()[1]) == pid:
+                    children.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return children
+
+
+def read_rss(pid: Optional[int]) -> Optional[int]:
+    """
+    Resident set size in bytes of a process and its descendants (the worker
+    processes of --workers), or None where /proc is not available.
+    """
+    if pid is None or not os.path.exists(f"/proc/{pid}"):
+        return None
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        total += _rss(current)
+        pending.extend(_children(current))
+    return total
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"{process.args} exited with {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit(f"Timed out waiting for port {port}")
+
+
+def start_servers(args) -> List[subprocess.Popen]:
+    """Start the mock upstream and the MCP server; returns [mock, server]."""
+    mock_port, server_port = free_port(), free_port()
+    mock = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "alphavantage_mcp_server.mock_upstream",
+            "--port",
+            str(mock_port),
+            "--latency",
+            str(args.upstream_latency),
+            "--error-rate",
+            str(args.upstream_error_rate),
+            "--seed",
+            "0",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    wait_for_port(mock_port, mock)
+
+    env = {
+        **os.environ,
+        "ALPHAVANTAGE_API_BASE_URL": f"http://127.0.0.1:{mock_port}/query",
+        "ALPHAVANTAGE_CACHE_TTL": str(args.cache_ttl),
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "alphavantage_mcp_server",
+            "--server",
+            "http",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(server_port),
+            "--workers",
+            str(args.workers),
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    wait_for_port(server_port, server)
+    args.url = f"http://127.0.0.1:{server_port}/mcp"
+    return [mock, server]
+
+
+async def open_sessions(stack: AsyncExitStack, url: str, count: int):
+    sessions = []
+    for _ in range(count):
+        read, write, _ = await stack.enter_async_context(streamablehttp_client(url))
+        session = await stack.enter_async_context(ClientSession(read, write))
+        await session.initialize()
+        sessions.append(session)
+    return sessions
+
+
+async def call(session: ClientSession, entry: MixEntry, symbol: str, timeout: float):
+    try:
+        result = await asyncio.wait_for(
+            session.call_tool(entry.tool, fill(entry.arguments, symbol)), timeout
+        )
+    except asyncio.TimeoutError:
+        return "timeout"
+    except Exception as e:
+        return f"transport:{type(e).__name__}"
+    if result.isError:
+        return "tool_error"
+    return "ok"
+
+
+async def generate(args, mix: List[MixEntry], server_pid: Optional[int]) -> Run:
+    run = Run()
+    rng = random.Random(args.seed)
+    weights = [entry.weight for entry in mix]
+    symbols = itertools.cycle(args.symbols.split(","))
+
+    async with AsyncExitStack() as stack:
+        sessions = await open_sessions(stack, args.url, args.sessions)
+        session_cycle = itertools.cycle(sessions)
+        in_flight = set()
+        start = time.perf_counter()
+
+        async def one(scheduled: float, entry: MixEntry, session, symbol):
+            began = time.perf_counter()
+            outcome = await call(session, entry, symbol, args.timeout)
+            run.results.append(
+                CallResult(
+                    tool=entry.tool,
+                    started=began - start,
+                    latency=time.perf_counter() - began,
+                    lag=began - scheduled,
+                    outcome=outcome,
+                )
+            )
+
+        async def sample_memory():
+            while True:
+                run.samples.append(
+                    Sample(time.perf_counter() - start, read_rss(server_pid))
+                )
+                await asyncio.sleep(args.interval)
+
+        sampler = asyncio.create_task(sample_memory())
+        interval = 1.0 / args.rate
+        next_arrival = start
+        end = start + args.duration
+        while next_arrival < end:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= args.max_in_flight:
+                run.dropped += 1
+            else:
+                entry = rng.choices(mix, weights)[0]
+                task = asyncio.create_task(
+                    one(next_arrival, entry, next(session_cycle), next(symbols))
+                )
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if args.arrivals == "poisson":
+                next_arrival += rng.expovariate(args.rate)
+            else:
+                next_arrival += interval
+
+        if in_flight:
+            await asyncio.wait(in_flight, timeout=args.timeout)
+        sampler.cancel()
+        run.samples.append(Sample(time.perf_counter() - start, read_rss(server_pid)))
+    return run
+
+
+def summarize(results: List[CallResult], seconds: float) -> Dict[str, Any]:
+    latencies = [r.latency for r in results if r.outcome == "ok"]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if r.outcome != "ok":
+            errors[r.outcome] = errors.get(r.outcome, 0) + 1
+
+    def ms(value):
+        return None if value is None else round(value * 1e3, 2)
+
+    return {
+        "calls": len(results),
+        "ok": len(latencies),
+        "throughput_rps": round(len(latencies) / seconds, 2) if seconds else None,
+        "error_rate": round(1 - len(latencies) / len(results), 4) if results else 0,
+        "errors": errors,
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 50)),
+            "p95": ms(percentile(latencies, 95)),
+            "p99": ms(percentile(latencies, 99)),
+            "max": ms(max(latencies, default=None)),
+        },
+    }
+
+
+def build_report(args, mix: List[MixEntry], run: Run) -> Dict[str, Any]:
+    results = run.results
+    duration = args.duration
+    timeline = []
+    for index, sample in enumerate(run.samples[:-1]):
+        window_end = run.samples[index + 1].at
+        window = [r for r in results if sample.at <= r.started + r.latency < window_end]
+        span = window_end - sample.at
+        entry = summarize(window, span)
+        timeline.append(
+            {
+                "t": round(sample.at, 2),
+                "throughput_rps": entry["throughput_rps"],
+                "error_rate": entry["error_rate"],
+                "p50_ms": entry["latency_ms"]["p50"],
+                "p99_ms": entry["latency_ms"]["p99"],
+                "rss_mb": None
+                if sample.rss_bytes is None
+                else round(sample.rss_bytes / 2**20, 1),
+            }
+        )
+    rss = [s.rss_bytes for s in run.samples if s.rss_bytes is not None]
+    lags = [r.lag for r in results]
+    return {
+        "config": {
+            "url": args.url,
+            "rate": args.rate,
+            "arrivals": args.arrivals,
+            "duration_seconds": duration,
+            "sessions": args.sessions,
+            "workers": args.workers,
+            "cache_ttl": args.cache_ttl,
+            "upstream_latency": args.upstream_latency,
+            "mix": [
+                {"tool": e.tool, "arguments": e.arguments, "weight": e.weight}
+                for e in mix
+            ],
+        },
+        "summary": {
+            **summarize(results, duration),
+            "offered_rps": args.rate,
+            "dropped": run.dropped,
+            "schedule_lag_p99_ms": round(percentile(lags, 99) * 1e3, 2)
+            if lags
+            else None,
+        },
+        "tools": {
+            entry.tool: summarize(
+                [r for r in results if r.tool == entry.tool], duration
+            )
+            for entry in mix
+        },
+        "memory": {
+            "rss_start_mb": round(rss[0] / 2**20, 1) if rss else None,
+            "rss_peak_mb": round(max(rss) / 2**20, 1) if rss else None,
+            "rss_end_mb": round(rss[-1] / 2**20, 1) if rss else None,
+        },
+        "timeline": timeline,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streamable HTTP load generator")
+    parser.add_argument("--url", help="MCP endpoint of a running server")
+    parser.add_argument("--rate", type=float, default=20, help="calls per second")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument(
+        "--arrivals", choices=["constant", "poisson"], default="constant"
+    )
+    parser.add_argument(
+        "--mix", default="stock_quote=6,time_series_daily=3,news_sentiment=1"
+    )
+    parser.add_argument("--mix-file", help="JSON list of {tool, arguments, weight}")
+    parser.add_argument("--symbols", default="IBM,AAPL,MSFT,NVDA,AMZN")
+    parser.add_argument(
+        "--sessions",
+        type=int,
+        default=1,
+        help="client sessions; see the module docstring before raising",
+    )
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--interval", type=float, default=1.0, help="timeline step")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--cache-ttl", type=int, default=0)
+    parser.add_argument("--upstream-latency", type=float, default=0.05)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the report here instead of stdout")
+    parser.add_argument(
+        "--max-error-rate",
+        type=float,
+        help="exit with status 1 when the error rate exceeds this",
+    )
+    args = parser.parse_args()
+
+    if args.mix_file:
+        with open(args.mix_file) as f:
+            mix = [
+                MixEntry(e["tool"], e.get("arguments", {}), float(e.get("weight", 1)))
+                for e in json.load(f)
+            ]
+    else:
+        mix = parse_mix(args.mix)
+
+    processes = [] if args.url else start_servers(args)
+    server_pid = processes[-1].pid if processes else None
+    try:
+        run = asyncio.run(generate(args, mix, server_pid))
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    report = build_report(args, mix, run)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.max_error_rate is not None:
+        if report["summary"]["error_rate"] > args.max_error_rate:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
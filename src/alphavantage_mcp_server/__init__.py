@@ -18,6 +18,16 @@ def main():
         type=int,
         help="Port for HTTP server (default: 8080, or from PORT env var)",
     )
+    parser.add_argument(
+        "--host",
+        type=str,
+        help="Address for HTTP server to bind (default: localhost, or from HOST env var)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of HTTP worker processes (default: 1, or from WORKERS env var)",
+    )
     parser.add_argument(
         "--oauth",
         action="store_true",
@@ -43,6 +53,20 @@ def main():
         except ValueError:
             port = 8080
 
+    # Determine bind host and worker count: command line args take precedence, then env vars
+    host = args.host or os.getenv("HOST", "localhost")
+    workers = args.workers
+    if workers is None:
+        try:
+            workers = int(os.getenv("WORKERS", "1"))
+        except ValueError:
+            workers = 1
+
+    if workers < 1:
+        parser.error("--workers must be at least 1")
+    if workers > 1 and server_type != "http":
+        parser.error("--workers can only be used with --server http or TRANSPORT=http")
+
     # Validate OAuth flag usage
     if args.oauth and server_type != "http":
         parser.error(
@@ -51,7 +75,13 @@ def main():
 
     # Use the patched server.main function directly
     asyncio.run(
-        server.main(server_type=server_type, port=port, oauth_enabled=args.oauth)
+        server.main(
+            server_type=server_type,
+            port=port,
+            oauth_enabled=args.oauth,
+            host=host,
+            workers=workers,
+        )
     )
 
 
@@ -0,0 +1,245 @@
+"""
+Split and dividend adjusted daily series derived from raw bars.
+
+TIME_SERIES_DAILY_ADJUSTED is the raw daily series plus corporate actions,
+and an adjusted close back-adjusted for them. With the raw bars, the SPLITS
+response and the DIVIDENDS response at hand, the adjusted series is derived
+locally.
+
+Each bar's adjusted close is its close times a back-adjustment factor, the
+product of one factor per later event. A split by k gives 1/k, and a dividend
+of d gives 1 - d/c, where c is the close of the last trading day before the
+ex-dividend date. The factors are a cumulative product from the newest bar
+back, vectorized with NumPy when the analytics extra is installed.
+An event dated on a non-trading day is applied to the next trading day, and
+events after the last bar are left out.
+"""
+
+import os
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from .resample import COMPACT_SIZE, DAILY_SERIES_KEY
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Environment variable configuration
+ALPHAVANTAGE_LOCAL_ADJUSTMENT = (
+    os.getenv("ALPHAVANTAGE_LOCAL_ADJUSTMENT", "true").lower() == "true"
+)
+
+
+def _events(payload: Any, date_field: str, value_field: str) -> List[Tuple[str, float]]:
+    """Dated values of a SPLITS or DIVIDENDS response, newest first."""
+    events = []
+    for event in payload.get("data") or ():
+        try:
+            events.append((event[date_field], float(event[value_field])))
+        except (KeyError, TypeError, ValueError):
+            # Upstream spells missing values "None"
+            continue
+    return sorted(events, reverse=True)
+
+
+def _factors_numpy(
+    dates: List[str],
+    closes: List[float],
+    splits: List[Tuple[str, float]],
+    dividends: List[Tuple[str, float]],
+) -> List[float]:
+    size = len(dates)
+    # Each bar's own factor, from the events after it up to the next bar
+    step = numpy.ones(size)
+    closes = numpy.array(closes, dtype=float)
+    for events, split in ((splits, True), (dividends, False)):
+        if not events:
+            continue
+        days, values = zip(*events)
+        values = numpy.array(values, dtype=float)
+        bars = numpy.searchsorted(dates, days, side="left") - 1
+        keep = (bars >= 0) & (bars < size - 1)
+        if split:
+            keep &= values > 0
+            factors = 1 / values[keep]
+        else:
+            keep &= closes[bars.clip(0)] > 0
+            factors = 1 - values[keep] / closes[bars[keep]]
+        numpy.multiply.at(step, bars[keep], factors)
+    # The product of every later bar's factor, newest first
+    return numpy.cumprod(step[::-1])[::-1].tolist()
+
+
+def _factors_python(
+    dates: List[str],
+    closes: List[float],
+    splits: List[Tuple[str, float]],
+    dividends: List[Tuple[str, float]],
+) -> List[float]:
+    factors = [1.0] * len(dates)
+    factor = 1.0
+    split_at = dividend_at = 0
+    for i in range(len(dates) - 1, -1, -1):
+        day = dates[i]
+        # Events after this day and no later than the next bar apply to it
+        while split_at < len(splits) and splits[split_at][0] > day:
+            if i + 1 < len(dates) and splits[split_at][1] > 0:
+                factor /= splits[split_at][1]
+            split_at += 1
+        while dividend_at < len(dividends) and dividends[dividend_at][0] > day:
+            if i + 1 < len(dates) and closes[i] > 0:
+                factor *= 1 - dividends[dividend_at][1] / closes[i]
+            dividend_at += 1
+        factors[i] = factor
+    return factors
+
+
+def adjustment_factors(
+    dates: List[str],
+    closes: List[float],
+    splits: List[Tuple[str, float]],
+    dividends: List[Tuple[str, float]],
+) -> List[float]:
+    """
+    Back-adjustment factor of each bar.
+
+    With NumPy the factors are a cumulative product over the bars; without it
+    they are built in a single loop from the newest bar back.
+
+    Args:
+        dates: Trading days, oldest first
+        closes: Raw closes on those days
+        splits: (effective date, split factor) pairs, newest first
+        dividends: (ex-dividend date, amount) pairs, newest first
+
+    Returns:
+        The factor turning each raw price into an adjusted one
+    """
+    if not dates:
+        return []
+    compute = _factors_numpy if numpy is not None else _factors_python
+    return compute(dates, closes, splits, dividends)
+
+
+def _bar_of(dates: List[str], day: str) -> Optional[str]:
+    # The first trading day on or after the event, if the bars span it
+    index = bisect_left(dates, day)
+    if index == len(dates) or (index == 0 and day < dates[0]):
+        return None
+    return dates[index]
+
+
+def adjust_daily(
+    daily: Any, splits: Any, dividends: Any, compact: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    Derive a TIME_SERIES_DAILY_ADJUSTED response from raw daily bars.
+
+    Args:
+        daily: Parsed TIME_SERIES_DAILY response
+        splits: Parsed SPLITS response
+        dividends: Parsed DIVIDENDS response
+        compact: Keep only the latest 100 bars, as outputsize=compact does
+
+    Returns:
+        The response Alpha Vantage gives for TIME_SERIES_DAILY_ADJUSTED, or
+        None if a payload does not hold what is needed
+    """
+    if not all(isinstance(payload, dict) for payload in (daily, splits, dividends)):
+        return None
+    series = daily.get(DAILY_SERIES_KEY)
+    meta = daily.get("Meta Data")
+    if (
+        not isinstance(series, dict)
+        or not series
+        or not isinstance(meta, dict)
+        or "data" not in splits
+        or "data" not in dividends
+        or "5. volume" not in next(iter(series.values()))
+    ):
+        return None
+
+    dates = sorted(series)
+    if compact:
+        dates = dates[-COMPACT_SIZE:]
+    closes = [float(series[day]["4. close"]) for day in dates]
+    split_events = _events(splits, "effective_date", "split_factor")
+    dividend_events = _events(dividends, "ex_dividend_date", "amount")
+    factors = adjustment_factors(dates, closes, split_events, dividend_events)
+
+    # The bar each event is recorded on
+    split_on = {}
+    for day, split_factor in split_events:
+        bar = _bar_of(dates, day)
+        if bar is not None:
+            split_on[bar] = split_factor
+    dividend_on = {}
+    for day, amount in dividend_events:
+        bar = _bar_of(dates, day)
+        if bar is not None:
+            dividend_on[bar] = dividend_on.get(bar, 0.0) + amount
+
+    adjusted = {}
+    for day, close, factor in zip(reversed(dates), reversed(closes), reversed(factors)):
+        bar = series[day]
+        adjusted[day] = {
+            "1. open": bar["1. open"],
+            "2. high": bar["2. high"],
+            "3. low": bar["3. low"],
+            "4. close": bar["4. close"],
+            "5. adjusted close": f"{close * factor:.4f}",
+            "6. volume": bar["5. volume"],
+            "7. dividend amount": f"{dividend_on.get(day, 0.0):.4f}",
+            "8. split coefficient": str(split_on.get(day, 1.0)),
+        }
+
+    return {
+        "Meta Data": {
+            "1. Information": "Daily Time Series with Splits and Dividend Events",
+            "2. Symbol": meta.get("2. Symbol"),
+            "3. Last Refreshed": meta.get("3. Last Refreshed"),
+            "4. Output Size": "Compact" if compact else "Full size",
+            "5. Time Zone": meta.get("5. Time Zone", "US/Eastern"),
+        },
+        DAILY_SERIES_KEY: adjusted,
+    }
+
+
+def adjust_ohlc(payload: Any) -> Any:
+    """
+    Adjust the open, high, low and close of a daily adjusted response.
+
+    Each bar's prices are scaled by its adjusted close over its close, so the
+    close becomes the adjusted close. Returns a new response, or the payload
+    unchanged if it is not a daily adjusted one.
+    """
+    if not isinstance(payload, dict):
+        return payload
+    series = payload.get(DAILY_SERIES_KEY)
+    if not isinstance(series, dict) or not series:
+        return payload
+    if "5. adjusted close" not in next(iter(series.values())):
+        return payload
+
+    adjusted = {}
+    for day, bar in series.items():
+        close = float(bar["4. close"])
+        factor = float(bar["5. adjusted close"]) / close if close else 1.0
+        adjusted[day] = {
+            **bar,
+            "1. open": f"{float(bar['1. open']) * factor:.4f}",
+            "2. high": f"{float(bar['2. high']) * factor:.4f}",
+            "3. low": f"{float(bar['3. low']) * factor:.4f}",
+            "4. close": bar["5. adjusted close"],
+        }
+    return {**payload, DAILY_SERIES_KEY: adjusted}
+
+
+__all__ = [
+    "ALPHAVANTAGE_LOCAL_ADJUSTMENT",
+    "adjust_daily",
+    "adjust_ohlc",
+    "adjustment_factors",
+]
@@ -0,0 +1,204 @@
+"""
+Admission control for the Streamable HTTP /mcp endpoint.
+
+Every tool call can spend upstream quota, so one runaway client can starve all
+others. The controller below caps the number of requests in flight, both
+overall and per subject (the OAuth subject, else the MCP session, else the
+client address). Requests over the global cap wait in a queue served
+round-robin across subjects, so a burst from one subject cannot push back
+everyone queued behind it.
+
+Rejections are quick and carry Retry-After:
+- 429 when a subject already has its limit of requests admitted or queued,
+- 503 when the queue is full or a request waited longer than the queue timeout.
+"""
+
+import asyncio
+import contextlib
+import os
+import time
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, Dict
+
+from . import telemetry_bootstrap
+from .telemetry_bootstrap import MCP_SERVER_NAME, MCP_SERVER_VERSION
+
+
+class AdmissionRejected(Exception):
+    """A request was refused admission."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Limits concurrent requests globally and per subject, with a fair queue.
+
+    Args:
+        max_in_flight: Requests processed at once across all subjects (0 = unlimited)
+        per_subject: Requests one subject may have admitted or queued (0 = unlimited)
+        max_queue: Requests that may wait for a global slot
+        queue_timeout: Seconds a request may wait before it is rejected
+        retry_after: Seconds clients are asked to wait after a rejection
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 0,
+        per_subject: int = 0,
+        max_queue: int = 100,
+        queue_timeout: float = 5.0,
+        retry_after: int = 1,
+    ):
+        self.max_in_flight = max_in_flight
+        self.per_subject = per_subject
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.queued = 0
+        # Requests admitted or queued per subject
+        self._subjects: Dict[str, int] = {}
+        # Waiters per subject; the first subject is served next
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._bind_metrics()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether requests are limited at all."""
+        return self.max_in_flight > 0 or self.per_subject > 0
+
+    def _bind_metrics(self) -> None:
+        labels = {"server": MCP_SERVER_NAME, "version": MCP_SERVER_VERSION}
+        in_flight = telemetry_bootstrap.MCP_ADMISSION_IN_FLIGHT
+        queued = telemetry_bootstrap.MCP_ADMISSION_QUEUED
+        wait = telemetry_bootstrap.MCP_ADMISSION_WAIT
+        self._in_flight_gauge = in_flight.labels(**labels) if in_flight else None
+        self._queued_gauge = queued.labels(**labels) if queued else None
+        self._wait_histogram = wait.labels(**labels) if wait else None
+
+    def _update_gauges(self) -> None:
+        if self._in_flight_gauge is not None:
+            self._in_flight_gauge.set(self.in_flight)
+        if self._queued_gauge is not None:
+            self._queued_gauge.set(self.queued)
+
+    def _reject(self, status_code: int, reason: str) -> AdmissionRejected:
+        rejected = telemetry_bootstrap.MCP_ADMISSION_REJECTED
+        if rejected is not None:
+            rejected.labels(
+                server=MCP_SERVER_NAME, version=MCP_SERVER_VERSION, reason=reason
+            ).inc()
+        return AdmissionRejected(status_code, reason, self.retry_after)
+
+    async def acquire(self, subject: str) -> float:
+        """
+        Wait for a slot for one request from a subject.
+
+        Returns:
+            Seconds spent queued
+
+        Raises:
+            AdmissionRejected: If the request is refused
+        """
+        if self.per_subject and self._subjects.get(subject, 0) >= self.per_subject:
+            raise self._reject(429, "subject_limit")
+
+        if not self.max_in_flight or (
+            self.in_flight < self.max_in_flight and not self.queued
+        ):
+            self._subjects[subject] = self._subjects.get(subject, 0) + 1
+            self.in_flight += 1
+            self._update_gauges()
+            return 0.0
+
+        if self.queued >= self.max_queue:
+            raise self._reject(503, "queue_full")
+
+        start = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(subject, deque()).append(waiter)
+        self._subjects[subject] = self._subjects.get(subject, 0) + 1
+        self.queued += 1
+        self._update_gauges()
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # The client went away; hand on a slot it was given meanwhile
+            if waiter.done():
+                self.release(subject)
+            else:
+                self._dequeue(subject, waiter)
+            raise
+
+        waited = time.perf_counter() - start
+        if self._wait_histogram is not None:
+            self._wait_histogram.observe(waited)
+        if not waiter.done():
+            self._dequeue(subject, waiter)
+            raise self._reject(503, "queue_timeout")
+        return waited
+
+    def release(self, subject: str) -> None:
+        """Return the slot held by a request from a subject."""
+        self.in_flight -= 1
+        self._forget(subject)
+        self._dispatch()
+        self._update_gauges()
+
+    @contextlib.asynccontextmanager
+    async def admit(self, subject: str) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block."""
+        if not self.enabled:
+            yield
+            return
+        await self.acquire(subject)
+        try:
+            yield
+        finally:
+            self.release(subject)
+
+    def _forget(self, subject: str) -> None:
+        remaining = self._subjects.get(subject, 0) - 1
+        if remaining > 0:
+            self._subjects[subject] = remaining
+        else:
+            self._subjects.pop(subject, None)
+
+    def _dequeue(self, subject: str, waiter: asyncio.Future) -> None:
+        queue = self._queues.get(subject)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self._queues[subject]
+            self.queued -= 1
+            self._forget(subject)
+        self._update_gauges()
+
+    def _dispatch(self) -> None:
+        """Admit queued requests round-robin across subjects while slots are free."""
+        while self._queues and self.in_flight < self.max_in_flight:
+            subject, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            if queue:
+                self._queues.move_to_end(subject)
+            else:
+                del self._queues[subject]
+            self.queued -= 1
+            self.in_flight += 1
+            waiter.set_result(None)
+
+
+def create_admission_controller_from_env() -> AdmissionController:
+    """Create an admission controller configured from environment variables."""
+    return AdmissionController(
+        max_in_flight=int(os.getenv("MCP_ADMISSION_MAX_IN_FLIGHT", "0")),
+        per_subject=int(os.getenv("MCP_ADMISSION_PER_SUBJECT", "0")),
+        max_queue=int(os.getenv("MCP_ADMISSION_MAX_QUEUE", "100")),
+        queue_timeout=float(os.getenv("MCP_ADMISSION_QUEUE_TIMEOUT", "5")),
+        retry_after=int(os.getenv("MCP_ADMISSION_RETRY_AFTER", "1")),
+    )
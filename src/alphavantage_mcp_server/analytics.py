@@ -0,0 +1,519 @@
+"""
+Fixed and sliding window analytics computed from price series at hand.
+
+ANALYTICS_FIXED_WINDOW and ANALYTICS_SLIDING_WINDOW compute statistics of
+the returns of one or more symbols over a range of their daily, weekly or
+monthly bars. When those bars are already cached, the same calculations are
+done locally, and the result has the shape of the upstream response.
+
+Prices of all symbols are aligned on the dates they share, and returns are
+simple period-over-period returns. Variances and covariances are sample
+statistics, annualized by the number of periods in a year when asked to.
+Fixed windows take them from one covariance matrix of all symbols' returns,
+computed with NumPy when the analytics extra is installed.
+Sliding windows hold `window_size` returns and are updated as they slide, by
+adding the newest return and removing the oldest, so each statistic costs
+O(n) over the whole series.
+"""
+
+import math
+import operator
+import os
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Environment variable configuration
+ALPHAVANTAGE_LOCAL_ANALYTICS = (
+    os.getenv("ALPHAVANTAGE_LOCAL_ANALYTICS", "true").lower() == "true"
+)
+
+# Periods in a year, per interval computed locally
+PERIODS_PER_YEAR = {"DAILY": 252, "WEEKLY": 52, "MONTHLY": 12}
+
+OHLC_FIELDS = {
+    "open": "1. open",
+    "high": "2. high",
+    "low": "3. low",
+    "close": "4. close",
+}
+
+FIXED_CALCULATIONS = {
+    "MEAN",
+    "VARIANCE",
+    "STDDEV",
+    "COVARIANCE",
+    "CORRELATION",
+    "MAX_DRAWDOWN",
+    "CUMULATIVE_RETURN",
+}
+SLIDING_CALCULATIONS = FIXED_CALCULATIONS - {"MAX_DRAWDOWN"}
+
+# Calculations taking the annualized option
+_ANNUALIZABLE = {"VARIANCE", "STDDEV", "COVARIANCE"}
+
+_CALCULATION = re.compile(r"^\s*([A-Z_]+)\s*(?:\((.*)\))?\s*$", re.IGNORECASE)
+_TRAILING_RANGE = re.compile(r"^(\d+)(day|week|month|year)$", re.IGNORECASE)
+
+
+def parse_calculation(text: str, supported: set) -> Optional[Tuple[str, bool]]:
+    """
+    Parse a calculation such as "STDDEV(annualized=True)".
+
+    Returns the calculation's name and whether it is annualized, or None if it
+    is not among the supported ones or takes options not computed locally.
+    """
+    match = _CALCULATION.match(text)
+    if not match or match.group(1).upper() not in supported:
+        return None
+    name = match.group(1).upper()
+    annualized = False
+    for option in filter(None, (match.group(2) or "").split(",")):
+        key, _, value = (part.strip().lower() for part in option.partition("="))
+        if key == "annualized" and name in _ANNUALIZABLE:
+            annualized = value == "true"
+        elif not (key == "method" and name == "CORRELATION" and value == "pearson"):
+            return None
+    return name, annualized
+
+
+def range_start(series_range: str, last_day: str) -> Optional[str]:
+    """
+    First day of a range ending on the last day.
+
+    Args:
+        series_range: "full", a trailing range such as "2month" or "10day",
+                      or the first day as "YYYY-MM-DD"
+        last_day: Last day of the data, "YYYY-MM-DD"
+
+    Returns:
+        The first day, "" for the full history, or None if the range is not
+        understood
+    """
+    if series_range.lower() == "full":
+        return ""
+    match = _TRAILING_RANGE.match(series_range)
+    if match is None:
+        try:
+            return date.fromisoformat(series_range).isoformat()
+        except ValueError:
+            return None
+    count, unit = int(match.group(1)), match.group(2).lower()
+    last = date.fromisoformat(last_day)
+    if unit in ("day", "week"):
+        return (last - timedelta(days=count * (7 if unit == "week" else 1))).isoformat()
+    months = count * (12 if unit == "year" else 1)
+    year, month = divmod(last.year * 12 + last.month - 1 - months, 12)
+    # The same day of the month, or the month's last day when it is shorter
+    first = date(year, month + 1, 1)
+    following = date(year + (month + 1) // 12, (month + 1) % 12 + 1, 1)
+    day = min(last.day, (following - first).days)
+    return first.replace(day=day).isoformat()
+
+
+def align(
+    series: Dict[str, Dict[str, Dict[str, str]]], field: str, first_day: str
+) -> Tuple[List[str], Dict[str, List[float]]]:
+    """
+    Prices of each symbol on the dates all of them share, oldest first.
+
+    Args:
+        series: Bars per date, per symbol, as in a time series response
+        field: Bar field to take, such as "4. close"
+        first_day: Dates before this one are left out
+
+    Returns:
+        The shared dates and the prices on them per symbol
+    """
+    shared = None
+    for bars in series.values():
+        shared = set(bars) if shared is None else shared & bars.keys()
+    dates = sorted(day for day in shared or () if day >= first_day)
+    return dates, {
+        symbol: [float(bars[day][field]) for day in dates]
+        for symbol, bars in series.items()
+    }
+
+
+def _returns(prices: List[float]) -> List[float]:
+    return [current / previous - 1 for previous, current in zip(prices, prices[1:])]
+
+
+def _variance(values: List[float]) -> float:
+    mean = math.fsum(values) / len(values)
+    return math.fsum((value - mean) ** 2 for value in values) / (len(values) - 1)
+
+
+def _covariance(xs: List[float], ys: List[float]) -> float:
+    mean_x = math.fsum(xs) / len(xs)
+    mean_y = math.fsum(ys) / len(ys)
+    return math.fsum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / (
+        len(xs) - 1
+    )
+
+
+def _correlation(
+    covariance: float, variance_x: float, variance_y: float
+) -> Optional[float]:
+    # Undefined, and null in the response, when a series does not vary
+    denominator = math.sqrt(variance_x * variance_y)
+    return covariance / denominator if denominator else None
+
+
+def _max_drawdown(dates: List[str], prices: List[float]) -> Dict[str, Any]:
+    peak = trough = peak_at = 0
+    drawdown = 0.0
+    for i, price in enumerate(prices):
+        if price > prices[peak_at]:
+            peak_at = i
+        current = price / prices[peak_at] - 1
+        if current < drawdown:
+            drawdown, peak, trough = current, peak_at, i
+    return {
+        "max_drawdown": drawdown,
+        "drawdown_range": {
+            "start_drawdown": dates[peak],
+            "end_drawdown": dates[trough],
+        },
+    }
+
+
+def _lower_triangle(symbols: List[str], pair_value) -> List[List[float]]:
+    return [
+        [pair_value(symbols[i], symbols[j]) for j in range(i + 1)]
+        for i in range(len(symbols))
+    ]
+
+
+def _meta_data(symbols: List[str], dates: List[str], ohlc: str, interval: str):
+    return {
+        "symbols": ",".join(symbols),
+        "min_dt": dates[0],
+        "max_dt": dates[-1],
+        "ohlc": ohlc.capitalize(),
+        "interval": interval,
+    }
+
+
+def _fixed_statistics_numpy(
+    prices: List[List[float]],
+) -> Tuple[List[float], List[List[float]]]:
+    matrix = numpy.array(prices, dtype=float)
+    returns = matrix[:, 1:] / matrix[:, :-1] - 1
+    covariances = numpy.atleast_2d(numpy.cov(returns))
+    return returns.mean(axis=1).tolist(), covariances.tolist()
+
+
+def _fixed_statistics_python(
+    prices: List[List[float]],
+) -> Tuple[List[float], List[List[float]]]:
+    returns = [_returns(series) for series in prices]
+    size = len(returns)
+    covariances = [[0.0] * size for _ in range(size)]
+    for i in range(size):
+        covariances[i][i] = _variance(returns[i])
+        for j in range(i):
+            covariance = _covariance(returns[i], returns[j])
+            covariances[i][j] = covariances[j][i] = covariance
+    return [math.fsum(r) / len(r) for r in returns], covariances
+
+
+def fixed_window(
+    dates: List[str],
+    prices: Dict[str, List[float]],
+    calculations: List[str],
+    ohlc: str,
+    interval: str,
+) -> Optional[Dict[str, Any]]:
+    """
+    Compute an ANALYTICS_FIXED_WINDOW response from aligned prices.
+
+    Args:
+        dates: Shared dates, oldest first
+        prices: Prices on those dates per symbol
+        calculations: Calculations as the upstream API spells them
+        ohlc: Price field the prices come from
+        interval: "DAILY", "WEEKLY" or "MONTHLY"
+
+    Returns:
+        The response, or None if a calculation is not computed locally or
+        there are too few prices for it
+    """
+    parsed = [parse_calculation(text, FIXED_CALCULATIONS) for text in calculations]
+    if not calculations or None in parsed or len(dates) < 3:
+        return None
+    symbols = list(prices)
+    compute = _fixed_statistics_numpy if numpy is not None else _fixed_statistics_python
+    means, matrix = compute([prices[symbol] for symbol in symbols])
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+
+    def covariance(x: str, y: str) -> float:
+        return matrix[index[x]][index[y]]
+
+    variances = {symbol: covariance(symbol, symbol) for symbol in symbols}
+
+    results = {}
+    for text, (name, annualized) in zip(calculations, parsed):
+        scale = PERIODS_PER_YEAR[interval] if annualized else 1
+        if name == "MEAN":
+            value = dict(zip(symbols, means))
+        elif name == "VARIANCE":
+            value = {s: v * scale for s, v in variances.items()}
+        elif name == "STDDEV":
+            value = {s: math.sqrt(v * scale) for s, v in variances.items()}
+        elif name == "CUMULATIVE_RETURN":
+            value = {s: p[-1] / p[0] - 1 for s, p in prices.items()}
+        elif name == "MAX_DRAWDOWN":
+            value = {s: _max_drawdown(dates, p) for s, p in prices.items()}
+        elif name == "COVARIANCE":
+            value = {
+                "index": symbols,
+                "covariance": _lower_triangle(
+                    symbols, lambda x, y: covariance(x, y) * scale
+                ),
+            }
+        else:
+            value = {
+                "index": symbols,
+                "correlation": _lower_triangle(
+                    symbols,
+                    lambda x, y: _correlation(
+                        covariance(x, y), variances[x], variances[y]
+                    ),
+                ),
+            }
+        results[text] = value
+
+    return {
+        "meta_data": _meta_data(symbols, dates, ohlc, interval),
+        "payload": {"RETURNS_CALCULATIONS": results},
+    }
+
+
+def _rolling_moments(values: List[float], window: int) -> Iterator[Tuple[float, float]]:
+    """Mean and sum of squared deviations of each window, as it slides."""
+    mean = m2 = 0.0
+    for i, value in enumerate(values):
+        # Welford's update, and its inverse for the value leaving the window
+        count = min(i, window - 1) + 1
+        delta = value - mean
+        mean += delta / count
+        m2 += delta * (value - mean)
+        if i >= window - 1:
+            yield mean, max(m2, 0.0)
+            old = values[i - window + 1]
+            delta = old - mean
+            mean -= delta / (window - 1)
+            m2 -= delta * (old - mean)
+
+
+def _rolling_comoment(xs: List[float], ys: List[float], window: int) -> Iterator[float]:
+    """Sum of co-deviations of each window of paired values, as it slides."""
+    mean_x = mean_y = comoment = 0.0
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        count = min(i, window - 1) + 1
+        delta_x = x - mean_x
+        mean_x += delta_x / count
+        mean_y += (y - mean_y) / count
+        comoment += delta_x * (y - mean_y)
+        if i >= window - 1:
+            yield comoment
+            old_x, old_y = xs[i - window + 1], ys[i - window + 1]
+            delta_x = old_x - mean_x
+            mean_x -= delta_x / (window - 1)
+            mean_y -= (old_y - mean_y) / (window - 1)
+            comoment -= delta_x * (old_y - mean_y)
+
+
+def sliding_window(
+    dates: List[str],
+    prices: Dict[str, List[float]],
+    calculations: List[str],
+    ohlc: str,
+    interval: str,
+    window_size: int,
+) -> Optional[Dict[str, Any]]:
+    """
+    Compute an ANALYTICS_SLIDING_WINDOW response from aligned prices.
+
+    Each running statistic is keyed by the last date of its window. Pairwise
+    statistics are keyed by the two symbols, comma-separated.
+
+    Args:
+        dates: Shared dates, oldest first
+        prices: Prices on those dates per symbol
+        calculations: Calculations as the upstream API spells them
+        ohlc: Price field the prices come from
+        interval: "DAILY", "WEEKLY" or "MONTHLY"
+        window_size: Returns in each window, at least 2
+
+    Returns:
+        The response, or None if a calculation is not computed locally or
+        there are too few prices for one window
+    """
+    parsed = [parse_calculation(text, SLIDING_CALCULATIONS) for text in calculations]
+    if not calculations or None in parsed or not 2 <= window_size < len(dates):
+        return None
+    symbols = list(prices)
+    window_dates = dates[window_size:]
+    returns = {symbol: _returns(values) for symbol, values in prices.items()}
+    moments = {
+        symbol: list(_rolling_moments(values, window_size))
+        for symbol, values in returns.items()
+    }
+    pairs = [(x, y) for i, x in enumerate(symbols) for y in symbols[i + 1 :]]
+    comoments = {}
+    if any(name in ("COVARIANCE", "CORRELATION") for name, _ in parsed):
+        comoments = {
+            (x, y): list(_rolling_comoment(returns[x], returns[y], window_size))
+            for x, y in pairs
+        }
+
+    def running(values) -> Dict[str, float]:
+        return dict(zip(window_dates, values))
+
+    results = {}
+    for text, (name, annualized) in zip(calculations, parsed):
+        scale = (PERIODS_PER_YEAR[interval] if annualized else 1) / (window_size - 1)
+        if name == "MEAN":
+            value = {s: running(mean for mean, _ in m) for s, m in moments.items()}
+        elif name == "VARIANCE":
+            value = {s: running(m2 * scale for _, m2 in m) for s, m in moments.items()}
+        elif name == "STDDEV":
+            value = {
+                s: running(math.sqrt(m2 * scale) for _, m2 in m)
+                for s, m in moments.items()
+            }
+        elif name == "CUMULATIVE_RETURN":
+            value = {
+                s: running(
+                    current / previous - 1
+                    for previous, current in zip(p, p[window_size:])
+                )
+                for s, p in prices.items()
+            }
+        elif name == "COVARIANCE":
+            value = {
+                f"{x},{y}": running(c * scale for c in comoments[x, y])
+                for x, y in pairs
+            }
+        else:
+            value = {
+                f"{x},{y}": running(
+                    _correlation(c, mx[1], my[1])
+                    for c, mx, my in zip(comoments[x, y], moments[x], moments[y])
+                )
+                for x, y in pairs
+            }
+        results[text] = {f"RUNNING_{name}": value}
+
+    meta = _meta_data(symbols, dates, ohlc, interval)
+    meta["window_size"] = window_size
+    return {"meta_data": meta, "payload": {"RETURNS_CALCULATIONS": results}}
+
+
+def _correlations_numpy(prices: List[List[float]]) -> List[List[Optional[float]]]:
+    matrix = numpy.array(prices, dtype=float)
+    returns = matrix[:, 1:] / matrix[:, :-1] - 1
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        correlations = numpy.corrcoef(returns)
+    correlations = numpy.atleast_2d(correlations).round(6)
+    return [
+        [None if math.isnan(value) else value for value in row]
+        for row in correlations.tolist()
+    ]
+
+
+def _correlations_python(prices: List[List[float]]) -> List[List[Optional[float]]]:
+    # Returns centred and scaled to unit length, whose dot products correlate
+    standardized = []
+    for series in prices:
+        returns = _returns(series)
+        mean = math.fsum(returns) / len(returns)
+        deviations = [value - mean for value in returns]
+        norm = math.sqrt(math.fsum(value * value for value in deviations))
+        standardized.append([value / norm for value in deviations] if norm else None)
+    return [
+        [
+            round(sum(map(operator.mul, x, y)), 6)
+            if x is not None and y is not None
+            else None
+            for y in standardized
+        ]
+        for x in standardized
+    ]
+
+
+def correlation_matrix(
+    dates: List[str],
+    prices: Dict[str, List[float]],
+    layout: str = "upper",
+    min_abs: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Correlations of the returns of many symbols, in a compact layout.
+
+    NumPy computes the matrix when it is installed, plain Python otherwise.
+    Correlations are rounded to six decimals, and are null for a series that
+    does not vary.
+
+    Args:
+        dates: Shared dates, oldest first
+        prices: Prices on those dates per symbol
+        layout: "upper" for the pairs above the diagonal, row by row, or
+                "full" for the whole matrix, row by row
+        min_abs: Only list pairs correlated at least this strongly, either way,
+                 as [row, column, correlation] triples, strongest first
+
+    Returns:
+        The symbols, the dates spanned and the correlations, or None if there
+        are fewer than three shared dates
+    """
+    if len(dates) < 3 or not prices:
+        return None
+    symbols = list(prices)
+    compute = _correlations_numpy if numpy is not None else _correlations_python
+    matrix = compute([prices[symbol] for symbol in symbols])
+    size = len(symbols)
+    result = {
+        "symbols": symbols,
+        "min_dt": dates[0],
+        "max_dt": dates[-1],
+        "observations": len(dates) - 1,
+    }
+    if min_abs is not None:
+        pairs = [
+            [i, j, matrix[i][j]]
+            for i in range(size)
+            for j in range(i + 1, size)
+            if matrix[i][j] is not None and abs(matrix[i][j]) >= min_abs
+        ]
+        pairs.sort(key=lambda pair: -abs(pair[2]))
+        result["layout"] = "pairs"
+        result["pairs"] = pairs
+    elif layout == "full":
+        result["layout"] = "full"
+        result["correlations"] = [value for row in matrix for value in row]
+    else:
+        result["layout"] = "upper"
+        result["correlations"] = [
+            matrix[i][j] for i in range(size) for j in range(i + 1, size)
+        ]
+    return result
+
+
+__all__ = [
+    "ALPHAVANTAGE_LOCAL_ANALYTICS",
+    "OHLC_FIELDS",
+    "PERIODS_PER_YEAR",
+    "align",
+    "correlation_matrix",
+    "fixed_window",
+    "range_start",
+    "sliding_window",
+]
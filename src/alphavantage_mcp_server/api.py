@@ -1,9 +1,56 @@
+import asyncio
+import logging
 import os
+import time
+from datetime import date, timedelta
+from typing import Awaitable, Callable
 
 import httpx
 from dotenv import load_dotenv
 
-from .telemetry_instrument import instrument_tool
+from .adjust import ALPHAVANTAGE_LOCAL_ADJUSTMENT, adjust_daily, adjust_ohlc
+from .analytics import (
+    ALPHAVANTAGE_LOCAL_ANALYTICS,
+    OHLC_FIELDS,
+    PERIODS_PER_YEAR,
+    align,
+    correlation_matrix,
+    fixed_window,
+    range_start,
+    sliding_window,
+)
+from .fx import create_fx_book_from_env
+from .history import (
+    ALPHAVANTAGE_HISTORY_CONCURRENCY,
+    ALPHAVANTAGE_HISTORY_MAX_MONTHS,
+    parse_bounds,
+    plan_months,
+    stitch_columns,
+)
+from .offload import decode_json, run_for_payload
+from .rate_limit import create_rate_limiter_from_env
+from .resample import (
+    ALPHAVANTAGE_LOCAL_RESAMPLING,
+    COMPACT_SIZE,
+    DAILY_SERIES_KEY,
+    INTRADAY_INTERVALS,
+    aggregate_intraday,
+    resample_daily,
+)
+from .response_cache import (
+    create_response_cache_from_env,
+    is_cacheable,
+    make_cache_key,
+)
+from .telemetry_instrument import (
+    instrument_tool,
+    observe_phase,
+    record_response_size,
+    time_phase,
+)
+from .tracing import start_span
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 
@@ -11,16 +58,318 @@ API_KEY = os.getenv("ALPHAVANTAGE_API_KEY")
 if not API_KEY:
     raise ValueError("ALPHAVANTAGE_API_KEY environment variable required")
 
-API_BASE_URL = "https://www.alphavantage.co/query"
+API_BASE_URL = os.getenv(
+    "ALPHAVANTAGE_API_BASE_URL", "https://www.alphavantage.co/query"
+)
+
+# Upstream responses shared across requests (and warm Lambda invocations)
+RESPONSE_CACHE = create_response_cache_from_env()
+
+# Cache shared with other worker processes, set by multi-worker HTTP serving
+SHARED_CACHE = None
+
+# Upstream request budget shared by all tools
+RATE_LIMITER = create_rate_limiter_from_env()
+
+# Exchange rates against a base currency, from which crosses are derived
+FX_BOOK = create_fx_book_from_env()
+
+# Pooled HTTP client, bound to the event loop that created it
+_http_client: httpx.AsyncClient | None = None
+_http_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared HTTP client for the running event loop.
+
+    Connections are pooled and reused across requests. A new client is created
+    when none exists yet, when it was closed, or when the running loop differs
+    from the one the client was created on (connection pools cannot be shared
+    between event loops).
+    """
+    global _http_client, _http_client_loop
+
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient()
+        _http_client_loop = loop
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and drop its pooled connections."""
+    global _http_client, _http_client_loop
+
+    client, _http_client, _http_client_loop = _http_client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+class _UpstreamTimings:
+    """
+    Collects httpx/httpcore trace events for one request.
+
+    The timestamps split an upstream call into waiting for a pooled
+    connection, connecting (DNS, TCP and TLS), time to first byte and body
+    download. The queue phase adds the rate limiter wait, measured by the
+    limiter itself, to the wait for a pooled connection.
+    """
+
+    def __init__(self, limiter_wait: float = 0.0):
+        self.limiter_wait = limiter_wait
+        self.started_at = time.perf_counter()
+        self.events: dict[str, float] = {}
+
+    async def trace(self, event_name: str, info: dict) -> None:
+        # Event names look like "connection.connect_tcp.started" or
+        # "http11.receive_response_body.complete"; keep the first occurrence
+        _, _, name = event_name.partition(".")
+        self.events.setdefault(name, time.perf_counter())
+
+    def observe(self, finished_at: float) -> None:
+        events = self.events
+        connect_start = events.get("connect_tcp.started")
+        send_start = events.get("send_request_headers.started")
+        first_event = connect_start or send_start or finished_at
+        observe_phase("queue", self.limiter_wait + first_event - self.started_at)
+
+        if connect_start is not None:
+            connected = events.get("start_tls.complete") or events.get(
+                "connect_tcp.complete", connect_start
+            )
+            observe_phase("connect", connected - connect_start)
+
+        headers_done = events.get("receive_response_headers.complete")
+        if send_start is not None and headers_done is not None:
+            observe_phase("ttfb", headers_done - send_start)
+
+        body_start = events.get("receive_response_body.started")
+        body_done = events.get("receive_response_body.complete", finished_at)
+        if body_start is not None:
+            observe_phase("download", body_done - body_start)
+
+
+async def _get_cached(https_params: dict[str, str]) -> dict[str, str] | str | None:
+    """Look up a response in this process's cache, then the workers' shared one."""
+    if not RESPONSE_CACHE.enabled:
+        return None
+    cache_key = make_cache_key(https_params)
+    with start_span(
+        "alphavantage.cache_lookup",
+        {"alphavantage.function": https_params.get("function")},
+    ) as span:
+        cached = RESPONSE_CACHE.get(cache_key)
+        if cached is None and SHARED_CACHE is not None:
+            shared = await SHARED_CACHE.get(cache_key)
+            if shared is not None:
+                cached, ttl, size = shared
+                RESPONSE_CACHE.set(cache_key, cached, ttl, size)
+        if span is not None:
+            span.set_attribute("alphavantage.cache_hit", cached is not None)
+    return cached
+
+
+async def _resample_cached_daily(
+    symbol: str, period: str, adjusted: bool
+) -> dict[str, str] | None:
+    """
+    Derive a weekly or monthly series from cached full daily history.
+
+    Returns None when no full daily history of the symbol is cached, or local
+    resampling is disabled, and the series must come from upstream.
+    """
+    if not ALPHAVANTAGE_LOCAL_RESAMPLING:
+        return None
+    # Daily adjusted bars also carry the unadjusted prices and volume
+    functions = ["TIME_SERIES_DAILY_ADJUSTED"]
+    if not adjusted:
+        functions.append("TIME_SERIES_DAILY")
+    for function in functions:
+        daily = await _get_cached(
+            {
+                "function": function,
+                "symbol": symbol,
+                "datatype": "json",
+                "outputsize": "full",
+            }
+        )
+        if daily is None:
+            continue
+        with start_span(
+            "alphavantage.resample",
+            {"alphavantage.function": function, "alphavantage.period": period},
+        ):
+            resampled = await run_for_payload(
+                daily, resample_daily, daily, period, adjusted
+            )
+        if resampled is not None:
+            return resampled
+    return None
+
+
+async def _adjust_cached_daily(symbol: str, outputsize: str) -> dict | None:
+    """
+    Derive the daily adjusted series from cached raw bars and corporate actions.
+
+    Full raw bars also serve a compact request. Returns None when the raw bars,
+    the splits or the dividends of the symbol are not cached, or local
+    adjustment is disabled.
+    """
+    if not ALPHAVANTAGE_LOCAL_ADJUSTMENT:
+        return None
+    splits = await _get_cached({"function": "SPLITS", "symbol": symbol})
+    dividends = await _get_cached({"function": "DIVIDENDS", "symbol": symbol})
+    if splits is None or dividends is None:
+        return None
+    outputsizes = ["full"] if outputsize == "full" else ["compact", "full"]
+    for cached_outputsize in outputsizes:
+        daily = await _get_cached(
+            {
+                "function": "TIME_SERIES_DAILY",
+                "symbol": symbol,
+                "datatype": "json",
+                "outputsize": cached_outputsize,
+            }
+        )
+        if daily is None:
+            continue
+        with start_span(
+            "alphavantage.adjust", {"alphavantage.function": "TIME_SERIES_DAILY"}
+        ):
+            adjusted = await run_for_payload(
+                daily, adjust_daily, daily, splits, dividends, outputsize != "full"
+            )
+        if adjusted is not None:
+            return adjusted
+    return None
+
+
+def _flag(value: bool | str) -> str:
+    """Spell a boolean query parameter the way Alpha Vantage expects it."""
+    if isinstance(value, str):
+        return value.lower()
+    return "true" if value else "false"
+
+
+async def _aggregate_cached_intraday(
+    symbol: str,
+    interval: str,
+    adjusted: str,
+    extended_hours: str,
+    outputsize: str,
+    month: str | None,
+) -> dict[str, str] | None:
+    """
+    Derive an intraday series from cached full output of a finer interval.
+
+    Coarser sources are tried first, as they aggregate fastest; the same
+    interval serves a regular-hours request from extended-hours bars. Returns
+    None when no usable bars are cached, or local resampling is disabled.
+    """
+    if not ALPHAVANTAGE_LOCAL_RESAMPLING or interval not in INTRADAY_INTERVALS:
+        return None
+    minutes = INTRADAY_INTERVALS[interval]
+    # Extended-hours bars also serve regular-hours requests
+    sessions = ["true"] if extended_hours == "true" else ["false", "true"]
+    for source, source_minutes in reversed(INTRADAY_INTERVALS.items()):
+        if source_minutes > minutes or minutes % source_minutes:
+            continue
+        for session in sessions:
+            if (source, session, outputsize) == (interval, extended_hours, "full"):
+                # The request itself, which _make_api_request looks up
+                continue
+            bars = await _get_cached(
+                {
+                    "function": "TIME_SERIES_INTRADAY",
+                    "symbol": symbol,
+                    "interval": source,
+                    "datatype": "json",
+                    "adjusted": adjusted,
+                    "outputsize": "full",
+                    "extended_hours": session,
+                    "month": month,
+                }
+            )
+            if bars is None:
+                continue
+            with start_span(
+                "alphavantage.resample",
+                {"alphavantage.function": "TIME_SERIES_INTRADAY"},
+            ):
+                aggregated = await run_for_payload(
+                    bars,
+                    aggregate_intraday,
+                    bars,
+                    interval,
+                    extended_hours == "true",
+                    outputsize == "compact",
+                )
+            if aggregated is not None:
+                return aggregated
+    return None
 
 
 async def _make_api_request(
     https_params: dict[str, str], datatype: str
 ) -> dict[str, str] | str:
-    async with httpx.AsyncClient() as client:
-        response = await client.get(API_BASE_URL, params=https_params)
-        response.raise_for_status()
-        return response.text if datatype == "csv" else response.json()
+    function = https_params.get("function")
+    cache_key = make_cache_key(https_params)
+    cached = await _get_cached(https_params)
+    if cached is not None:
+        return cached
+
+    if RATE_LIMITER.enabled:
+        with start_span("alphavantage.rate_limit") as span:
+            limiter_wait = await RATE_LIMITER.acquire()
+            if span is not None:
+                span.set_attribute("alphavantage.rate_limit_wait", limiter_wait)
+    else:
+        limiter_wait = 0.0
+
+    timings = _UpstreamTimings(limiter_wait)
+    with start_span(
+        f"GET {function}",
+        {
+            "http.request.method": "GET",
+            "url.full": API_BASE_URL,
+            "alphavantage.function": function,
+        },
+        client=True,
+    ) as span:
+        client = get_http_client()
+        request = client.build_request(
+            "GET",
+            API_BASE_URL,
+            params=https_params,
+            extensions={"trace": timings.trace},
+        )
+        response = await client.send(request, stream=True)
+        try:
+            if span is not None:
+                span.set_attribute("http.response.status_code", response.status_code)
+            response.raise_for_status()
+            # httpx links a response and its body stream in a reference cycle;
+            # read into a local buffer rather than aread(), which would keep
+            # the body on the response until the next full garbage collection
+            body = b"".join([chunk async for chunk in response.aiter_bytes()])
+        finally:
+            await response.aclose()
+            timings.observe(time.perf_counter())
+
+    with time_phase("decode"):
+        if datatype == "csv":
+            result = body.decode(response.encoding or "utf-8")
+        else:
+            result = await decode_json(body)
+    record_response_size(result, len(body))
+
+    if is_cacheable(result):
+        ttl = RESPONSE_CACHE.ttl_for(https_params)
+        RESPONSE_CACHE.set(cache_key, result, ttl, len(body))
+        if SHARED_CACHE is not None and ttl > 0:
+            SHARED_CACHE.set(cache_key, body, datatype, ttl)
+    return result
 
 
 #####
@@ -50,6 +399,15 @@ async def fetch_intraday(
     :returns: The intraday stock data.
     """
 
+    adjusted = _flag(adjusted)
+    extended_hours = _flag(extended_hours)
+    if datatype == "json":
+        aggregated = await _aggregate_cached_intraday(
+            symbol, interval, adjusted, extended_hours, outputsize, month
+        )
+        if aggregated is not None:
+            return aggregated
+
     https_params = {
         "function": "TIME_SERIES_INTRADAY",
         "symbol": symbol,
@@ -65,6 +423,140 @@ async def fetch_intraday(
     return await _make_api_request(https_params, datatype)
 
 
+async def _intraday_month(
+    symbol: str, interval: str, adjusted: str, extended_hours: str, month: str
+) -> tuple[dict[str, str], bool]:
+    """
+    Fetch the full intraday output of one month.
+
+    Returns the response and whether it was at hand, cached or aggregated from
+    cached finer bars, without an upstream request.
+    """
+    https_params = {
+        "function": "TIME_SERIES_INTRADAY",
+        "symbol": symbol,
+        "interval": interval,
+        "datatype": "json",
+        "adjusted": adjusted,
+        "outputsize": "full",
+        "extended_hours": extended_hours,
+        "month": month,
+        "apikey": API_KEY,
+    }
+    cached = await _get_cached(https_params)
+    if cached is None:
+        cached = await _aggregate_cached_intraday(
+            symbol, interval, adjusted, extended_hours, "full", month
+        )
+    if cached is not None:
+        return cached, True
+    return await _make_api_request(https_params, "json"), False
+
+
+@instrument_tool("intraday_history")
+async def fetch_intraday_history(
+    symbol: str,
+    start: str,
+    end: str,
+    interval: str = "1min",
+    adjusted: bool = True,
+    extended_hours: bool = True,
+    progress: Callable[[int, int, str], Awaitable[None]] | None = None,
+) -> dict:
+    """
+    Fetch intraday stock data over a date range, one month per request.
+
+    Months whose full output is cached are not requested again; the others
+    are requested concurrently, paced by the rate limiter.
+
+    :argument: symbol (str): The stock symbol to fetch.
+    :argument: start (str): The first day (YYYY-MM-DD) or month (YYYY-MM).
+    :argument: end (str): The last day (YYYY-MM-DD) or month (YYYY-MM), included.
+    :argument: interval (str): The time interval for the data (default: "1min").
+    :argument: adjusted (bool): The adjusted data flag (default: True).
+    :argument: extended_hours (bool): The extended hours flag (default: True).
+    :argument: progress (callable): Awaited with the months done, the months
+        planned and the month just done, after each month.
+
+    :returns: The bars as columns, oldest first, with the months that failed.
+    """
+    if interval not in INTRADAY_INTERVALS:
+        raise ValueError(f"interval must be one of {', '.join(INTRADAY_INTERVALS)}")
+    first, last = parse_bounds(start, end)
+    months = plan_months(first, last)
+    if len(months) > ALPHAVANTAGE_HISTORY_MAX_MONTHS:
+        raise ValueError(
+            f"{start} to {end} spans {len(months)} months, "
+            f"more than the {ALPHAVANTAGE_HISTORY_MAX_MONTHS} allowed"
+        )
+    adjusted = _flag(adjusted)
+    extended_hours = _flag(extended_hours)
+
+    semaphore = asyncio.Semaphore(ALPHAVANTAGE_HISTORY_CONCURRENCY)
+    payloads: dict[str, dict] = {}
+    failed: dict[str, str] = {}
+    done = 0
+    cached_months = 0
+
+    async def fetch_month(month: str) -> None:
+        nonlocal done, cached_months
+        async with semaphore:
+            try:
+                payload, cached = await _intraday_month(
+                    symbol, interval, adjusted, extended_hours, month
+                )
+            except (httpx.HTTPError, ValueError) as e:
+                # ValueError: a body that does not decode as JSON
+                failed[month] = str(e) or type(e).__name__
+            else:
+                if is_cacheable(payload):
+                    payloads[month] = payload
+                    cached_months += cached
+                else:
+                    # Error messages and throttle notes hold a single message
+                    failed[month] = str(next(iter(payload.values()), ""))
+        done += 1
+        if progress is not None:
+            try:
+                await progress(done, len(months), month)
+            except Exception as e:
+                # A lost notification must not throw away the months fetched
+                logger.warning(f"Progress report for {month} failed: {e}")
+
+    with start_span(
+        "alphavantage.intraday_history",
+        {"alphavantage.symbol": symbol, "alphavantage.months": len(months)},
+    ):
+        await asyncio.gather(*(fetch_month(month) for month in months))
+
+    ordered = [payloads[month] for month in months if month in payloads]
+    columns = await run_for_payload(
+        ordered, stitch_columns, ordered, interval, first, last
+    )
+    time_zone = next(
+        (
+            payload["Meta Data"].get("6. Time Zone")
+            for payload in ordered
+            if isinstance(payload.get("Meta Data"), dict)
+        ),
+        "US/Eastern",
+    )
+    return {
+        "symbol": symbol,
+        "interval": interval,
+        "start": first,
+        "end": last,
+        "time_zone": time_zone,
+        "months": {
+            "planned": len(months),
+            "cached": cached_months,
+            "fetched": len(payloads) - cached_months,
+            "failed": dict(sorted(failed.items())),
+        },
+        **columns,
+    }
+
+
 @instrument_tool("time_series_daily")
 async def fetch_time_series_daily(
     symbol: str, datatype: str = "json", outputsize: str = "compact"
@@ -90,25 +582,41 @@ async def fetch_time_series_daily(
 
 @instrument_tool("time_series_daily_adjusted")
 async def fetch_time_series_daily_adjusted(
-    symbol: str, datatype: str = "json", outputsize: str = "compact"
+    symbol: str,
+    datatype: str = "json",
+    outputsize: str = "compact",
+    adjusted_ohlc: bool = False,
 ) -> dict[str, str] | str:
     """
     Fetch daily adjusted stock data from the Alpha Vantage API.
 
     :argument: symbol (str): The stock symbol to fetch.
     :argument: datatype (str): The response data type (default: "json").
+    :argument: outputsize (str): The output size for the data (default: "compact").
+    :argument: adjusted_ohlc (bool): Adjust open, high, low and close too
+        (default: False, JSON only).
 
     :returns: The daily adjusted stock data.
     """
 
-    https_params = {
-        "function": "TIME_SERIES_DAILY_ADJUSTED",
-        "symbol": symbol,
-        "datatype": datatype,
-        "outputsize": outputsize,
-        "apikey": API_KEY,
-    }
-    return await _make_api_request(https_params, datatype)
+    if adjusted_ohlc and datatype != "json":
+        raise ValueError("adjusted_ohlc requires datatype json")
+
+    result = None
+    if datatype == "json":
+        result = await _adjust_cached_daily(symbol, outputsize)
+    if result is None:
+        https_params = {
+            "function": "TIME_SERIES_DAILY_ADJUSTED",
+            "symbol": symbol,
+            "datatype": datatype,
+            "outputsize": outputsize,
+            "apikey": API_KEY,
+        }
+        result = await _make_api_request(https_params, datatype)
+    if adjusted_ohlc:
+        result = await run_for_payload(result, adjust_ohlc, result)
+    return result
 
 
 @instrument_tool("time_series_weekly")
@@ -124,6 +632,11 @@ async def fetch_time_series_weekly(
     :returns: The weekly stock data.
     """
 
+    if datatype == "json":
+        resampled = await _resample_cached_daily(symbol, "weekly", adjusted=False)
+        if resampled is not None:
+            return resampled
+
     https_params = {
         "function": "TIME_SERIES_WEEKLY",
         "symbol": symbol,
@@ -146,6 +659,11 @@ async def fetch_time_series_weekly_adjusted(
     :returns: The weekly adjusted stock data.
     """
 
+    if datatype == "json":
+        resampled = await _resample_cached_daily(symbol, "weekly", adjusted=True)
+        if resampled is not None:
+            return resampled
+
     https_params = {
         "function": "TIME_SERIES_WEEKLY_ADJUSTED",
         "symbol": symbol,
@@ -168,6 +686,11 @@ async def fetch_time_series_monthly(
     :returns: The monthly stock data.
     """
 
+    if datatype == "json":
+        resampled = await _resample_cached_daily(symbol, "monthly", adjusted=False)
+        if resampled is not None:
+            return resampled
+
     https_params = {
         "function": "TIME_SERIES_MONTHLY",
         "symbol": symbol,
@@ -190,6 +713,11 @@ async def fetch_time_series_monthly_adjusted(
     :returns: The monthly adjusted stock data.
     """
 
+    if datatype == "json":
+        resampled = await _resample_cached_daily(symbol, "monthly", adjusted=True)
+        if resampled is not None:
+            return resampled
+
     https_params = {
         "function": "TIME_SERIES_MONTHLY_ADJUSTED",
         "symbol": symbol,
@@ -402,6 +930,167 @@ async def fetch_insider_transactions(symbol: str) -> dict[str, str]:
     return await _make_api_request(https_params, "json")
 
 
+# Cached series of an analytics interval, and the key of their bars
+_ANALYTICS_SOURCES = {
+    "WEEKLY": ("TIME_SERIES_WEEKLY", "Weekly Time Series", "weekly"),
+    "MONTHLY": ("TIME_SERIES_MONTHLY", "Monthly Time Series", "monthly"),
+}
+
+
+async def _cached_analytics_bars(
+    symbol: str, interval: str, series_range: str
+) -> dict[str, dict[str, str]] | None:
+    """
+    Cached bars of a symbol covering an analytics range, newest first.
+
+    Full output is used for any range, and compact daily output for a range
+    starting no earlier than its oldest bar. Returns None when no cached
+    series covers the range.
+    """
+    if interval in _ANALYTICS_SOURCES:
+        function, series_key, period = _ANALYTICS_SOURCES[interval]
+        cached = await _get_cached(
+            {"function": function, "symbol": symbol, "datatype": "json"}
+        )
+        if cached is None:
+            cached = await _resample_cached_daily(symbol, period, adjusted=False)
+        bars = cached.get(series_key) if isinstance(cached, dict) else None
+        return bars or None
+
+    for outputsize in ("full", "compact"):
+        # Daily adjusted bars also carry the unadjusted prices
+        for function in ("TIME_SERIES_DAILY_ADJUSTED", "TIME_SERIES_DAILY"):
+            cached = await _get_cached(
+                {
+                    "function": function,
+                    "symbol": symbol,
+                    "datatype": "json",
+                    "outputsize": outputsize,
+                }
+            )
+            bars = cached.get(DAILY_SERIES_KEY) if isinstance(cached, dict) else None
+            if not bars:
+                continue
+            if outputsize == "full" or _covers(bars, series_range):
+                return bars
+    return None
+
+
+def _covers(bars: dict[str, dict[str, str]], series_range: str) -> bool:
+    """Whether compact output, newest bar first, reaches back over the range."""
+    first_day = range_start(series_range, next(iter(bars)))
+    return bool(first_day) and first_day >= min(bars)
+
+
+def _needs_full_output(series_range: str) -> bool:
+    """Whether a range reaches back further than compact daily output."""
+    today = date.today()
+    first_day = range_start(series_range, today.isoformat())
+    # Five trading days a week, ignoring holidays
+    compact_start = today - timedelta(weeks=COMPACT_SIZE // 5)
+    return first_day is not None and first_day < compact_start.isoformat()
+
+
+async def _analytics_bars(
+    symbol: str, interval: str, series_range: str
+) -> dict[str, dict[str, str]] | str:
+    """
+    Bars of a symbol covering an analytics range, requested when not cached.
+
+    Daily bars are requested in full right away for ranges longer than compact
+    output spans. Shorter ones are requested compact first, and in full only
+    when the compact output does not cover the range. Returns the upstream
+    message instead when there are no bars.
+    """
+    bars = await _cached_analytics_bars(symbol, interval, series_range)
+    if bars is not None:
+        return bars
+    if interval in _ANALYTICS_SOURCES:
+        function, series_key, _ = _ANALYTICS_SOURCES[interval]
+        requests = [({"function": function}, series_key)]
+    else:
+        outputsizes = ["full"]
+        if not _needs_full_output(series_range):
+            outputsizes.insert(0, "compact")
+        requests = [
+            ({"function": "TIME_SERIES_DAILY", "outputsize": outputsize}, None)
+            for outputsize in outputsizes
+        ]
+    for params, series_key in requests:
+        response = await _make_api_request(
+            {**params, "symbol": symbol, "datatype": "json", "apikey": API_KEY},
+            "json",
+        )
+        if not is_cacheable(response):
+            # Error messages and throttle notes hold a single message
+            return str(next(iter(response.values()), ""))
+        bars = response.get(series_key or DAILY_SERIES_KEY)
+        if not bars:
+            return "No bars returned"
+        if series_key or params["outputsize"] == "full" or _covers(bars, series_range):
+            return bars
+    return "No bars returned"
+
+
+async def _local_analytics(
+    symbols: list[str],
+    interval: str,
+    series_range: str,
+    ohlc: str,
+    calculations: list[str] | None,
+    window_size: int | None = None,
+) -> dict | None:
+    """
+    Compute fixed or sliding window analytics from cached bars.
+
+    Returns None when a symbol's bars are not cached, the interval, range or
+    a calculation is not computed locally, or local analytics are disabled,
+    and the request must go upstream.
+    """
+    interval = (interval or "").upper()
+    if (
+        not ALPHAVANTAGE_LOCAL_ANALYTICS
+        or interval not in PERIODS_PER_YEAR
+        or ohlc not in OHLC_FIELDS
+        or not symbols
+        or not calculations
+    ):
+        return None
+    series = {}
+    for symbol in symbols:
+        bars = await _cached_analytics_bars(symbol, interval, series_range)
+        if bars is None:
+            return None
+        series[symbol] = bars
+    # Ranges end on the last date all symbols have
+    last_day = min(next(iter(bars)) for bars in series.values())
+    first_day = range_start(series_range, last_day)
+    if first_day is None:
+        return None
+
+    with start_span(
+        "alphavantage.analytics",
+        {"alphavantage.symbols": len(symbols), "alphavantage.interval": interval},
+    ):
+        dates, prices = await run_for_payload(
+            series, align, series, OHLC_FIELDS[ohlc], first_day
+        )
+        if window_size is None:
+            return await run_for_payload(
+                series, fixed_window, dates, prices, calculations, ohlc, interval
+            )
+        return await run_for_payload(
+            series,
+            sliding_window,
+            dates,
+            prices,
+            calculations,
+            ohlc,
+            interval,
+            int(window_size),
+        )
+
+
 @instrument_tool("analytics_fixed_window")
 async def fetch_analytics_fixed_window(
     symbols: list[str],
@@ -422,6 +1111,10 @@ async def fetch_analytics_fixed_window(
     :returns: The analytics data.
     """
 
+    local = await _local_analytics(symbols, interval, series_range, ohlc, calculations)
+    if local is not None:
+        return local
+
     https_params = {
         "function": "ANALYTICS_FIXED_WINDOW",
         "symbol": ",".join(symbols),
@@ -451,6 +1144,12 @@ async def fetch_analytics_sliding_window(
     :returns: The analytics data.
     """
 
+    local = await _local_analytics(
+        symbols, interval, series_range, ohlc, calculations, window_size
+    )
+    if local is not None:
+        return local
+
     https_params = {
         "function": "ANALYTICS_SLIDING_WINDOW",
         "symbols": ",".join(symbols),
@@ -464,6 +1163,72 @@ async def fetch_analytics_sliding_window(
     return await _make_api_request(https_params, "json")
 
 
+@instrument_tool("correlation_matrix")
+async def fetch_correlation_matrix(
+    symbols: list[str],
+    interval: str = "DAILY",
+    series_range: str = "1year",
+    ohlc: str = "close",
+    layout: str = "upper",
+    min_abs: float | None = None,
+) -> dict:
+    """
+    Compute the correlation matrix of many symbols' returns locally.
+
+    Bars are taken from the cache, and requested concurrently for the symbols
+    without cached bars covering the range.
+
+    :argument: symbols (list[str]): The stock symbols to correlate.
+    :argument: interval (str): DAILY, WEEKLY or MONTHLY (default: "DAILY").
+    :argument: series_range (str): "full", a trailing range such as "6month",
+        or the first day as YYYY-MM-DD (default: "1year").
+    :argument: ohlc (str): The OHLC field to take (default: "close").
+    :argument: layout (str): "upper" or "full" (default: "upper").
+    :argument: min_abs (float): Only list pairs at least this correlated.
+
+    :returns: The symbols and their correlations, with the symbols left out.
+    """
+    interval = interval.upper()
+    if interval not in PERIODS_PER_YEAR:
+        raise ValueError(f"interval must be one of {', '.join(PERIODS_PER_YEAR)}")
+    if ohlc not in OHLC_FIELDS:
+        raise ValueError(f"ohlc must be one of {', '.join(OHLC_FIELDS)}")
+    symbols = list(dict.fromkeys(symbols))
+
+    fetched = await asyncio.gather(
+        *(_analytics_bars(symbol, interval, series_range) for symbol in symbols)
+    )
+    series = {}
+    missing = {}
+    for symbol, bars in zip(symbols, fetched):
+        if isinstance(bars, str):
+            missing[symbol] = bars
+        else:
+            series[symbol] = bars
+    if len(series) < 2:
+        raise ValueError(f"Fewer than two symbols have bars: {missing}")
+
+    last_day = min(next(iter(bars)) for bars in series.values())
+    first_day = range_start(series_range, last_day)
+    if first_day is None:
+        raise ValueError(f"Unsupported series_range: {series_range}")
+    with start_span(
+        "alphavantage.correlation_matrix",
+        {"alphavantage.symbols": len(series), "alphavantage.interval": interval},
+    ):
+        dates, prices = await run_for_payload(
+            series, align, series, OHLC_FIELDS[ohlc], first_day
+        )
+        result = await run_for_payload(
+            series, correlation_matrix, dates, prices, layout, min_abs
+        )
+    if result is None:
+        raise ValueError("The symbols share fewer than three dates in the range")
+    result["interval"] = interval
+    result["missing"] = missing
+    return result
+
+
 #####
 # Fundamental data APIs
 #####
@@ -590,10 +1355,7 @@ async def fetch_cash_flow(symbol: str) -> dict[str, str]:
         "symbol": symbol,
         "apikey": API_KEY,
     }
-    async with httpx.AsyncClient() as client:
-        response = await client.get(API_BASE_URL, params=https_params)
-        response.raise_for_status()
-        return response.json()
+    return await _make_api_request(https_params, "json")
 
 
 @instrument_tool("company_earnings")
@@ -706,12 +1468,27 @@ async def fetch_exchange_rate(
     """
     Fetch exchange rate data from the Alpha Vantage API.
 
+    A pair without the base currency (ALPHAVANTAGE_FX_BASE_CURRENCY) is derived
+    from both currencies' rates against the base when both are fresh, and
+    marked "Derived". Otherwise the pair is requested directly.
+
     :argument: from_currency (str): The source currency.
     :argument: to_currency (str): The destination currency.
 
     :returns: The exchange rate data.
     """
 
+    from_currency, to_currency = from_currency.upper(), to_currency.upper()
+    if (
+        FX_BOOK.enabled
+        and from_currency != to_currency
+        and FX_BOOK.base not in (from_currency, to_currency)
+    ):
+        # Requesting missing legs would cost more than the pair itself
+        cross = FX_BOOK.cross(from_currency, to_currency)
+        if cross is not None:
+            return cross
+
     https_params = {
         "function": "CURRENCY_EXCHANGE_RATE",
         "from_currency": from_currency,
@@ -719,7 +1496,89 @@ async def fetch_exchange_rate(
         "apikey": API_KEY,
     }
 
-    return await _make_api_request(https_params, "json")
+    result = await _make_api_request(https_params, "json")
+    FX_BOOK.record(result)
+    return result
+
+
+async def _fx_legs(currencies: list[str]) -> dict[str, str]:
+    """
+    Request the legs of the currencies that have no fresh one, concurrently.
+
+    :returns: The reason each leg still missing could not be had.
+    """
+    wanted = [currency for currency in currencies if FX_BOOK.leg(currency) is None]
+
+    async def request_leg(currency: str) -> str | None:
+        params = {
+            "function": "CURRENCY_EXCHANGE_RATE",
+            "from_currency": FX_BOOK.base,
+            "to_currency": currency,
+            "apikey": API_KEY,
+        }
+        try:
+            payload = await _make_api_request(params, "json")
+        except httpx.HTTPError as e:
+            return f"HTTP error: {e}"
+        if FX_BOOK.record(payload):
+            return None
+        if isinstance(payload, dict):
+            for key in ("Error Message", "Note", "Information"):
+                if key in payload:
+                    return str(payload[key])
+        return "No exchange rate in the response"
+
+    with start_span(
+        "alphavantage.fx_legs",
+        {"alphavantage.base": FX_BOOK.base, "alphavantage.legs": len(wanted)},
+    ):
+        reasons = await asyncio.gather(*(request_leg(c) for c in wanted))
+    return {
+        currency: reason
+        for currency, reason in zip(wanted, reasons)
+        if reason is not None
+    }
+
+
+@instrument_tool("exchange_rate_matrix")
+async def fetch_exchange_rate_matrix(currencies: list[str]) -> dict:
+    """
+    Compute the exchange rates between every pair of currencies.
+
+    Each currency's rate against the base currency is requested once, unless
+    a fresh one is at hand, and the crosses are derived from those rates.
+
+    :argument: currencies (list[str]): The currency codes.
+
+    :returns: The currencies and their mid rates, row by row, with the
+        currencies left out.
+    """
+    if not FX_BOOK.enabled:
+        raise ValueError("exchange_rate_matrix needs ALPHAVANTAGE_FX_MAX_AGE > 0")
+    currencies = list(dict.fromkeys(currency.upper() for currency in currencies))
+    missing = await _fx_legs(currencies)
+    currencies = [currency for currency in currencies if currency not in missing]
+    if not currencies:
+        raise ValueError(f"No currency has an exchange rate: {missing}")
+
+    legs = {currency: FX_BOOK.leg(currency) for currency in currencies}
+    rates = []
+    for from_currency in currencies:
+        for to_currency in currencies:
+            rates.append(round(legs[to_currency].rate / legs[from_currency].rate, 8))
+    return {
+        "base": FX_BOOK.base,
+        "currencies": currencies,
+        # Row i, column j is the price of currencies[i] in currencies[j]
+        "rates": rates,
+        "last_refreshed": {
+            currency: leg.last_refreshed
+            for currency, leg in legs.items()
+            if leg.last_refreshed
+        },
+        "derived": True,
+        "missing": missing,
+    }
 
 
 @instrument_tool("fx_intraday")
@@ -1443,24 +2302,18 @@ async def fetch_sma(
         "apikey": API_KEY,
     }
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(API_BASE_URL, params=https_params)
-        response.raise_for_status()
+    full_response = await _make_api_request(https_params, datatype)
 
-        if datatype == "csv":
-            return response.text
-
-        # For JSON responses, apply response limiting to prevent token issues
-        full_response = response.json()
-
-        # Import response limiting utilities
-        from .response_utils import limit_time_series_response, should_limit_response
+    if datatype == "csv":
+        return full_response
 
-        # Check if response should be limited
-        if should_limit_response(full_response):
-            return limit_time_series_response(full_response, max_data_points)
+    # For JSON responses, apply response limiting to prevent token issues
+    from .response_utils import apply_response_limit
 
-        return full_response
+    with time_phase("postprocess"):
+        return await run_for_payload(
+            full_response, apply_response_limit, full_response, max_data_points
+        )
 
 
 @instrument_tool("ema")
@@ -0,0 +1,287 @@
+"""
+Cross-process coordination for multi-worker HTTP serving.
+
+The supervisor process runs a Coordinator on a Unix domain socket. Worker
+processes connect with a CoordinatorClient and share through it:
+
+- the upstream rate-limit budget, held by a single RateLimiter, and
+- the response cache, a single ResponseCache of raw upstream bodies,
+
+so adding workers does not multiply upstream quota use. Each worker keeps its
+own in-process ResponseCache in front of the shared one.
+
+Every frame is an 8-byte prefix holding the lengths of a JSON header and of a
+raw body, followed by both. Bodies carry cached upstream responses verbatim,
+so the coordinator never parses them.
+"""
+
+import asyncio
+import json
+import logging
+import struct
+import time
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from .offload import decode_json
+from .rate_limit import RateLimiter
+from .response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+_PREFIX = struct.Struct("!II")
+
+
+def _encode_frame(header: Dict[str, Any], body: bytes = b"") -> bytes:
+    encoded = json.dumps(header).encode()
+    return _PREFIX.pack(len(encoded), len(body)) + encoded + body
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[Dict[str, Any], bytes]:
+    header_size, body_size = _PREFIX.unpack(await reader.readexactly(_PREFIX.size))
+    header = json.loads(await reader.readexactly(header_size))
+    body = await reader.readexactly(body_size) if body_size else b""
+    return header, body
+
+
+class Coordinator:
+    """
+    Shared rate limiter and response cache served to worker processes.
+
+    Args:
+        rate_limiter: Upstream budget shared by all workers
+        cache: Cache of (datatype, body, expires_at) entries
+    """
+
+    def __init__(self, rate_limiter: RateLimiter, cache: ResponseCache):
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    async def start(self, path: str) -> None:
+        """Listen for workers on a Unix domain socket."""
+        self._server = await asyncio.start_unix_server(
+            self._handle_connection, path=path
+        )
+
+    async def close(self) -> None:
+        """Stop accepting workers and close open connections."""
+        server, self._server = self._server, None
+        if server is None:
+            return
+        server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await server.wait_closed()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        write_lock = asyncio.Lock()
+        pending = set()
+        self._writers.add(writer)
+        try:
+            while True:
+                header, body = await _read_frame(reader)
+                # Requests are served concurrently; a rate-limit wait must not
+                # hold up cache lookups on the same connection
+                task = asyncio.create_task(
+                    self._dispatch(header, body, writer, write_lock)
+                )
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for task in pending:
+                task.cancel()
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _dispatch(
+        self,
+        header: Dict[str, Any],
+        body: bytes,
+        writer: asyncio.StreamWriter,
+        write_lock: asyncio.Lock,
+    ) -> None:
+        op = header.get("op")
+        reply: Dict[str, Any] = {"id": header.get("id")}
+        reply_body = b""
+
+        if op == "acquire":
+            reply["waited"] = await self.rate_limiter.acquire()
+        elif op == "get":
+            entry = self.cache.get(header["key"])
+            if entry is not None:
+                datatype, reply_body, expires_at = entry
+                reply["datatype"] = datatype
+                reply["ttl"] = max(0.0, expires_at - time.monotonic())
+        elif op == "set":
+            ttl = header.get("ttl", self.cache.ttl_seconds)
+            expires_at = time.monotonic() + ttl
+            self.cache.set(
+                header["key"], (header["datatype"], body, expires_at), ttl, len(body)
+            )
+        else:
+            reply["error"] = f"Unknown operation: {op}"
+
+        if reply["id"] is None:
+            return
+        async with write_lock:
+            writer.write(_encode_frame(reply, reply_body))
+            await writer.drain()
+
+
+class CoordinatorClient:
+    """Connection from a worker process to the Coordinator."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 1
+
+    async def connect(self) -> None:
+        """Open the connection; must be called on the loop that uses the client."""
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+        self._reader_task = asyncio.create_task(self._read_replies())
+
+    async def close(self) -> None:
+        """Close the connection and fail outstanding requests."""
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+        self._fail_pending(ConnectionError("Coordinator connection closed"))
+
+    async def request(
+        self, header: Dict[str, Any], body: bytes = b""
+    ) -> Tuple[Dict[str, Any], bytes]:
+        """Send a request and wait for its reply."""
+        if self._writer is None:
+            raise ConnectionError("Coordinator connection closed")
+        request_id = self._next_id
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(_encode_frame({**header, "id": request_id}, body))
+        try:
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    def send(self, header: Dict[str, Any], body: bytes = b"") -> None:
+        """Send a request without waiting for a reply."""
+        if self._writer is not None:
+            self._writer.write(_encode_frame(header, body))
+
+    async def _read_replies(self) -> None:
+        try:
+            while True:
+                header, body = await _read_frame(self._reader)
+                future = self._pending.get(header.get("id"))
+                if future is not None and not future.done():
+                    future.set_result((header, body))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            logger.error(f"Lost connection to coordinator: {e}")
+            # Later requests fail at once instead of waiting for no reply
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                writer.close()
+            self._fail_pending(ConnectionError("Coordinator connection lost"))
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+
+class SharedRateLimiter:
+    """
+    RateLimiter drawing on the budget held by the coordinator.
+
+    Should the coordinator be lost, the worker keeps serving under its
+    fallback limiter, normally its own share of the budget.
+    """
+
+    def __init__(self, client: CoordinatorClient, fallback: RateLimiter):
+        self.client = client
+        self.fallback = fallback
+        self._lost = False
+
+    @property
+    def enabled(self) -> bool:
+        return True
+
+    async def acquire(self) -> float:
+        """
+        Wait for permission to send one request.
+
+        Returns:
+            Seconds spent waiting
+        """
+        start = time.perf_counter()
+        try:
+            await self.client.request({"op": "acquire"})
+        except ConnectionError:
+            if not self._lost:
+                self._lost = True
+                logger.warning(
+                    "Coordinator lost; limiting upstream requests to "
+                    f"{self.fallback.requests_per_minute:g}/min in this worker"
+                )
+            await self.fallback.acquire()
+        return time.perf_counter() - start
+
+
+class SharedResponseCache:
+    """Response cache held by the coordinator, storing raw upstream bodies."""
+
+    def __init__(self, client: CoordinatorClient):
+        self.client = client
+
+    @staticmethod
+    def _key(key: Hashable) -> str:
+        return json.dumps(key)
+
+    async def get(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """
+        Look up a response cached by any worker.
+
+        Returns:
+            (parsed response, remaining TTL in seconds, body size in bytes), or
+            None on a miss
+        """
+        try:
+            header, body = await self.client.request(
+                {"op": "get", "key": self._key(key)}
+            )
+        except ConnectionError:
+            # Fall back to this worker's own cache
+            return None
+        if "datatype" not in header:
+            return None
+        if header["datatype"] == "csv":
+            value = body.decode()
+        else:
+            value = await decode_json(body)
+        return value, header["ttl"], len(body)
+
+    def set(
+        self, key: Hashable, body: bytes, datatype: str, ttl: Optional[float] = None
+    ) -> None:
+        """Share a raw upstream response body with the other workers."""
+        header = {"op": "set", "key": self._key(key), "datatype": datatype}
+        if ttl is not None:
+            header["ttl"] = ttl
+        self.client.send(header, body)
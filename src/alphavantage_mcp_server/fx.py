@@ -0,0 +1,184 @@
+"""
+Currency cross rates triangulated through a base currency.
+
+Quoting every pair of N currencies takes N * (N - 1) exchange rate requests,
+while their rates against one base currency take N - 1. The FxRateBook keeps
+the latest rate of each currency against the base, its leg, and derives any
+cross from two legs: EUR/JPY is USD/JPY divided by USD/EUR. Bids and asks are
+crossed so that the spread widens, as it would when trading both legs.
+
+A leg is used for as long as it is fresh, counted from when it was received;
+a leg served from the response cache may be older by up to its TTL. Derived
+rates are marked as such in the response.
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+QUOTE_KEY = "Realtime Currency Exchange Rate"
+
+
+@dataclass
+class Leg:
+    """Rate of a currency against the base, in units of it per base unit."""
+
+    rate: float
+    bid: Optional[float]
+    ask: Optional[float]
+    name: str
+    last_refreshed: str
+    received_at: float
+
+
+def _price(quote: Dict[str, str], field: str) -> Optional[float]:
+    try:
+        price = float(quote[field])
+    except (KeyError, TypeError, ValueError):
+        # Upstream sends "-" when a side is not quoted
+        return None
+    return price if price > 0 else None
+
+
+def _format(price: Optional[float]) -> str:
+    return f"{price:.8f}" if price is not None else "-"
+
+
+class FxRateBook:
+    """
+    Latest rates of currencies against a base currency, and their crosses.
+
+    Args:
+        base: Currency the legs are quoted against
+        max_age_seconds: Seconds a leg stays fresh (0 disables the book)
+    """
+
+    def __init__(self, base: str = "USD", max_age_seconds: float = 5.0):
+        self.base = base.upper()
+        self.max_age_seconds = max_age_seconds
+        self._legs: Dict[str, Leg] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_age_seconds > 0
+
+    def record(self, payload: Any) -> bool:
+        """
+        Keep the leg quoted by a CURRENCY_EXCHANGE_RATE response.
+
+        Returns whether the response quoted a currency against the base, in
+        either direction.
+        """
+        if not self.enabled or not isinstance(payload, dict):
+            return False
+        quote = payload.get(QUOTE_KEY)
+        if not isinstance(quote, dict) or "Derived" in payload:
+            return False
+        from_currency = str(quote.get("1. From_Currency Code", "")).upper()
+        to_currency = str(quote.get("3. To_Currency Code", "")).upper()
+        rate = _price(quote, "5. Exchange Rate")
+        if rate is None or from_currency == to_currency:
+            return False
+        bid = _price(quote, "8. Bid Price")
+        ask = _price(quote, "9. Ask Price")
+        if from_currency == self.base:
+            currency, name = to_currency, quote.get("4. To_Currency Name")
+        elif to_currency == self.base:
+            # Inverted, the bid becomes the ask and the other way round
+            currency, name = from_currency, quote.get("2. From_Currency Name")
+            rate, bid, ask = 1 / rate, ask and 1 / ask, bid and 1 / bid
+        else:
+            return False
+        self._legs[currency] = Leg(
+            rate=rate,
+            bid=bid,
+            ask=ask,
+            name=name or currency,
+            last_refreshed=quote.get("6. Last Refreshed", ""),
+            received_at=time.monotonic(),
+        )
+        return True
+
+    def leg(self, currency: str) -> Optional[Leg]:
+        """The currency's fresh leg, or None if there is none."""
+        currency = currency.upper()
+        if currency == self.base:
+            return Leg(1.0, 1.0, 1.0, currency, "", time.monotonic())
+        leg = self._legs.get(currency)
+        if leg is None:
+            return None
+        if time.monotonic() - leg.received_at > self.max_age_seconds:
+            del self._legs[currency]
+            return None
+        return leg
+
+    def cross(self, from_currency: str, to_currency: str) -> Optional[Dict[str, Any]]:
+        """
+        Derive the CURRENCY_EXCHANGE_RATE response of a pair from its legs.
+
+        Returns None unless both currencies have fresh legs.
+        """
+        from_currency, to_currency = from_currency.upper(), to_currency.upper()
+        from_leg, to_leg = self.leg(from_currency), self.leg(to_currency)
+        if from_leg is None or to_leg is None:
+            return None
+        bid = ask = None
+        if to_leg.bid and from_leg.ask:
+            bid = to_leg.bid / from_leg.ask
+        if to_leg.ask and from_leg.bid:
+            ask = to_leg.ask / from_leg.bid
+        now = time.monotonic()
+        age = now - min(from_leg.received_at, to_leg.received_at)
+        return {
+            QUOTE_KEY: {
+                "1. From_Currency Code": from_currency,
+                "2. From_Currency Name": from_leg.name,
+                "3. To_Currency Code": to_currency,
+                "4. To_Currency Name": to_leg.name,
+                "5. Exchange Rate": _format(to_leg.rate / from_leg.rate),
+                "6. Last Refreshed": min(
+                    filter(None, (from_leg.last_refreshed, to_leg.last_refreshed)),
+                    default="",
+                ),
+                "7. Time Zone": "UTC",
+                "8. Bid Price": _format(bid),
+                "9. Ask Price": _format(ask),
+            },
+            "Derived": {
+                "1. Via Currency": self.base,
+                "2. Legs": [
+                    f"{self.base}/{from_currency}",
+                    f"{self.base}/{to_currency}",
+                ],
+                "3. Age Seconds": round(age, 3),
+            },
+        }
+
+    def rate(self, from_currency: str, to_currency: str) -> Optional[float]:
+        """Mid rate of a pair from its legs, or None unless both are fresh."""
+        from_leg, to_leg = self.leg(from_currency), self.leg(to_currency)
+        if from_leg is None or to_leg is None:
+            return None
+        return to_leg.rate / from_leg.rate
+
+    def clear(self) -> None:
+        """Forget all legs."""
+        self._legs.clear()
+
+
+def create_fx_book_from_env() -> FxRateBook:
+    """Create an FX rate book configured from environment variables."""
+    return FxRateBook(
+        base=os.getenv("ALPHAVANTAGE_FX_BASE_CURRENCY", "USD"),
+        # By default legs stay fresh as long as cached real-time quotes do
+        max_age_seconds=float(
+            os.getenv(
+                "ALPHAVANTAGE_FX_MAX_AGE",
+                os.getenv("ALPHAVANTAGE_CACHE_REALTIME_TTL", "5"),
+            )
+        ),
+    )
+
+
+__all__ = ["FxRateBook", "Leg", "create_fx_book_from_env"]
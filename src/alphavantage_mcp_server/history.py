@@ -0,0 +1,119 @@
+"""
+Long intraday histories assembled from month-by-month responses.
+
+TIME_SERIES_INTRADAY returns at most one month of full output per request,
+selected with the `month` parameter. A history spanning a date range is
+planned as the months it touches, and their responses are stitched into one
+columnar series: a list per field, oldest bar first, trimmed to the range.
+"""
+
+import calendar
+import os
+from datetime import date
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Environment variable configuration
+ALPHAVANTAGE_HISTORY_MAX_MONTHS = int(
+    os.getenv("ALPHAVANTAGE_HISTORY_MAX_MONTHS", "24")
+)
+ALPHAVANTAGE_HISTORY_CONCURRENCY = int(
+    os.getenv("ALPHAVANTAGE_HISTORY_CONCURRENCY", "4")
+)
+
+# Columns of a stitched series and the fields they come from
+COLUMNS = {
+    "open": "1. open",
+    "high": "2. high",
+    "low": "3. low",
+    "close": "4. close",
+}
+
+
+def parse_bounds(start: str, end: str) -> Tuple[str, str]:
+    """
+    Parse a history's date range.
+
+    Args:
+        start: First day, "YYYY-MM-DD", or first month, "YYYY-MM"
+        end: Last day, "YYYY-MM-DD", or last month, "YYYY-MM", included
+
+    Returns:
+        The first and last day as "YYYY-MM-DD"
+
+    Raises:
+        ValueError: If a bound is malformed or the range is empty
+    """
+    first = _parse_day(start, "start")
+    last = _parse_day(end, "end")
+    if len(end) == 7:
+        # The whole month
+        month_start = date.fromisoformat(last)
+        days = calendar.monthrange(month_start.year, month_start.month)[1]
+        last = month_start.replace(day=days).isoformat()
+    if last < first:
+        raise ValueError(f"end {end} is before start {start}")
+    return first, last
+
+
+def _parse_day(value: str, name: str) -> str:
+    try:
+        if len(value) == 7:
+            return date.fromisoformat(f"{value}-01").isoformat()
+        return date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise ValueError(
+            f"{name} must be YYYY-MM or YYYY-MM-DD, got {value!r}"
+        ) from None
+
+
+def plan_months(first: str, last: str) -> List[str]:
+    """Months ("YYYY-MM") from the first day's through the last day's."""
+    year, month = int(first[:4]), int(first[5:7])
+    last_month = last[:7]
+    months = []
+    while True:
+        current = f"{year:04d}-{month:02d}"
+        if current > last_month:
+            return months
+        months.append(current)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def stitch_columns(
+    payloads: Iterable[Dict[str, Any]], interval: str, first: str, last: str
+) -> Dict[str, List[Any]]:
+    """
+    Stitch monthly intraday responses into one columnar series.
+
+    Args:
+        payloads: Parsed TIME_SERIES_INTRADAY responses of the interval
+        interval: Interval of the responses, such as "1min"
+        first: First day kept, "YYYY-MM-DD"
+        last: Last day kept, "YYYY-MM-DD"
+
+    Returns:
+        "timestamp", "open", "high", "low", "close" and "volume" lists, oldest
+        bar first, with prices as floats and volumes as integers
+    """
+    series_key = f"Time Series ({interval})"
+    bars = {}
+    for payload in payloads:
+        bars.update(payload.get(series_key, {}))
+    # Timestamps start with the day, so they compare against days as strings
+    upper = f"{last} 99"
+    stamps = sorted(stamp for stamp in bars if first <= stamp < upper)
+
+    columns = {"timestamp": stamps}
+    for column, field in COLUMNS.items():
+        columns[column] = [float(bars[stamp][field]) for stamp in stamps]
+    columns["volume"] = [int(bars[stamp]["5. volume"]) for stamp in stamps]
+    return columns
+
+
+__all__ = [
+    "ALPHAVANTAGE_HISTORY_CONCURRENCY",
+    "ALPHAVANTAGE_HISTORY_MAX_MONTHS",
+    "parse_bounds",
+    "plan_months",
+    "stitch_columns",
+]
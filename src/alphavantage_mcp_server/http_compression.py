@@ -0,0 +1,283 @@
+"""
+Response compression for the Streamable HTTP transport.
+
+Tool results are indented JSON, often hundreds of kilobytes for full price
+histories, and compress about 6x. CompressionMiddleware negotiates zstd, br or
+gzip from the request's Accept-Encoding header and compresses response bodies
+at or above a size threshold as they are sent, so a streamed body is never
+held in full twice. A body sent in one piece that is large enough to offload
+(see offload.py) is compressed off the event loop.
+
+gzip is always available. br needs the brotli (or brotlicffi) package and zstd
+the zstandard package (pip install "alphavantage-mcp[compression]"); encodings
+whose package is missing are not offered.
+"""
+
+import gzip
+import os
+import zlib
+from typing import Callable, Dict, List, Optional
+
+from .offload import run_sized
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Environment variable configuration
+# Response size in bytes from which bodies are compressed (0 disables)
+MCP_COMPRESSION_THRESHOLD_BYTES = int(
+    os.getenv("MCP_COMPRESSION_THRESHOLD_BYTES", "1024")
+)
+# Encodings offered, in order of preference
+MCP_COMPRESSION_ENCODINGS = [
+    encoding.strip().lower()
+    for encoding in os.getenv("MCP_COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")
+    if encoding.strip()
+]
+
+# Levels favouring speed: responses are compressed on every request
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+
+class _StreamCompressor:
+    """Incremental compressor with a common compress/finish interface."""
+
+    def __init__(self, compress: Callable[[bytes], bytes], finish: Callable[[], bytes]):
+        self.compress = compress
+        self.finish = finish
+
+
+def _gzip_compressor() -> _StreamCompressor:
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return _StreamCompressor(compressor.compress, compressor.flush)
+
+
+def _brotli_compressor() -> _StreamCompressor:
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    return _StreamCompressor(compressor.process, compressor.finish)
+
+
+def _zstd_compressor() -> _StreamCompressor:
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    return _StreamCompressor(compressor.compress, compressor.flush)
+
+
+def available_encodings() -> Dict[str, Callable[[], _StreamCompressor]]:
+    """Compressor factories for the encodings usable in this installation."""
+    encodings = {"gzip": _gzip_compressor}
+    if brotli is not None:
+        encodings["br"] = _brotli_compressor
+    if zstandard is not None:
+        encodings["zstd"] = _zstd_compressor
+    return encodings
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    """Compress a whole body; a module-level function so it can be offloaded."""
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def select_encoding(accept_encoding: str, preferred: List[str]) -> Optional[str]:
+    """
+    Choose a content coding for a response.
+
+    Args:
+        accept_encoding: The request's Accept-Encoding header
+        preferred: Encodings the server offers, most preferred first
+
+    Returns:
+        The accepted encoding with the highest client quality, ties going to
+        the server's preference, or None to send the body as is
+    """
+    accepted = _parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in preferred:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing HTTP response bodies.
+
+    Args:
+        app: ASGI application to wrap
+        threshold: Body size in bytes from which responses are compressed
+                   (0 disables compression)
+        encodings: Encodings to offer, most preferred first; those whose
+                   package is not installed are skipped
+    """
+
+    def __init__(
+        self,
+        app,
+        threshold: int = MCP_COMPRESSION_THRESHOLD_BYTES,
+        encodings: Optional[List[str]] = None,
+    ):
+        self.app = app
+        self.threshold = threshold
+        self.factories = available_encodings()
+        self.encodings = [
+            encoding
+            for encoding in (encodings or MCP_COMPRESSION_ENCODINGS)
+            if encoding in self.factories
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.threshold or not self.encodings:
+            return await self.app(scope, receive, send)
+
+        accept_encoding = ""
+        for name, value in scope.get("headers", []):
+            if name.lower() == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = select_encoding(accept_encoding, self.encodings)
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        responder = _CompressingResponder(
+            send, encoding, self.factories[encoding], self.threshold
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """Wraps the ASGI send callable of one response."""
+
+    def __init__(
+        self,
+        send,
+        encoding: str,
+        factory: Callable[[], _StreamCompressor],
+        threshold: int,
+    ):
+        self._send = send
+        self.encoding = encoding
+        self.factory = factory
+        self.threshold = threshold
+        self._start: Optional[dict] = None
+        # None until the first body message decides whether to compress
+        self._compressor: Optional[_StreamCompressor] = None
+        self._passthrough = False
+
+    async def send(self, message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self._start = message
+            for name, value in message.get("headers", []):
+                name = name.lower()
+                # Compressors hold back output, which would delay SSE events
+                if name == b"content-encoding" or (
+                    name == b"content-type" and value.startswith(b"text/event-stream")
+                ):
+                    self._passthrough = True
+            return
+        if message_type != "http.response.body":
+            return await self._send(message)
+        if self._passthrough:
+            return await self._flush_start_and_send(message)
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._compressor is None:
+            if not more_body:
+                # Whole body in one message: the common case for JSON responses
+                if len(body) < self.threshold:
+                    self._passthrough = True
+                    return await self._flush_start_and_send(message)
+                compressed = await run_sized(len(body), compress, self.encoding, body)
+                await self._send_start(len(compressed))
+                return await self._send(
+                    {"type": "http.response.body", "body": compressed}
+                )
+
+            content_length = self._content_length()
+            if content_length is not None and content_length < self.threshold:
+                self._passthrough = True
+                return await self._flush_start_and_send(message)
+            self._compressor = self.factory()
+            await self._send_start(None)
+
+        chunk = self._compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self._compressor.finish()
+        if chunk or not more_body:
+            await self._send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+    def _content_length(self) -> Optional[int]:
+        for name, value in self._start.get("headers", []):
+            if name.lower() == b"content-length":
+                return int(value)
+        return None
+
+    async def _send_start(self, content_length: Optional[int]) -> None:
+        headers, vary = [], [b"Accept-Encoding"]
+        for name, value in self._start.get("headers", []):
+            if name.lower() == b"vary":
+                vary.insert(0, value)
+            elif name.lower() != b"content-length":
+                headers.append((name, value))
+        headers.append((b"content-encoding", self.encoding.encode()))
+        headers.append((b"vary", b", ".join(vary)))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode()))
+        await self._send({**self._start, "headers": headers})
+        self._start = None
+
+    async def _flush_start_and_send(self, message) -> None:
+        if self._start is not None:
+            start, self._start = self._start, None
+            await self._send(start)
+        await self._send(message)
+
+
+__all__ = [
+    "CompressionMiddleware",
+    "available_encodings",
+    "compress",
+    "select_encoding",
+]
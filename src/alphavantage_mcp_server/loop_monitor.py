@@ -0,0 +1,143 @@
+"""
+Event Loop Monitor Module
+
+Measures event loop lag: how late a timer fires compared with when it was
+scheduled. Lag means a callback held the loop thread, stalling every
+concurrent MCP session. The lag is exported as the mcp_event_loop_lag_seconds
+histogram.
+
+In debug mode (MCP_LOOP_DEBUG=true) a watchdog thread also pings the loop and,
+when a ping goes unanswered for longer than the block threshold, logs the
+stack of the code blocking the loop while it is still running.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import traceback
+from typing import Optional
+
+from . import telemetry_bootstrap
+from .telemetry_bootstrap import MCP_SERVER_NAME, MCP_SERVER_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopMonitor:
+    """
+    Periodically measures the lag of the running event loop.
+
+    Args:
+        interval: Seconds between lag measurements
+        block_threshold: Seconds the loop may be blocked before the watchdog
+                         logs the blocking stack (debug mode only)
+        debug: Whether to run the watchdog thread
+    """
+
+    def __init__(
+        self, interval: float = 0.5, block_threshold: float = 0.1, debug: bool = False
+    ):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.debug = debug
+        self.max_lag = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether lag is measured at all."""
+        return self.interval > 0
+
+    def start(self) -> None:
+        """Start monitoring the running event loop. Must be called on that loop."""
+        if not self.enabled or self._task is not None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+        self._task = self._loop.create_task(
+            self._measure_lag(), name="event-loop-monitor"
+        )
+
+        if self.debug:
+            self._watchdog = threading.Thread(
+                target=self._watch, name="event-loop-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Stop monitoring."""
+        self._stopped.set()
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._watchdog = None
+
+    async def _measure_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        histogram = telemetry_bootstrap.MCP_LOOP_LAG
+        child = (
+            histogram.labels(server=MCP_SERVER_NAME, version=MCP_SERVER_VERSION)
+            if histogram is not None
+            else None
+        )
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - scheduled)
+            self.max_lag = max(self.max_lag, lag)
+            if child is not None:
+                child.observe(lag)
+
+    def _watch(self) -> None:
+        """Watchdog thread: log the loop thread's stack when it stops responding."""
+        while not self._stopped.is_set():
+            answered = threading.Event()
+            try:
+                self._loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                # Loop closed
+                return
+
+            if not answered.wait(self.block_threshold):
+                self._report_blocked()
+                # Report each stall once
+                while not answered.wait(self.block_threshold):
+                    if self._stopped.is_set():
+                        return
+
+            self._stopped.wait(self.block_threshold)
+
+    def _report_blocked(self) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = "".join(traceback.format_stack(frame))
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        where = f" in task {task.get_name()}" if task is not None else ""
+        logger.warning(
+            f"Event loop blocked for more than {self.block_threshold}s{where}:\n{stack}"
+        )
+
+
+def create_loop_monitor_from_env() -> EventLoopMonitor:
+    """Create an event loop monitor configured from environment variables."""
+    return EventLoopMonitor(
+        interval=float(os.getenv("MCP_LOOP_LAG_INTERVAL", "0.5")),
+        block_threshold=float(os.getenv("MCP_LOOP_BLOCK_THRESHOLD", "0.1")),
+        debug=os.getenv("MCP_LOOP_DEBUG", "false").lower() == "true",
+    )
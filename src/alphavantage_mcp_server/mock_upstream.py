@@ -0,0 +1,584 @@
+"""
+Local stand-in for the Alpha Vantage API.
+
+MockAlphaVantage is an ASGI app that replays recorded responses per
+`function`, so tools, benchmarks and load tests can run offline and
+reproducibly. Point the server at it with ALPHAVANTAGE_API_BASE_URL.
+
+Beyond replaying, it can:
+- serve `outputsize=full` histories by extending the recorded series back in
+  time to a configurable length, and honour `interval` and `month` on
+  intraday requests,
+- quote any currency pair for CURRENCY_EXCHANGE_RATE,
+- add latency, with optional jitter,
+- answer with the throttle note Alpha Vantage sends once the per-minute
+  budget is spent,
+- inject errors: HTTP 500s and "Error Message" responses.
+
+Recordings live in the recordings/ directory as <FUNCTION>.json. To refresh
+them from the live API:
+
+    ALPHAVANTAGE_API_KEY=<key> python -m alphavantage_mcp_server.mock_upstream record
+
+To serve them:
+
+    ALPHAVANTAGE_API_KEY=demo python -m alphavantage_mcp_server.mock_upstream \\
+        --port 8900 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import calendar
+import collections
+import csv
+import io
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+RECORDINGS_DIR = Path(__file__).parent / "recordings"
+
+THROTTLE_NOTE = (
+    "Thank you for using Alpha Vantage! Please consider spreading out your free "
+    "API requests more sparingly (1 request per second). You may subscribe to "
+    "any of the premium plans at https://www.alphavantage.co/premium/ to lift "
+    "the free key rate limit (25 requests per day), raise the per-second burst "
+    "limit, and instantly unlock all premium endpoints"
+)
+
+ERROR_KINDS = ("server_error", "invalid_call")
+
+# Calls made by `record`: (file name, query parameters)
+RECORDED_CALLS = [
+    ("GLOBAL_QUOTE", {"function": "GLOBAL_QUOTE", "symbol": "IBM"}),
+    ("TIME_SERIES_DAILY", {"function": "TIME_SERIES_DAILY", "symbol": "IBM"}),
+    (
+        "TIME_SERIES_DAILY_ADJUSTED",
+        {"function": "TIME_SERIES_DAILY_ADJUSTED", "symbol": "IBM"},
+    ),
+    (
+        "TIME_SERIES_INTRADAY",
+        {"function": "TIME_SERIES_INTRADAY", "symbol": "IBM", "interval": "1min"},
+    ),
+    ("TIME_SERIES_WEEKLY", {"function": "TIME_SERIES_WEEKLY", "symbol": "IBM"}),
+    ("TIME_SERIES_MONTHLY", {"function": "TIME_SERIES_MONTHLY", "symbol": "IBM"}),
+    (
+        "SMA",
+        {
+            "function": "SMA",
+            "symbol": "IBM",
+            "interval": "daily",
+            "time_period": "10",
+            "series_type": "close",
+        },
+    ),
+    ("HISTORICAL_OPTIONS", {"function": "HISTORICAL_OPTIONS", "symbol": "IBM"}),
+    ("NEWS_SENTIMENT", {"function": "NEWS_SENTIMENT", "tickers": "IBM"}),
+    ("SYMBOL_SEARCH", {"function": "SYMBOL_SEARCH", "keywords": "IBM"}),
+    (
+        "CURRENCY_EXCHANGE_RATE",
+        {
+            "function": "CURRENCY_EXCHANGE_RATE",
+            "from_currency": "USD",
+            "to_currency": "JPY",
+        },
+    ),
+    (
+        "FX_DAILY",
+        {"function": "FX_DAILY", "from_symbol": "EUR", "to_symbol": "USD"},
+    ),
+    ("SPLITS", {"function": "SPLITS", "symbol": "IBM"}),
+    ("DIVIDENDS", {"function": "DIVIDENDS", "symbol": "IBM"}),
+]
+
+_INTRADAY_FUNCTIONS = {"TIME_SERIES_INTRADAY", "FX_INTRADAY", "CRYPTO_INTRADAY"}
+_LIST_KEYS = ("data", "feed")
+# Extended trading hours covered by intraday series, US/Eastern
+_SESSION_START = 4 * 60
+_SESSION_END = 20 * 60
+# Units per US dollar quoted for CURRENCY_EXCHANGE_RATE; others quote at par
+_USD_RATES = {
+    "USD": 1.0,
+    "EUR": 0.92165,
+    "GBP": 0.78495,
+    "JPY": 157.26,
+    "CHF": 0.90245,
+    "CAD": 1.36345,
+}
+
+
+def _series_key(payload: Dict[str, Any]) -> Optional[str]:
+    for key, value in payload.items():
+        if key != "Meta Data" and isinstance(value, dict) and len(value) > 1:
+            return key
+    return None
+
+
+def _previous_business_day(day: date) -> date:
+    day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+def _month_end(day: date) -> date:
+    last = day.replace(day=calendar.monthrange(day.year, day.month)[1])
+    while last.weekday() >= 5:
+        last -= timedelta(days=1)
+    return last
+
+
+def _date_steps(latest: date, average_days: float, count: int) -> Iterable[str]:
+    """Dates going back from latest, daily, weekly or monthly."""
+    day = latest
+    for _ in range(count):
+        yield day.isoformat()
+        if average_days < 3:
+            day = _previous_business_day(day)
+        elif average_days < 10:
+            day -= timedelta(weeks=1)
+        else:
+            day = _month_end(day.replace(day=1) - timedelta(days=1))
+
+
+def _minute_steps(latest: datetime, minutes: int, count: int) -> Iterable[str]:
+    """Intraday timestamps going back from latest, within trading sessions."""
+    stamp = latest
+    for _ in range(count):
+        yield stamp.strftime("%Y-%m-%d %H:%M:%S")
+        stamp -= timedelta(minutes=minutes)
+        minute_of_day = stamp.hour * 60 + stamp.minute
+        if minute_of_day < _SESSION_START or stamp.weekday() >= 5:
+            day = _previous_business_day(stamp.date())
+            last_bar = _SESSION_END - minutes
+            stamp = datetime(day.year, day.month, day.day) + timedelta(minutes=last_bar)
+
+
+def _interval_minutes(interval: str) -> Optional[int]:
+    if interval.endswith("min") and interval[:-3].isdigit():
+        return int(interval[:-3])
+    return None
+
+
+def reshape_series(
+    payload: Dict[str, Any],
+    count: Optional[int] = None,
+    interval: Optional[str] = None,
+    month: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Re-time a recorded series, optionally lengthening it.
+
+    Recorded bars are reused in order, cycling when more are needed, under
+    timestamps that continue the recording's spacing back in time.
+
+    Args:
+        payload: Recorded response holding one series
+        count: Number of entries to return (default: as recorded)
+        interval: Intraday interval to relabel the series with, e.g. "5min"
+        month: "YYYY-MM" to place an intraday series within that month
+    """
+    key = _series_key(payload)
+    if key is None:
+        return payload
+    recorded = payload[key]
+    stamps = list(recorded)
+    values = list(recorded.values())
+    count = count or len(values)
+    latest = stamps[0]
+
+    if len(latest) == 10:
+        first = date.fromisoformat(latest)
+        average_days = (first - date.fromisoformat(stamps[-1])).days / max(
+            1, len(stamps) - 1
+        )
+        new_stamps = _date_steps(first, average_days, count)
+    else:
+        first = datetime.fromisoformat(latest)
+        minutes = _interval_minutes(interval or "")
+        if minutes is None and len(stamps) > 1:
+            spacing = first - datetime.fromisoformat(stamps[1])
+            minutes = max(1, int(spacing.total_seconds() // 60))
+        minutes = minutes or 1
+        if month or interval:
+            # Start from the last bar of the session, aligned to the interval
+            last_day = first.date()
+            if month:
+                year, month_number = map(int, month.split("-"))
+                last_day = _month_end(date(year, month_number, 1))
+            first = datetime(last_day.year, last_day.month, last_day.day) + timedelta(
+                minutes=_SESSION_END - minutes
+            )
+        new_stamps = _minute_steps(first, minutes, count)
+        if interval:
+            meta = payload.get("Meta Data", {})
+            payload = {
+                **payload,
+                "Meta Data": {
+                    name: interval if name.endswith("Interval") else value
+                    for name, value in meta.items()
+                },
+            }
+            del payload[key]
+            key = f"{key.split('(')[0]}({interval})"
+
+    series = {}
+    for index, stamp in enumerate(new_stamps):
+        if month and not stamp.startswith(month):
+            break
+        series[stamp] = values[index % len(values)]
+    return {**payload, key: series}
+
+
+def resize_list(payload: Dict[str, Any], count: int) -> Dict[str, Any]:
+    """Repeat the entries of a list-shaped response (options, news) to count."""
+    for key in _LIST_KEYS:
+        items = payload.get(key)
+        if isinstance(items, list) and items:
+            resized = [items[index % len(items)] for index in range(count)]
+            return {**payload, key: resized}
+    return payload
+
+
+def quote_exchange_rate(
+    payload: Dict[str, Any], from_currency: str, to_currency: str
+) -> Dict[str, Any]:
+    """Re-quote a CURRENCY_EXCHANGE_RATE response for another currency pair."""
+    quote = dict(payload["Realtime Currency Exchange Rate"])
+    rate = _USD_RATES.get(to_currency, 1.0) / _USD_RATES.get(from_currency, 1.0)
+    half_spread = rate * 0.00002
+    quote.update(
+        {
+            "1. From_Currency Code": from_currency,
+            "2. From_Currency Name": from_currency,
+            "3. To_Currency Code": to_currency,
+            "4. To_Currency Name": to_currency,
+            "5. Exchange Rate": f"{rate:.8f}",
+            "8. Bid Price": f"{rate - half_spread:.8f}",
+            "9. Ask Price": f"{rate + half_spread:.8f}",
+        }
+    )
+    return {"Realtime Currency Exchange Rate": quote}
+
+
+def to_csv(payload: Dict[str, Any]) -> str:
+    """Render a series or list response the way datatype=csv does."""
+    key = _series_key(payload)
+    rows: List[Dict[str, Any]] = []
+    if key is not None:
+        for stamp, fields in payload[key].items():
+            row = {"timestamp": stamp}
+            for name, value in fields.items():
+                row[name.split(". ", 1)[-1].replace(" ", "_")] = value
+            rows.append(row)
+    else:
+        for list_key in _LIST_KEYS:
+            if isinstance(payload.get(list_key), list):
+                rows = payload[list_key]
+                break
+    if not rows:
+        return ""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=list(rows[0]), lineterminator="\r\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    return output.getvalue()
+
+
+class MockAlphaVantage:
+    """
+    ASGI app replaying recorded Alpha Vantage responses.
+
+    Args:
+        recordings_dir: Directory holding <FUNCTION>.json recordings
+        latency: Seconds added before every response
+        jitter: Upper bound of extra random latency in seconds
+        throttle_per_minute: Requests per minute after which the throttle note
+                             is returned (0 = never)
+        error_rate: Fraction of requests answered with an injected error
+        error_kinds: Injected errors to choose from, see ERROR_KINDS
+        full_size: Entries in a series requested with outputsize=full
+        list_size: Entries in list responses (options, news) (default: as recorded)
+        seed: Seed for jitter and error injection
+    """
+
+    def __init__(
+        self,
+        recordings_dir: Path = RECORDINGS_DIR,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        throttle_per_minute: int = 0,
+        error_rate: float = 0.0,
+        error_kinds: Tuple[str, ...] = ERROR_KINDS,
+        full_size: int = 5000,
+        list_size: Optional[int] = None,
+        seed: Optional[int] = None,
+    ):
+        self.recordings_dir = Path(recordings_dir)
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_per_minute = throttle_per_minute
+        self.error_rate = error_rate
+        self.error_kinds = error_kinds
+        self.full_size = full_size
+        self.list_size = list_size
+        self.requests: collections.Counter = collections.Counter()
+        self._random = random.Random(seed)
+        self._recent: collections.deque = collections.deque()
+        self._recordings: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._bodies: Dict[Tuple, Tuple[bytes, str]] = {}
+
+    def _recording(self, function: str) -> Optional[Dict[str, Any]]:
+        if function not in self._recordings:
+            path = self.recordings_dir / f"{function}.json"
+            self._recordings[function] = (
+                json.loads(path.read_text()) if path.is_file() else None
+            )
+        return self._recordings[function]
+
+    def _throttled(self) -> bool:
+        if not self.throttle_per_minute:
+            return False
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] >= 60:
+            self._recent.popleft()
+        if len(self._recent) >= self.throttle_per_minute:
+            return True
+        self._recent.append(now)
+        return False
+
+    def body_for(self, params: Dict[str, str]) -> Tuple[bytes, str]:
+        """Response body and content type for a query, built once per variant."""
+        function = params.get("function", "")
+        datatype = params.get("datatype") or "json"
+        outputsize = params.get("outputsize") or "compact"
+        interval = params.get("interval") or ""
+        month = params.get("month") or ""
+        pair = (params.get("from_currency") or "", params.get("to_currency") or "")
+        variant = (function, datatype, outputsize, interval, month, pair)
+        if variant in self._bodies:
+            return self._bodies[variant]
+
+        payload = self._recording(function)
+        if payload is None:
+            payload = {
+                "Error Message": "Invalid API call. Please retry or visit the "
+                "documentation (https://www.alphavantage.co/documentation/) "
+                f"for {function}."
+            }
+        else:
+            if function in _INTRADAY_FUNCTIONS:
+                if month and outputsize == "full":
+                    # The whole month; the series stops at the month's start
+                    count = 31 * (_SESSION_END - _SESSION_START)
+                else:
+                    count = self.full_size if outputsize == "full" else None
+                payload = reshape_series(
+                    payload, count, interval or None, month or None
+                )
+            elif function == "CURRENCY_EXCHANGE_RATE" and all(pair):
+                payload = quote_exchange_rate(payload, pair[0].upper(), pair[1].upper())
+            elif outputsize == "full":
+                payload = reshape_series(payload, self.full_size)
+            if self.list_size:
+                payload = resize_list(payload, self.list_size)
+
+        if datatype == "csv" and "Error Message" not in payload:
+            body = (to_csv(payload).encode(), "application/x-download")
+        else:
+            body = (json.dumps(payload, indent=4).encode(), "application/json")
+        self._bodies[variant] = body
+        return body
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        query = parse_qs(scope.get("query_string", b"").decode())
+        params = {name: values[0] for name, values in query.items()}
+        function = params.get("function", "")
+        self.requests[function] += 1
+
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        status, content_type = 200, "application/json"
+        if self.error_rate and self._random.random() < self.error_rate:
+            kind = self._random.choice(self.error_kinds)
+            if kind == "server_error":
+                status, body, content_type = 500, b"Internal Server Error", "text/plain"
+            else:
+                body = json.dumps(
+                    {"Error Message": f"Invalid API call for {function}."}
+                ).encode()
+        elif self._throttled():
+            body = json.dumps({"Information": THROTTLE_NOTE}).encode()
+        elif not params.get("apikey"):
+            body = json.dumps(
+                {
+                    "Error Message": "the parameter apikey is invalid or missing. "
+                    "Please claim your free API key on "
+                    "(https://www.alphavantage.co/support/#api-key)."
+                }
+            ).encode()
+        else:
+            body, content_type = self.body_for(params)
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", content_type.encode()),
+                    (b"content-length", str(len(body)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+class MockUpstreamServer:
+    """
+    Serves a MockAlphaVantage app with uvicorn from a background thread.
+
+    Usable as a context manager; `url` is the value for API_BASE_URL.
+    """
+
+    def __init__(
+        self,
+        app: Optional[MockAlphaVantage] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.app = app or MockAlphaVantage()
+        self.host = host
+        self.port = port
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/query"
+
+    def start(self) -> "MockUpstreamServer":
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Inherited by accepted connections; without it Nagle's algorithm and
+        # delayed ACKs add ~40 ms to small responses written in two parts
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+
+        config = uvicorn.Config(
+            self.app, log_level="warning", lifespan="off", access_log=False
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(
+            target=self._server.run,
+            kwargs={"sockets": [sock]},
+            name="mock-alphavantage",
+            daemon=True,
+        )
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("Mock Alpha Vantage server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=10)
+            self._server = None
+            self._thread = None
+
+    def __enter__(self) -> "MockUpstreamServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def record(output_dir: Path, api_key: str, base_url: str) -> None:
+    """Save live responses for RECORDED_CALLS as recordings."""
+    import httpx
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with httpx.Client(timeout=60) as client:
+        for name, params in RECORDED_CALLS:
+            response = client.get(base_url, params={**params, "apikey": api_key})
+            response.raise_for_status()
+            payload = response.json()
+            if "Error Message" in payload or "Information" in payload:
+                logger.warning(f"Skipping {name}: {payload}")
+                continue
+            path = output_dir / f"{name}.json"
+            path.write_text(json.dumps(payload, indent=4) + "\n")
+            logger.info(f"Recorded {path}")
+            # Stay within the free tier's burst limit
+            time.sleep(1.5)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local Alpha Vantage stand-in")
+    parser.add_argument("command", nargs="?", choices=["serve", "record"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--recordings", type=Path, default=RECORDINGS_DIR)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--throttle-per-minute", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--full-size", type=int, default=5000)
+    parser.add_argument("--list-size", type=int)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "record":
+        record(
+            args.recordings,
+            os.environ["ALPHAVANTAGE_API_KEY"],
+            "https://www.alphavantage.co/query",
+        )
+        return
+
+    app = MockAlphaVantage(
+        recordings_dir=args.recordings,
+        latency=args.latency,
+        jitter=args.jitter,
+        throttle_per_minute=args.throttle_per_minute,
+        error_rate=args.error_rate,
+        full_size=args.full_size,
+        list_size=args.list_size,
+        seed=args.seed,
+    )
+    logger.info(f"Serving recordings on http://{args.host}:{args.port}/query")
+    uvicorn.run(app, host=args.host, port=args.port, lifespan="off")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ OAuth that works with any compliant OAuth 2.1 authorization server.
 Key features:
 - OAuth 2.0 Protected Resource Metadata (RFC 9728)
 - Access token validation (JWT and introspection)
+- JWKS discovery with cached, rotating verification keys
 - WWW-Authenticate header handling
 - Configuration-driven authorization server discovery
 - MCP Security Best Practices compliance
@@ -19,17 +20,24 @@ Security Features:
 - Proper error handling with OAuth-compliant responses
 """
 
+import asyncio
+import functools
+import hashlib
 import logging
 import secrets
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, Union
-from urllib.parse import urljoin
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urljoin, urlsplit
 
 import httpx
 import jwt
 from starlette.requests import Request
 from starlette.responses import JSONResponse, Response
 
+from . import telemetry_bootstrap
+
 logger = logging.getLogger(__name__)
 
 
@@ -55,6 +63,15 @@ class OAuthConfig:
     jwt_algorithm: str = "RS256"
     """JWT signing algorithm"""
 
+    jwks_uri: Optional[str] = None
+    """JWKS endpoint; discovered from authorization server metadata if not set"""
+
+    jwks_refresh_interval: int = 3600
+    """Seconds after which cached JWKS keys are refreshed in the background"""
+
+    jwks_min_refresh_interval: int = 60
+    """Minimum seconds between JWKS fetches triggered by an unknown key ID"""
+
     introspection_endpoint: Optional[str] = None
     """Token introspection endpoint URL (RFC 7662)"""
 
@@ -76,6 +93,25 @@ class OAuthConfig:
     session_binding_enabled: bool = True
     """Enable user-specific session binding for security"""
 
+    session_max_count: int = 100_000
+    """Maximum number of sessions kept; the oldest are evicted first"""
+
+    session_max_age: int = 3600
+    """Session lifetime in seconds"""
+
+    session_cleanup_interval: int = 60
+    """Seconds between background sweeps of expired sessions"""
+
+    # Validated-token cache settings
+    token_cache_max_entries: int = 1024
+    """Maximum number of validation results kept in memory (0 disables the cache)"""
+
+    token_cache_max_ttl: int = 300
+    """Upper bound in seconds on how long a valid result is reused, even before exp"""
+
+    token_cache_negative_ttl: int = 5
+    """Seconds an invalid-token result is reused before the token is re-checked"""
+
     def __post_init__(self):
         """Validate configuration after initialization."""
         if not self.authorization_server_url:
@@ -84,7 +120,7 @@ class OAuthConfig:
             raise ValueError("resource_server_uri is required")
 
         if self.token_validation_method == "jwt" and not self.jwt_public_key:
-            logger.warning("JWT validation selected but no public key provided")
+            logger.info("No JWT public key provided, verification keys will use JWKS")
         elif (
             self.token_validation_method == "introspection"
             and not self.introspection_endpoint
@@ -142,6 +178,251 @@ class TokenValidationResult:
         return self.subject
 
 
+class TokenValidationCache:
+    """
+    Bounded cache of token validation results keyed by token hash.
+
+    Valid results are kept until the token's ``exp`` claim or ``max_ttl``,
+    whichever comes first; invalid results are kept for ``negative_ttl``.
+    Entries are evicted least-recently-used once ``max_entries`` is reached.
+    """
+
+    # Errors caused by the authorization server rather than the token itself
+    TRANSIENT_ERRORS = frozenset({"Introspection failed", "Token validation failed"})
+
+    def __init__(
+        self, max_entries: int = 1024, max_ttl: float = 300, negative_ttl: float = 5
+    ):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[str, Tuple[float, TokenValidationResult]]" = (
+            OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(token: str) -> str:
+        """Hash a token so raw credentials are never kept as cache keys."""
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, key: str) -> Optional[TokenValidationResult]:
+        """Return the cached result for key, or None if absent or expired."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, result = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self._record("hit")
+                return result
+            del self._entries[key]
+
+        self._record("miss")
+        return None
+
+    def set(self, key: str, result: TokenValidationResult) -> None:
+        """Store a validation result with an expiry derived from the token."""
+        if self.max_entries <= 0:
+            return
+
+        now = time.time()
+        if result.valid:
+            expires_at = now + self.max_ttl
+            token_exp = result.claims.get("exp")
+            if isinstance(token_exp, (int, float)):
+                expires_at = min(expires_at, float(token_exp))
+        elif result.error in self.TRANSIENT_ERRORS:
+            return
+        else:
+            expires_at = now + self.negative_ttl
+
+        if expires_at <= now:
+            return
+
+        self._entries[key] = (expires_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        """Return cache size and hit statistics."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._entries.clear()
+
+    def _record(self, outcome: str) -> None:
+        if outcome == "hit":
+            self.hits += 1
+        else:
+            self.misses += 1
+        if telemetry_bootstrap.MCP_TOKEN_CACHE:
+            telemetry_bootstrap.MCP_TOKEN_CACHE.labels(result=outcome).inc()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class JWKSCache:
+    """
+    Verification keys from the authorization server's JWKS, keyed by ``kid``.
+
+    Keys are parsed once when fetched and reused for every validation. The set
+    is refreshed in the background once it is older than ``refresh_interval``,
+    and on demand when a token names an unknown ``kid``. On-demand fetches,
+    including retries before the first key set has loaded, happen at most once
+    every ``min_refresh_interval`` seconds, so forged key IDs or a failing
+    JWKS endpoint cannot make tokens flood the authorization server.
+    """
+
+    # Metadata documents that may advertise a jwks_uri
+    METADATA_PATHS = (
+        "/.well-known/oauth-authorization-server",
+        "/.well-known/openid-configuration",
+    )
+
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        authorization_server_url: str,
+        jwks_uri: Optional[str] = None,
+        default_algorithm: str = "RS256",
+        refresh_interval: float = 3600,
+        min_refresh_interval: float = 60,
+    ):
+        self._http_client = http_client
+        self.authorization_server_url = authorization_server_url.rstrip("/")
+        self.jwks_uri = jwks_uri
+        self.default_algorithm = default_algorithm
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._fetched_at: Optional[float] = None
+        self._last_attempt: Optional[float] = None
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def metadata_urls(self) -> List[str]:
+        """
+        Candidate metadata URLs for the authorization server.
+
+        RFC 8414 inserts the well-known path between host and issuer path;
+        OpenID Connect Discovery appends it to the issuer.
+        """
+        parts = urlsplit(self.authorization_server_url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        urls = []
+        for path in self.METADATA_PATHS:
+            urls.append(f"{origin}{path}{parts.path}")
+            urls.append(f"{self.authorization_server_url}{path}")
+        return list(dict.fromkeys(urls))
+
+    async def get_signing_key(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        """Return the parsed key for kid, refreshing the key set if needed."""
+        if self._fetched_at is None:
+            # Until a key set has loaded, retries are throttled like refreshes
+            # for unknown key IDs, so a failing server is not flooded
+            if self._may_refresh():
+                await self.refresh()
+        elif time.monotonic() - self._fetched_at > self.refresh_interval:
+            self._schedule_refresh()
+
+        key = self._lookup(kid)
+        if key is None and self._may_refresh():
+            logger.info(f"Unknown JWT key ID {kid!r}, refreshing JWKS")
+            await self.refresh()
+            key = self._lookup(kid)
+        return key
+
+    async def refresh(self) -> None:
+        """Fetch and parse the key set, keeping the old keys on failure."""
+        requested_at = time.monotonic()
+        async with self._refresh_lock:
+            if self._last_attempt is not None and self._last_attempt >= requested_at:
+                # Another caller refreshed while we were waiting for the lock
+                return
+            self._last_attempt = time.monotonic()
+
+            try:
+                jwks_uri = await self._resolve_jwks_uri()
+                response = await self._http_client.get(jwks_uri)
+                response.raise_for_status()
+                self._keys = self._parse_keys(response.json())
+                self._fetched_at = time.monotonic()
+                logger.debug(f"Loaded {len(self._keys)} JWKS keys from {jwks_uri}")
+            except Exception as e:
+                logger.error(f"Failed to refresh JWKS: {e}")
+
+    async def close(self) -> None:
+        """Cancel any background refresh in progress."""
+        if self._refresh_task and not self._refresh_task.done():
+            self._refresh_task.cancel()
+
+    def _lookup(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        if kid is not None:
+            return self._keys.get(kid)
+        # Tokens without a kid are only accepted when the choice is unambiguous
+        if len(self._keys) == 1:
+            return next(iter(self._keys.values()))
+        return None
+
+    def _may_refresh(self) -> bool:
+        return (
+            self._last_attempt is None
+            or time.monotonic() - self._last_attempt >= self.min_refresh_interval
+        )
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_task is None or self._refresh_task.done():
+            if self._may_refresh():
+                self._refresh_task = asyncio.create_task(self.refresh())
+
+    async def _resolve_jwks_uri(self) -> str:
+        if self.jwks_uri:
+            return self.jwks_uri
+
+        for url in self.metadata_urls():
+            try:
+                response = await self._http_client.get(url)
+                if response.status_code == 200:
+                    jwks_uri = response.json().get("jwks_uri")
+                    if jwks_uri:
+                        self.jwks_uri = jwks_uri
+                        return jwks_uri
+            except (httpx.HTTPError, ValueError) as e:
+                logger.debug(f"Metadata discovery failed for {url}: {e}")
+
+        raise OAuthError("server_error", "Could not discover jwks_uri", 500)
+
+    def _parse_keys(self, jwks: Dict[str, Any]) -> Dict[str, jwt.PyJWK]:
+        keys = {}
+        for jwk_data in jwks.get("keys", []):
+            if jwk_data.get("use", "sig") != "sig":
+                continue
+            try:
+                # An explicit "alg" on the key wins over the configured default
+                algorithm = jwk_data.get("alg", self.default_algorithm)
+                key = jwt.PyJWK(jwk_data, algorithm=algorithm)
+            except (jwt.PyJWKError, jwt.InvalidKeyError) as e:
+                logger.debug(f"Skipping unusable JWK {jwk_data.get('kid')}: {e}")
+                continue
+            keys[key.key_id or ""] = key
+        return keys
+
+
 class SecureSessionManager:
     """
     Secure session management following MCP security best practices.
@@ -150,10 +431,25 @@ class SecureSessionManager:
     - Secure, non-deterministic session IDs
     - User-specific session binding
     - Session validation
+    - Bounded, self-expiring session storage
+
+    Sessions are kept in creation order. Since every session has the same
+    lifetime, that is also expiry order: expired sessions are always at the
+    front, so cleanup and eviction only touch the entries they remove.
     """
 
-    def __init__(self):
-        self._sessions: Dict[str, Dict] = {}
+    def __init__(self, max_sessions: int = 100_000, max_age_seconds: int = 3600):
+        self.max_sessions = max_sessions
+        self.max_age_seconds = max_age_seconds
+        # session_id -> (user_id, created_at on the monotonic clock)
+        self._sessions: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._cleanup_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _user_hash(user_id: str) -> str:
+        """Hash a user_id for binding (not reversible)."""
+        return hashlib.sha256(user_id.encode()).hexdigest()[:16]
 
     def generate_session_id(self, user_id: str) -> str:
         """
@@ -161,22 +457,16 @@ class SecureSessionManager:
 
         Format: <user_id_hash>:<secure_random_token>
         This prevents session hijacking by binding sessions to users.
+        When the store is full, the oldest session is evicted.
         """
         # Generate cryptographically secure random token
         secure_token = secrets.token_urlsafe(32)
-
-        # Create a hash of user_id for binding (not reversible)
-        import hashlib
-
-        user_hash = hashlib.sha256(user_id.encode()).hexdigest()[:16]
-
-        session_id = f"{user_hash}:{secure_token}"
+        session_id = f"{self._user_hash(user_id)}:{secure_token}"
 
         # Store session metadata
-        self._sessions[session_id] = {
-            "user_id": user_id,
-            "created_at": __import__("time").time(),
-        }
+        self._sessions[session_id] = (user_id, time.monotonic())
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
 
         logger.debug(f"Generated secure session ID for user: {user_id}")
         return session_id
@@ -185,37 +475,96 @@ class SecureSessionManager:
         """
         Validate that a session ID belongs to the specified user.
 
-        This prevents session hijacking attacks.
+        This prevents session hijacking attacks. Expired sessions are removed
+        and rejected even if the periodic cleanup has not run yet.
         """
-        if not session_id or session_id not in self._sessions:
+        if not session_id:
             return False
 
-        session_data = self._sessions[session_id]
-        return session_data.get("user_id") == user_id
+        session = self._sessions.get(session_id)
+        if session is None:
+            return False
 
-    def cleanup_expired_sessions(self, max_age_seconds: int = 3600):
-        """Clean up expired sessions."""
-        current_time = __import__("time").time()
-        expired_sessions = [
-            sid
-            for sid, data in self._sessions.items()
-            if current_time - data.get("created_at", 0) > max_age_seconds
-        ]
+        session_user_id, created_at = session
+        if time.monotonic() - created_at > self.max_age_seconds:
+            del self._sessions[session_id]
+            return False
+        return session_user_id == user_id
 
-        for sid in expired_sessions:
-            del self._sessions[sid]
+    def cleanup_expired_sessions(self, max_age_seconds: int = None) -> int:
+        """
+        Clean up expired sessions.
 
-        if expired_sessions:
-            logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
+        Returns:
+            Number of sessions removed
+        """
+        max_age = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        cutoff = time.monotonic() - max_age
+
+        removed = 0
+        while self._sessions:
+            _, (_, created_at) = next(iter(self._sessions.items()))
+            if created_at >= cutoff:
+                break
+            self._sessions.popitem(last=False)
+            removed += 1
+
+        if removed:
+            logger.info(f"Cleaned up {removed} expired sessions")
+        return removed
+
+    def start_periodic_cleanup(self, interval_seconds: float = 60) -> None:
+        """Start a background task that removes expired sessions periodically."""
+        if self._cleanup_task is not None and not self._cleanup_task.done():
+            return
+
+        async def cleanup_loop():
+            while True:
+                await asyncio.sleep(interval_seconds)
+                self.cleanup_expired_sessions()
+
+        self._cleanup_task = asyncio.create_task(cleanup_loop())
+
+    async def stop_periodic_cleanup(self) -> None:
+        """Stop the periodic cleanup task, if running."""
+        task, self._cleanup_task = self._cleanup_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def __len__(self) -> int:
+        return len(self._sessions)
 
 
 class OAuthResourceServer:
     """OAuth 2.1 Resource Server implementation for MCP."""
 
-    def __init__(self, config: OAuthConfig):
+    def __init__(
+        self, config: OAuthConfig, http_client: Optional[httpx.AsyncClient] = None
+    ):
         self.config = config
-        self.session_manager = SecureSessionManager()
-        self._http_client = httpx.AsyncClient()
+        self.session_manager = SecureSessionManager(
+            max_sessions=config.session_max_count,
+            max_age_seconds=config.session_max_age,
+        )
+        self.token_cache = TokenValidationCache(
+            max_entries=config.token_cache_max_entries,
+            max_ttl=config.token_cache_max_ttl,
+            negative_ttl=config.token_cache_negative_ttl,
+        )
+        self._http_client = http_client or httpx.AsyncClient()
+        self._jwt_key = None
+        self.jwks_cache = JWKSCache(
+            self._http_client,
+            config.authorization_server_url,
+            jwks_uri=config.jwks_uri,
+            default_algorithm=config.jwt_algorithm,
+            refresh_interval=config.jwks_refresh_interval,
+            min_refresh_interval=config.jwks_min_refresh_interval,
+        )
         logger.info(
             f"Initialized OAuth resource server for {config.resource_server_uri}"
         )
@@ -261,18 +610,46 @@ class OAuthResourceServer:
             return None
         return auth_header[7:]  # Remove "Bearer " prefix
 
+    def get_jwt_verification_key(self):
+        """
+        Get the JWT verification key, parsing the configured PEM only once.
+
+        Passing the parsed key object to jwt.decode avoids re-parsing the PEM
+        on every validation.
+        """
+        if self._jwt_key is None and self.config.jwt_public_key:
+            # Keys passed through environment variables often carry literal "\n"
+            pem = self.config.jwt_public_key.replace("\\n", "\n")
+            algorithm = jwt.get_algorithm_by_name(self.config.jwt_algorithm)
+            self._jwt_key = algorithm.prepare_key(pem)
+        return self._jwt_key
+
     async def validate_jwt_token(self, token: str) -> TokenValidationResult:
-        """Validate JWT access token with audience validation."""
-        if not self.config.jwt_public_key:
-            return TokenValidationResult(False, error="JWT public key not configured")
+        """
+        Validate JWT access token with audience validation.
 
+        Uses the configured static public key if there is one, otherwise the
+        key named by the token's kid from the authorization server's JWKS.
+        """
         try:
+            if self.config.jwt_public_key:
+                key = self.get_jwt_verification_key()
+                algorithm = self.config.jwt_algorithm
+            else:
+                kid = jwt.get_unverified_header(token).get("kid")
+                signing_key = await self.jwks_cache.get_signing_key(kid)
+                if signing_key is None:
+                    logger.warning(f"Token validation failed: Unknown key ID {kid!r}")
+                    return TokenValidationResult(False, error="Unknown signing key")
+                key = signing_key.key
+                algorithm = signing_key.algorithm_name
+
             # Decode and verify JWT with strict audience validation
             # This prevents token passthrough attacks (MCP Security Best Practice)
             claims = jwt.decode(
                 token,
-                self.config.jwt_public_key,
-                algorithms=[self.config.jwt_algorithm],
+                key,
+                algorithms=[algorithm],
                 audience=self.config.resource_server_uri,  # Strict audience validation
                 options={"verify_aud": True},  # Ensure audience is verified
             )
@@ -358,7 +735,26 @@ class OAuthResourceServer:
             return TokenValidationResult(False, error="Introspection failed")
 
     async def validate_access_token(self, token: str) -> TokenValidationResult:
-        """Validate access token using configured method."""
+        """
+        Validate access token using configured method.
+
+        Results are cached by token hash (see TokenValidationCache), so a
+        repeated token costs a dict lookup instead of a signature check or an
+        introspection round trip to the authorization server.
+        """
+        cache_key = self.token_cache.make_key(token)
+        cached_result = self.token_cache.get(cache_key)
+        if cached_result is not None:
+            return cached_result
+
+        result = await self._validate_access_token_uncached(token)
+        self.token_cache.set(cache_key, result)
+        return result
+
+    async def _validate_access_token_uncached(
+        self, token: str
+    ) -> TokenValidationResult:
+        """Validate access token using configured method, bypassing the cache."""
         if self.config.token_validation_method == "jwt":
             result = await self.validate_jwt_token(token)
         elif self.config.token_validation_method == "introspection":
@@ -445,8 +841,16 @@ class OAuthResourceServer:
         """Generate a secure session ID for a user."""
         return self.session_manager.generate_session_id(user_id)
 
+    def start(self):
+        """Start background maintenance tasks; call from the running event loop."""
+        self.session_manager.start_periodic_cleanup(
+            self.config.session_cleanup_interval
+        )
+
     async def cleanup(self):
         """Cleanup resources."""
+        await self.session_manager.stop_periodic_cleanup()
+        await self.jwks_cache.close()
         await self._http_client.aclose()
         self.session_manager.cleanup_expired_sessions()
 
@@ -468,6 +872,11 @@ def create_oauth_config_from_env() -> Optional[OAuthConfig]:
         token_validation_method=os.getenv("OAUTH_TOKEN_VALIDATION_METHOD", "jwt"),
         jwt_public_key=os.getenv("OAUTH_JWT_PUBLIC_KEY"),
         jwt_algorithm=os.getenv("OAUTH_JWT_ALGORITHM", "RS256"),
+        jwks_uri=os.getenv("OAUTH_JWKS_URI"),
+        jwks_refresh_interval=int(os.getenv("OAUTH_JWKS_REFRESH_INTERVAL", "3600")),
+        jwks_min_refresh_interval=int(
+            os.getenv("OAUTH_JWKS_MIN_REFRESH_INTERVAL", "60")
+        ),
         introspection_endpoint=os.getenv("OAUTH_INTROSPECTION_ENDPOINT"),
         introspection_client_id=os.getenv("OAUTH_INTROSPECTION_CLIENT_ID"),
         introspection_client_secret=os.getenv("OAUTH_INTROSPECTION_CLIENT_SECRET"),
@@ -478,4 +887,10 @@ def create_oauth_config_from_env() -> Optional[OAuthConfig]:
             "OAUTH_SESSION_BINDING_ENABLED", "true"
         ).lower()
         == "true",
+        session_max_count=int(os.getenv("OAUTH_SESSION_MAX_COUNT", "100000")),
+        session_max_age=int(os.getenv("OAUTH_SESSION_MAX_AGE", "3600")),
+        session_cleanup_interval=int(os.getenv("OAUTH_SESSION_CLEANUP_INTERVAL", "60")),
+        token_cache_max_entries=int(os.getenv("OAUTH_TOKEN_CACHE_MAX_ENTRIES", "1024")),
+        token_cache_max_ttl=int(os.getenv("OAUTH_TOKEN_CACHE_TTL", "300")),
+        token_cache_negative_ttl=int(os.getenv("OAUTH_TOKEN_CACHE_NEGATIVE_TTL", "5")),
     )
@@ -0,0 +1,107 @@
+"""
+Offloading of large payload processing from the event loop.
+
+Decoding, post-processing and encoding a multi-megabyte response takes tens
+to hundreds of milliseconds of CPU, during which no other MCP session can make
+progress. Payloads at or above a size threshold are processed in a worker
+pool instead; smaller ones stay inline, where the hop would cost more than it
+saves.
+
+The default thread pool shares the GIL with the event loop, so the work is
+arranged to run Python bytecode regularly: the interpreter then hands the GIL
+back to the loop thread every switch interval. json.dumps with indent already
+uses the pure-Python encoder; decoding passes a Python object_hook for the same
+reason. A process pool avoids GIL contention entirely at the cost of pickling
+payloads on the loop thread, and is not available on AWS Lambda.
+"""
+
+import asyncio
+import functools
+import json
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from .telemetry_instrument import _get_size_bytes
+
+T = TypeVar("T")
+
+# Payload size in bytes from which work leaves the event loop (0 disables)
+OFFLOAD_THRESHOLD_BYTES = int(
+    os.getenv("ALPHAVANTAGE_OFFLOAD_THRESHOLD_BYTES", str(512 * 1024))
+)
+OFFLOAD_WORKERS = int(os.getenv("ALPHAVANTAGE_OFFLOAD_WORKERS", "4"))
+# "thread" or "process"
+OFFLOAD_EXECUTOR = os.getenv("ALPHAVANTAGE_OFFLOAD_EXECUTOR", "thread").lower()
+
+_executor: Optional[Executor] = None
+
+
+def should_offload(size: int) -> bool:
+    """Whether a payload of this many bytes is processed off the event loop."""
+    return 0 < OFFLOAD_THRESHOLD_BYTES <= size
+
+
+def _get_executor() -> Executor:
+    global _executor
+
+    if _executor is None:
+        if OFFLOAD_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=OFFLOAD_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(
+                max_workers=OFFLOAD_WORKERS, thread_name_prefix="alphavantage-offload"
+            )
+    return _executor
+
+
+async def run_sized(size: int, func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Call func inline for small payloads and in the worker pool for large ones.
+
+    Args:
+        size: Size of the payload func processes, in bytes
+        func: Module-level function to call (it may run in another process);
+              it must not touch event loop state
+    """
+    if not should_offload(size):
+        return func(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+async def run_for_payload(payload: Any, func: Callable[..., T], *args, **kwargs) -> T:
+    """Like run_sized, with the size estimated from a parsed payload."""
+    return await run_sized(_get_size_bytes(payload), func, *args, **kwargs)
+
+
+def _keep_object(obj: dict) -> dict:
+    return obj
+
+
+def _loads_yielding(body: bytes) -> Any:
+    # The Python-level hook runs between objects and lets the GIL switch
+    return json.loads(body, object_hook=_keep_object)
+
+
+async def decode_json(body: bytes) -> Any:
+    """Parse a JSON response body, off the event loop if it is large."""
+    if should_offload(len(body)):
+        return await run_sized(len(body), _loads_yielding, body)
+    return json.loads(body)
+
+
+async def encode_json(payload: Any) -> str:
+    """Serialize a tool result as indented JSON, off the event loop if large."""
+    return await run_for_payload(payload, json.dumps, payload, indent=2)
+
+
+def shutdown_executor() -> None:
+    """Stop the workers; a new pool is created on next use."""
+    global _executor
+
+    executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,317 @@
+"""
+Sampling Profiler Module
+
+An opt-in, timed stack-sampling profiler for the event loop thread, served at
+/debug/profile next to the Prometheus metrics when MCP_PROFILER_ENABLED is
+set. The metrics server listens on loopback only, and the endpoint also
+refuses requests from any other address.
+
+Query parameters:
+    seconds: Profile duration (default 10, at most 60)
+    hz: Samples per second (default 100, at most 1000)
+    format: "collapsed" (default) for flamegraph.pl / speedscope input, or
+            "json" for a report of the asyncio tasks that held the loop
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from socketserver import ThreadingMixIn
+from types import FrameType
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from prometheus_client import make_wsgi_app
+
+logger = logging.getLogger(__name__)
+
+# Environment variable configuration
+MCP_PROFILER_ENABLED = os.getenv("MCP_PROFILER_ENABLED", "false").lower() == "true"
+
+PROFILE_PATH = "/debug/profile"
+
+_MAX_SECONDS = 60.0
+_MAX_HZ = 1000
+_MAX_DEPTH = 128
+_LOOPBACK_ADDRS = frozenset({"127.0.0.1", "::1", "::ffff:127.0.0.1"})
+
+# Root frame of samples taken while the loop waits for I/O
+IDLE = "(idle)"
+# Root frame of samples taken while the loop runs a callback outside any task
+NO_TASK = "(no task)"
+
+# Event loop being profiled and the thread running it
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread_id: Optional[int] = None
+
+# Only one profile runs at a time
+_profile_lock = threading.Lock()
+
+
+def attach_event_loop(loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    """
+    Select the event loop whose thread is profiled.
+
+    Must be called from the thread running the loop. Without a loop argument
+    the running loop is used; outside a loop only the calling thread's stacks
+    are sampled, without task attribution.
+    """
+    global _loop, _loop_thread_id
+
+    if loop is None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+    _loop = loop
+    _loop_thread_id = threading.get_ident()
+
+
+@dataclass
+class TaskSamples:
+    """Samples attributed to one asyncio task."""
+
+    name: str
+    coro: str
+    samples: int = 0
+    longest_run: int = 0
+
+
+@dataclass
+class ProfileResult:
+    """Outcome of one profiling run."""
+
+    duration: float
+    interval: float
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+    tasks: Dict[int, TaskSamples] = field(default_factory=dict)
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed format, one "root;frame;...;leaf count" per line."""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Summary of the run, listing the tasks that kept the loop busy.
+
+        A task's longest_blocking_seconds is its longest run of consecutive
+        samples: time during which no other task or callback could run.
+        """
+        idle = sum(
+            count for stack, count in self.stacks.items() if stack.startswith(IDLE)
+        )
+        tasks = sorted(self.tasks.values(), key=lambda t: t.samples, reverse=True)
+        return {
+            "duration_seconds": round(self.duration, 3),
+            "interval_seconds": self.interval,
+            "samples": self.samples,
+            "busy_samples": self.samples - idle,
+            "tasks": [
+                {
+                    "name": task.name,
+                    "coro": task.coro,
+                    "samples": task.samples,
+                    "cpu_seconds": round(task.samples * self.interval, 4),
+                    "longest_blocking_seconds": round(
+                        task.longest_run * self.interval, 4
+                    ),
+                }
+                for task in tasks
+            ],
+        }
+
+
+def _frame_label(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+def _is_idle(frame: FrameType) -> bool:
+    # The loop blocks in selectors (or the proactor on Windows) between events
+    filename = frame.f_code.co_filename
+    return filename.endswith(("selectors.py", "windows_events.py"))
+
+
+def _stack(frame: FrameType) -> List[str]:
+    stack = []
+    while frame is not None and len(stack) < _MAX_DEPTH:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _current_task(loop: Optional[asyncio.AbstractEventLoop]) -> Optional[asyncio.Task]:
+    if loop is None:
+        return None
+    try:
+        return asyncio.current_task(loop)
+    except RuntimeError:
+        return None
+
+
+def sample_thread(
+    thread_id: int,
+    seconds: float,
+    hz: float = 100,
+    loop: Optional[asyncio.AbstractEventLoop] = None,
+) -> ProfileResult:
+    """
+    Sample the stacks of one thread for a fixed duration.
+
+    Args:
+        thread_id: Identifier of the thread to sample
+        seconds: How long to sample for
+        hz: Samples per second
+        loop: Event loop run by the thread, used to attribute samples to tasks
+
+    Returns:
+        Collapsed stacks rooted at the running task, and per-task sample counts
+    """
+    interval = 1.0 / hz
+    result = ProfileResult(duration=seconds, interval=interval)
+    previous_task: Optional[int] = None
+    run = 0
+
+    start = time.perf_counter()
+    deadline = start + seconds
+    next_sample = start
+    while next_sample < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is None:
+            break
+        task = _current_task(loop)
+        result.samples += 1
+
+        if task is not None:
+            key = id(task)
+            entry = result.tasks.get(key)
+            if entry is None:
+                coro = task.get_coro()
+                entry = result.tasks[key] = TaskSamples(
+                    name=task.get_name(),
+                    coro=getattr(coro, "__qualname__", repr(coro)),
+                )
+            run = run + 1 if key == previous_task else 1
+            previous_task = key
+            entry.samples += 1
+            entry.longest_run = max(entry.longest_run, run)
+            result.stacks[";".join([f"task:{entry.name}", *_stack(frame)])] += 1
+        else:
+            previous_task, run = None, 0
+            if _is_idle(frame):
+                result.stacks[IDLE] += 1
+            else:
+                result.stacks[";".join([NO_TASK, *_stack(frame)])] += 1
+        del frame, task
+
+        next_sample += interval
+        time.sleep(max(0.0, next_sample - time.perf_counter()))
+
+    result.duration = time.perf_counter() - start
+    return result
+
+
+def _respond(start_response, status: str, body: bytes, content_type: str):
+    start_response(
+        status,
+        [("Content-Type", content_type), ("Content-Length", str(len(body)))],
+    )
+    return [body]
+
+
+def profile_app(environ, start_response):
+    """WSGI application serving one profiling run per request."""
+    if environ.get("REMOTE_ADDR") not in _LOOPBACK_ADDRS:
+        return _respond(start_response, "403 Forbidden", b"Forbidden", "text/plain")
+
+    query = parse_qs(environ.get("QUERY_STRING", ""))
+    try:
+        seconds = min(float(query.get("seconds", ["10"])[0]), _MAX_SECONDS)
+        hz = min(float(query.get("hz", ["100"])[0]), _MAX_HZ)
+        if seconds <= 0 or hz <= 0:
+            raise ValueError
+    except ValueError:
+        return _respond(
+            start_response,
+            "400 Bad Request",
+            b"seconds and hz must be positive numbers",
+            "text/plain",
+        )
+    output_format = query.get("format", ["collapsed"])[0]
+
+    if _loop_thread_id is None:
+        return _respond(
+            start_response,
+            "503 Service Unavailable",
+            b"No event loop attached",
+            "text/plain",
+        )
+
+    if not _profile_lock.acquire(blocking=False):
+        return _respond(
+            start_response,
+            "409 Conflict",
+            b"A profile is already running",
+            "text/plain",
+        )
+    try:
+        logger.info(f"Profiling event loop thread for {seconds}s at {hz} Hz")
+        result = sample_thread(_loop_thread_id, seconds, hz, _loop)
+    finally:
+        _profile_lock.release()
+
+    if output_format == "json":
+        body = json.dumps(result.to_dict(), indent=2).encode()
+        return _respond(start_response, "200 OK", body, "application/json")
+    return _respond(start_response, "200 OK", result.collapsed().encode(), "text/plain")
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    """Thread per request, so a running profile does not block scrapes."""
+
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, addr: str = "127.0.0.1"):
+    """
+    Serve Prometheus metrics and the profiler endpoint from one server.
+
+    Returns:
+        The running WSGI server; it serves from a daemon thread
+    """
+    metrics_app = make_wsgi_app()
+
+    def app(environ, start_response):
+        if environ.get("PATH_INFO") == PROFILE_PATH:
+            return profile_app(environ, start_response)
+        return metrics_app(environ, start_response)
+
+    httpd = make_server(
+        addr, port, app, _ThreadingWSGIServer, handler_class=_QuietHandler
+    )
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+__all__ = [
+    "attach_event_loop",
+    "profile_app",
+    "sample_thread",
+    "start_metrics_server",
+]
@@ -0,0 +1,78 @@
+"""
+Rate limiting for Alpha Vantage API requests.
+
+Alpha Vantage enforces a per-key request quota. The limiter below spaces
+upstream requests so the server stays under a configured budget instead of
+receiving throttle notes, and reports how long each request had to wait.
+"""
+
+import asyncio
+import os
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Async token bucket limiting upstream requests per minute.
+
+    Waiters are served in arrival order. A limit of 0 disables limiting.
+    """
+
+    def __init__(self, requests_per_minute: float = 0, burst: Optional[int] = None):
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst or max(1, int(requests_per_minute // 60))
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether requests are limited at all."""
+        return self.requests_per_minute > 0
+
+    async def acquire(self) -> float:
+        """
+        Wait for permission to send one request.
+
+        Returns:
+            Seconds spent waiting
+        """
+        if not self.enabled:
+            return 0.0
+
+        start = time.perf_counter()
+        async with self._get_lock():
+            self._refill()
+            if self._tokens < 1:
+                rate = self.requests_per_minute / 60
+                await asyncio.sleep((1 - self._tokens) / rate)
+                self._refill()
+            self._tokens -= 1
+        return time.perf_counter() - start
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(
+            float(self.burst), self._tokens + elapsed * self.requests_per_minute / 60
+        )
+
+    def _get_lock(self) -> asyncio.Lock:
+        # Locks cannot be shared between event loops
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+
+def create_rate_limiter_from_env() -> RateLimiter:
+    """Create a rate limiter configured from environment variables."""
+    burst = os.getenv("ALPHAVANTAGE_RATE_LIMIT_BURST")
+    return RateLimiter(
+        requests_per_minute=float(os.getenv("ALPHAVANTAGE_RATE_LIMIT_PER_MINUTE", "0")),
+        burst=int(burst) if burst else None,
+    )
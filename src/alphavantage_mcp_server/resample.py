@@ -0,0 +1,354 @@
+"""
+Coarser series resampled from finer bars already at hand.
+
+TIME_SERIES_WEEKLY, TIME_SERIES_MONTHLY and their adjusted variants are
+aggregations of the daily series, and intraday series of one interval are
+aggregations of any finer one. When the finer bars are already at hand the
+coarser series are derived locally instead of costing an upstream request.
+
+Periods follow Alpha Vantage's conventions. Each weekly or monthly period is
+keyed by its last trading day, and the current, unfinished period is
+included. Intraday bars are keyed by their start time, on multiples of the
+interval from midnight. Open and close come from the first and last bar, high
+and low are the extremes, and volume and dividends are summed. Adjusted series
+carry the last day's adjusted close. Prices keep the finer series' strings,
+so they are formatted as upstream formats them. Periods are grouped and
+aggregated column-wise with NumPy when the analytics extra is installed.
+"""
+
+import os
+from datetime import date
+from itertools import groupby
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Environment variable configuration
+ALPHAVANTAGE_LOCAL_RESAMPLING = (
+    os.getenv("ALPHAVANTAGE_LOCAL_RESAMPLING", "true").lower() == "true"
+)
+
+DAILY_SERIES_KEY = "Time Series (Daily)"
+
+
+def _week_of(day: str):
+    # Day 1 of the proleptic calendar was a Monday
+    return (date.fromisoformat(day).toordinal() - 1) // 7
+
+
+def _month_of(day: str):
+    return day[:7]
+
+
+# Period name as Alpha Vantage spells it, and the key grouping days into it
+PERIODS: Dict[str, Tuple[str, Callable[[str], Any]]] = {
+    "weekly": ("Weekly", _week_of),
+    "monthly": ("Monthly", _month_of),
+}
+
+
+def _weeks_of(days: "numpy.ndarray") -> "numpy.ndarray":
+    # 1970-01-01, day 0 of datetime64, was a Thursday
+    return (days.astype(numpy.int64) + 3) // 7
+
+
+def _months_of(days: "numpy.ndarray") -> "numpy.ndarray":
+    return days.astype("datetime64[M]")
+
+
+# PERIODS' grouping keys over an array of datetime64[D] days
+_PERIOD_KEYS_NUMPY = {"weekly": _weeks_of, "monthly": _months_of}
+
+
+def _aggregate(
+    bars: List[Dict[str, str]], volume_field: str, adjusted: bool
+) -> Dict[str, str]:
+    volume = sum(int(bar[volume_field]) for bar in bars)
+    aggregated = {
+        "1. open": bars[0]["1. open"],
+        "2. high": max((bar["2. high"] for bar in bars), key=float),
+        "3. low": min((bar["3. low"] for bar in bars), key=float),
+        "4. close": bars[-1]["4. close"],
+    }
+    if adjusted:
+        dividends = sum(float(bar["7. dividend amount"]) for bar in bars)
+        aggregated["5. adjusted close"] = bars[-1]["5. adjusted close"]
+        aggregated["6. volume"] = str(volume)
+        aggregated["7. dividend amount"] = f"{dividends:.4f}"
+    else:
+        aggregated["5. volume"] = str(volume)
+    return aggregated
+
+
+def _group_starts(keys: "numpy.ndarray") -> "numpy.ndarray":
+    """Index of the first bar of each run of equal keys."""
+    return numpy.flatnonzero(numpy.r_[True, keys[1:] != keys[:-1]])
+
+
+def _aggregate_numpy(
+    bars: List[Dict[str, str]],
+    starts: "numpy.ndarray",
+    volume_field: str,
+    adjusted: bool,
+) -> List[Dict[str, str]]:
+    """_aggregate() over consecutive groups of bars, beginning at starts."""
+    sizes = numpy.diff(numpy.append(starts, len(bars)))
+    group = numpy.repeat(numpy.arange(len(starts)), sizes)
+    lasts = (starts + sizes - 1).tolist()
+
+    def extremes(field: str, reduce: "numpy.ufunc") -> List[int]:
+        values = numpy.array([bar[field] for bar in bars], dtype=float)
+        # The first bar reaching each group's extreme, as max() and min() pick
+        hits = numpy.flatnonzero(values == reduce.reduceat(values, starts)[group])
+        _, first = numpy.unique(group[hits], return_index=True)
+        return hits[first].tolist()
+
+    highs = extremes("2. high", numpy.maximum)
+    lows = extremes("3. low", numpy.minimum)
+    volumes = numpy.add.reduceat(
+        numpy.array([bar[volume_field] for bar in bars], dtype=numpy.int64), starts
+    ).tolist()
+    if adjusted:
+        dividends = numpy.add.reduceat(
+            numpy.array([bar["7. dividend amount"] for bar in bars], dtype=float),
+            starts,
+        ).tolist()
+
+    aggregated = []
+    for i, (first, last) in enumerate(zip(starts.tolist(), lasts)):
+        values = {
+            "1. open": bars[first]["1. open"],
+            "2. high": bars[highs[i]]["2. high"],
+            "3. low": bars[lows[i]]["3. low"],
+            "4. close": bars[last]["4. close"],
+        }
+        if adjusted:
+            values["5. adjusted close"] = bars[last]["5. adjusted close"]
+            values["6. volume"] = str(volumes[i])
+            values["7. dividend amount"] = f"{dividends[i]:.4f}"
+        else:
+            values["5. volume"] = str(volumes[i])
+        aggregated.append(values)
+    return aggregated
+
+
+def _resample_numpy(
+    days: List[str],
+    bars: List[Dict[str, str]],
+    period: str,
+    volume_field: str,
+    adjusted: bool,
+) -> Dict[str, Dict[str, str]]:
+    keys = _PERIOD_KEYS_NUMPY[period](numpy.array(days, dtype="datetime64[D]"))
+    starts = _group_starts(keys)
+    lasts = numpy.append(starts[1:], len(days)) - 1
+    aggregated = _aggregate_numpy(bars, starts, volume_field, adjusted)
+    return dict(zip((days[last] for last in lasts.tolist()), aggregated))
+
+
+def _resample_python(
+    days: List[str],
+    bars: List[Dict[str, str]],
+    period: str,
+    volume_field: str,
+    adjusted: bool,
+) -> Dict[str, Dict[str, str]]:
+    _, period_of = PERIODS[period]
+    resampled = {}
+    for _, group in groupby(zip(days, bars), key=lambda pair: period_of(pair[0])):
+        group = list(group)
+        resampled[group[-1][0]] = _aggregate(
+            [bar for _, bar in group], volume_field, adjusted
+        )
+    return resampled
+
+
+def resample_daily(
+    payload: Any, period: str, adjusted: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    Resample a TIME_SERIES_DAILY(_ADJUSTED) response into a weekly or monthly one.
+
+    Args:
+        payload: Parsed daily response
+        period: "weekly" or "monthly"
+        adjusted: Produce the adjusted series, which needs daily adjusted bars
+
+    Returns:
+        The response Alpha Vantage gives for the weekly or monthly function,
+        or None if the payload does not hold the daily bars needed
+    """
+    if not isinstance(payload, dict):
+        return None
+    series = payload.get(DAILY_SERIES_KEY)
+    meta = payload.get("Meta Data")
+    if not isinstance(series, dict) or not series or not isinstance(meta, dict):
+        return None
+
+    daily_adjusted = "5. adjusted close" in next(iter(series.values()))
+    if adjusted and not daily_adjusted:
+        return None
+    volume_field = "6. volume" if daily_adjusted else "5. volume"
+    name, _ = PERIODS[period]
+
+    # ISO dates sort chronologically; upstream lists them newest first
+    days = sorted(series)
+    resample = _resample_numpy if numpy is not None else _resample_python
+    resampled = resample(
+        days, [series[day] for day in days], period, volume_field, adjusted
+    )
+
+    if adjusted:
+        information = f"{name} Adjusted Prices and Volumes"
+        series_key = f"{name} Adjusted Time Series"
+    else:
+        information = f"{name} Prices (open, high, low, close) and Volumes"
+        series_key = f"{name} Time Series"
+    return {
+        "Meta Data": {
+            "1. Information": information,
+            "2. Symbol": meta.get("2. Symbol"),
+            "3. Last Refreshed": meta.get("3. Last Refreshed"),
+            "4. Time Zone": meta.get("5. Time Zone", "US/Eastern"),
+        },
+        series_key: dict(reversed(resampled.items())),
+    }
+
+
+# Minutes per bar of the intraday intervals Alpha Vantage offers
+INTRADAY_INTERVALS = {"1min": 1, "5min": 5, "15min": 15, "30min": 30, "60min": 60}
+
+# Regular trading session, in minutes from midnight US/Eastern
+_REGULAR_OPEN = 9 * 60 + 30
+_REGULAR_CLOSE = 16 * 60
+
+# Bars in an outputsize=compact response
+COMPACT_SIZE = 100
+
+
+def _minute_of_day(stamp: str) -> int:
+    # Timestamps look like "2024-05-31 19:55:00"
+    return int(stamp[11:13]) * 60 + int(stamp[14:16])
+
+
+def _aggregate_intraday_numpy(
+    stamps: List[str],
+    bars: List[Dict[str, str]],
+    minutes: int,
+    extended_hours: bool,
+) -> Dict[str, Dict[str, str]]:
+    # Minutes since the epoch; every interval divides a day, so multiples of
+    # it from the epoch are multiples from each midnight as well
+    times = numpy.array(stamps, dtype="datetime64[m]").astype(numpy.int64)
+    if not extended_hours:
+        minute_of_day = times % (24 * 60)
+        regular = numpy.flatnonzero(
+            (minute_of_day >= _REGULAR_OPEN) & (minute_of_day < _REGULAR_CLOSE)
+        )
+        times = times[regular]
+        bars = [bars[i] for i in regular.tolist()]
+    if not bars:
+        return {}
+
+    buckets = times - times % minutes
+    starts = _group_starts(buckets)
+    labels = numpy.datetime_as_string(buckets[starts].astype("datetime64[m]"))
+    aggregated = _aggregate_numpy(bars, starts, "5. volume", False)
+    return {
+        f"{label[:10]} {label[11:]}:00": bar for label, bar in zip(labels, aggregated)
+    }
+
+
+def _aggregate_intraday_python(
+    stamps: List[str],
+    bars: List[Dict[str, str]],
+    minutes: int,
+    extended_hours: bool,
+) -> Dict[str, Dict[str, str]]:
+    def bucket_of(stamp: str) -> str:
+        minute = _minute_of_day(stamp)
+        minute -= minute % minutes
+        return f"{stamp[:10]} {minute // 60:02d}:{minute % 60:02d}:00"
+
+    pairs = zip(stamps, bars)
+    if not extended_hours:
+        pairs = (
+            (stamp, bar)
+            for stamp, bar in pairs
+            if _REGULAR_OPEN <= _minute_of_day(stamp) < _REGULAR_CLOSE
+        )
+
+    aggregated = {}
+    for bucket, group in groupby(pairs, key=lambda pair: bucket_of(pair[0])):
+        aggregated[bucket] = _aggregate([bar for _, bar in group], "5. volume", False)
+    return aggregated
+
+
+def aggregate_intraday(
+    payload: Any,
+    interval: str,
+    extended_hours: bool = True,
+    compact: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """
+    Aggregate a TIME_SERIES_INTRADAY response into a coarser interval.
+
+    Args:
+        payload: Parsed intraday response of an interval dividing the target
+        interval: Target interval, such as "15min"
+        extended_hours: Keep pre- and post-market bars; the payload must have
+                        been requested with extended hours for this
+        compact: Keep only the latest 100 bars, as outputsize=compact does
+
+    Returns:
+        The response Alpha Vantage gives for the target interval, or None if
+        the payload does not hold the bars needed
+    """
+    if not isinstance(payload, dict) or interval not in INTRADAY_INTERVALS:
+        return None
+    meta = payload.get("Meta Data")
+    if not isinstance(meta, dict):
+        return None
+    source = meta.get("4. Interval")
+    series = payload.get(f"Time Series ({source})")
+    if source not in INTRADAY_INTERVALS or not isinstance(series, dict):
+        return None
+    minutes = INTRADAY_INTERVALS[interval]
+    if minutes % INTRADAY_INTERVALS[source]:
+        return None
+
+    stamps = sorted(series)
+    aggregate = (
+        _aggregate_intraday_numpy if numpy is not None else _aggregate_intraday_python
+    )
+    aggregated = aggregate(
+        stamps, [series[stamp] for stamp in stamps], minutes, extended_hours
+    )
+    newest_first = list(reversed(aggregated.items()))
+    if compact:
+        newest_first = newest_first[:COMPACT_SIZE]
+
+    return {
+        "Meta Data": {
+            "1. Information": (
+                f"Intraday ({interval}) open, high, low, close prices and volume"
+            ),
+            "2. Symbol": meta.get("2. Symbol"),
+            "3. Last Refreshed": newest_first[0][0] if newest_first else None,
+            "4. Interval": interval,
+            "5. Output Size": "Compact" if compact else "Full size",
+            "6. Time Zone": meta.get("6. Time Zone", "US/Eastern"),
+        },
+        f"Time Series ({interval})": dict(newest_first),
+    }
+
+
+__all__ = [
+    "ALPHAVANTAGE_LOCAL_RESAMPLING",
+    "INTRADAY_INTERVALS",
+    "aggregate_intraday",
+    "resample_daily",
+]
@@ -0,0 +1,215 @@
+"""
+Response cache for Alpha Vantage API requests.
+
+A small, bounded, in-process TTL cache keyed by the upstream request parameters.
+It lives at module level so it survives across requests in long-lived servers
+and across warm invocations on AWS Lambda.
+
+How long a response stays fresh depends on what it holds. Real-time quotes,
+news and exchange rates are kept only briefly, full histories and reference
+data (corporate actions, fundamentals, past months) for long, so the local
+derivations built on them keep working, and everything else for the default
+TTL.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Parameters that never take part in the cache key
+_IGNORED_PARAMS = frozenset({"apikey"})
+
+# Top-level keys Alpha Vantage uses to report errors and throttling
+_UNCACHEABLE_KEYS = frozenset({"Error Message", "Note", "Information"})
+
+# Functions whose responses change from one moment to the next
+REALTIME_FUNCTIONS = frozenset(
+    {
+        "CURRENCY_EXCHANGE_RATE",
+        "GLOBAL_QUOTE",
+        "MARKET_STATUS",
+        "NEWS_SENTIMENT",
+        "REALTIME_BULK_QUOTES",
+        "REALTIME_OPTIONS",
+        "TOP_GAINERS_LOSERS",
+    }
+)
+
+# Functions whose responses change at most a few times a year
+HISTORY_FUNCTIONS = frozenset(
+    {
+        "BALANCE_SHEET",
+        "CASH_FLOW",
+        "DIVIDENDS",
+        "EARNINGS",
+        "EARNINGS_CALL_TRANSCRIPT",
+        "ETF_PROFILE",
+        "HISTORICAL_OPTIONS",
+        "INCOME_STATEMENT",
+        "OVERVIEW",
+        "SPLITS",
+    }
+)
+
+
+def make_cache_key(https_params: Dict[str, Any]) -> Tuple[Hashable, ...]:
+    """
+    Build a hashable cache key from request parameters.
+
+    Args:
+        https_params: Query parameters sent to Alpha Vantage
+
+    Returns:
+        Sorted tuple of (name, value) pairs without credentials
+    """
+    return tuple(
+        sorted(
+            (name, str(value))
+            for name, value in https_params.items()
+            if name not in _IGNORED_PARAMS and value is not None
+        )
+    )
+
+
+def is_cacheable(response: Any) -> bool:
+    """
+    Check whether an upstream response may be cached.
+
+    Error messages, rate-limit notes and informational responses are never
+    cached so that a transient upstream condition is not replayed.
+    """
+    if isinstance(response, dict):
+        return not (_UNCACHEABLE_KEYS & response.keys())
+    return isinstance(response, str)
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache with a per-entry time-to-live.
+
+    The cache is bounded both by entry count and by the total size of the
+    upstream bodies its entries were parsed from. Cached values are shared
+    between callers and must be treated as read-only.
+
+    Args:
+        max_entries: Maximum number of cached responses
+        max_bytes: Maximum total size of the cached upstream bodies
+        ttl_seconds: Default TTL (0 disables the cache)
+        realtime_ttl_seconds: TTL of real-time responses (0 never caches them)
+        history_ttl_seconds: TTL of full histories and reference data
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 60.0,
+        realtime_ttl_seconds: float = 5.0,
+        history_ttl_seconds: float = 3600.0,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.realtime_ttl_seconds = realtime_ttl_seconds
+        self.history_ttl_seconds = history_ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything at all."""
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def ttl_for(self, https_params: Dict[str, Any]) -> float:
+        """TTL of the response to a request, from its function and parameters."""
+        function = https_params.get("function")
+        if function in REALTIME_FUNCTIONS:
+            return self.realtime_ttl_seconds
+        month = https_params.get("month")
+        if month:
+            # The current month still gains bars; past months are settled
+            current = datetime.now(timezone.utc).strftime("%Y-%m")
+            return self.history_ttl_seconds if month < current else self.ttl_seconds
+        if function in HISTORY_FUNCTIONS or https_params.get("outputsize") == "full":
+            return self.history_ttl_seconds
+        return self.ttl_seconds
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the cached value for key, or None if absent or expired.
+
+        The value is the cached object itself, not a copy: callers must not
+        mutate it.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._drop(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl_seconds: float = None,
+        size_bytes: int = 0,
+    ) -> None:
+        """
+        Store a value, evicting the least recently used entries if full.
+
+        Args:
+            key: Cache key
+            value: Parsed response
+            ttl_seconds: Seconds the value stays fresh (default: ttl_seconds)
+            size_bytes: Length of the upstream body the value was parsed from
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if not self.enabled or ttl <= 0 or size_bytes > self.max_bytes:
+            return
+
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + ttl, value, size_bytes)
+        self.size_bytes += size_bytes
+
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            _, (_, _, evicted_bytes) = self._entries.popitem(last=False)
+            self.size_bytes -= evicted_bytes
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[2]
+
+    def clear(self) -> None:
+        """Drop all entries and reset statistics."""
+        self._entries.clear()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def create_response_cache_from_env() -> ResponseCache:
+    """Create a response cache configured from environment variables."""
+    return ResponseCache(
+        max_entries=int(os.getenv("ALPHAVANTAGE_CACHE_MAX_ENTRIES", "256")),
+        max_bytes=int(os.getenv("ALPHAVANTAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        ttl_seconds=float(os.getenv("ALPHAVANTAGE_CACHE_TTL", "60")),
+        realtime_ttl_seconds=float(os.getenv("ALPHAVANTAGE_CACHE_REALTIME_TTL", "5")),
+        history_ttl_seconds=float(os.getenv("ALPHAVANTAGE_CACHE_HISTORY_TTL", "3600")),
+    )
@@ -136,6 +136,24 @@ def should_limit_response(response: Any, max_tokens: int = 15000) -> bool:
     return estimated_tokens > max_tokens
 
 
+def apply_response_limit(
+    response: Any, max_data_points: int = 100
+) -> Dict[str, Any] | Any:
+    """
+    Limit a time series response only if it is too large to return in full.
+
+    Args:
+        response: The full API response from AlphaVantage
+        max_data_points: Maximum number of data points to include (default: 100)
+
+    Returns:
+        The limited response, or the original one if it is small enough
+    """
+    if should_limit_response(response):
+        return limit_time_series_response(response, max_data_points)
+    return response
+
+
 def create_response_summary(response: Dict[str, Any]) -> Dict[str, Any]:
     """
     Create a summary of a large response instead of returning the full data.
@@ -1,5 +1,4 @@
 import asyncio
-import json
 import logging
 from importlib.metadata import version, PackageNotFoundError
 
@@ -16,9 +15,17 @@ from .oauth import OAuthResourceServer, create_oauth_config_from_env
 from .prompts import prompts_definitions
 from .tools import AlphavantageTools, tools_definitions
 from .telemetry_bootstrap import init_telemetry
+from .telemetry_instrument import time_phase
+from .tracing import init_tracing, shutdown_tracing, start_span
+from .loop_monitor import create_loop_monitor_from_env
+from .offload import encode_json, shutdown_executor
+from .admission import AdmissionRejected, create_admission_controller_from_env
+from .http_compression import CompressionMiddleware
 from .api import (
+    close_http_client,
     fetch_quote,
     fetch_intraday,
+    fetch_intraday_history,
     fetch_time_series_daily,
     fetch_time_series_daily_adjusted,
     fetch_time_series_weekly,
@@ -35,6 +42,7 @@ from .api import (
     fetch_insider_transactions,
     fetch_analytics_fixed_window,
     fetch_analytics_sliding_window,
+    fetch_correlation_matrix,
     fetch_company_overview,
     company_dividends,
     fetch_etf_profile,
@@ -46,6 +54,7 @@ from .api import (
     fetch_earnings_calendar,
     fetch_ipo_calendar,
     fetch_exchange_rate,
+    fetch_exchange_rate_matrix,
     fetch_fx_intraday,
     fetch_fx_daily,
     fetch_fx_weekly,
@@ -736,6 +745,37 @@ async def handle_list_tools() -> list[types.Tool]:
     return tools_definitions()
 
 
+def _incoming_headers():
+    """Headers of the HTTP request being handled, or None on stdio."""
+    try:
+        request = server.request_context.request
+    except LookupError:
+        return None
+    return getattr(request, "headers", None)
+
+
+def _progress_reporter():
+    """
+    Send MCP progress notifications for the request being handled.
+
+    Returns None when the client asked for no progress, or outside a request.
+    """
+    try:
+        ctx = server.request_context
+    except LookupError:
+        return None
+    token = ctx.meta.progressToken if ctx.meta is not None else None
+    if token is None:
+        return None
+
+    async def report(done: int, total: int, message: str) -> None:
+        await ctx.session.send_progress_notification(
+            token, done, total, message=message, related_request_id=ctx.request_id
+        )
+
+    return report
+
+
 @server.call_tool()
 async def handle_call_tool(
     name: str, arguments: dict | None
@@ -744,6 +784,16 @@ async def handle_call_tool(
     Handle tool execution requests.
     Tools can modify server state and notify clients of changes.
     """
+    with start_span(
+        f"tools/call {name}", {"mcp.tool.name": name}, headers=_incoming_headers()
+    ):
+        return await _call_tool(name, arguments)
+
+
+async def _call_tool(
+    name: str, arguments: dict | None
+) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+    """Run the named tool and return its result as text content."""
     try:
         match name:
             case AlphavantageTools.STOCK_QUOTE.value:
@@ -770,10 +820,30 @@ async def handle_call_tool(
                     symbol,
                     interval,
                     datatype,
-                    extended_hours,
-                    adjusted,
-                    outputsize,
-                    month,
+                    adjusted=adjusted,
+                    extended_hours=extended_hours,
+                    outputsize=outputsize,
+                    month=month,
+                )
+            case AlphavantageTools.INTRADAY_HISTORY.value:
+                symbol = arguments.get("symbol")
+                start = arguments.get("start")
+                end = arguments.get("end")
+                if not symbol or not start or not end:
+                    raise ValueError("Missing required arguments: symbol, start, end")
+
+                interval = arguments.get("interval", "1min")
+                adjusted = arguments.get("adjusted", True)
+                extended_hours = arguments.get("extended_hours", True)
+
+                result = await fetch_intraday_history(
+                    symbol,
+                    start,
+                    end,
+                    interval,
+                    adjusted=adjusted,
+                    extended_hours=extended_hours,
+                    progress=_progress_reporter(),
                 )
             case AlphavantageTools.TIME_SERIES_DAILY.value:
                 symbol = arguments.get("symbol")
@@ -791,9 +861,10 @@ async def handle_call_tool(
 
                 datatype = arguments.get("datatype", "json")
                 outputsize = arguments.get("outputsize", "compact")
+                adjusted_ohlc = arguments.get("adjusted_ohlc", False)
 
                 result = await fetch_time_series_daily_adjusted(
-                    symbol, datatype, outputsize
+                    symbol, datatype, outputsize, adjusted_ohlc
                 )
             case AlphavantageTools.TIME_SERIES_WEEKLY.value:
                 symbol = arguments.get("symbol")
@@ -922,7 +993,22 @@ async def handle_call_tool(
                         "Missing required arguments: symbols, interval, series_range, calculations, window_size"
                     )
                 result = await fetch_analytics_sliding_window(
-                    symbols, series_range, ohlc, interval, interval, calculations
+                    symbols, series_range, ohlc, interval, window_size, calculations
+                )
+
+            case AlphavantageTools.CORRELATION_MATRIX.value:
+                symbols = arguments.get("symbols")
+                if not symbols:
+                    raise ValueError("Missing required argument: symbols")
+
+                interval = arguments.get("interval", "DAILY")
+                series_range = arguments.get("series_range", "1year")
+                ohlc = arguments.get("ohlc", "close")
+                layout = arguments.get("layout", "upper")
+                min_abs = arguments.get("min_abs")
+
+                result = await fetch_correlation_matrix(
+                    symbols, interval, series_range, ohlc, layout, min_abs
                 )
 
             case AlphavantageTools.COMPANY_OVERVIEW.value:
@@ -1010,6 +1096,13 @@ async def handle_call_tool(
 
                 result = await fetch_exchange_rate(from_currency, to_currency)
 
+            case AlphavantageTools.EXCHANGE_RATE_MATRIX.value:
+                currencies = arguments.get("currencies")
+                if not currencies:
+                    raise ValueError("Missing required argument: currencies")
+
+                result = await fetch_exchange_rate_matrix(currencies)
+
             case AlphavantageTools.FX_INTRADAY.value:
                 from_symbol = arguments.get("from_symbol")
                 to_symbol = arguments.get("to_symbol")
@@ -2144,7 +2237,9 @@ async def handle_call_tool(
             case _:
                 raise ValueError(f"Unknown tool: {name}")
 
-        return [types.TextContent(type="text", text=json.dumps(result, indent=2))]
+        with time_phase("encode", tool=name):
+            text = await encode_json(result)
+        return [types.TextContent(type="text", text=text)]
 
     except Exception as e:
         raise ValueError(f"Error processing alphavantage query: {str(e)}") from e
@@ -2163,31 +2258,51 @@ async def run_stdio_server():
     """Run the MCP stdio server"""
     # Initialize telemetry for stdio transport
     init_telemetry(start_metrics=True)
+    init_tracing()
+    loop_monitor = create_loop_monitor_from_env()
+    loop_monitor.start()
 
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="alphavantage",
-                server_version=get_version(),
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+        try:
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="alphavantage",
+                    server_version=get_version(),
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+        finally:
+            await loop_monitor.stop()
+            await close_http_client()
+            shutdown_executor()
+            shutdown_tracing()
 
 
-async def run_streamable_http_server(port=8080, oauth_enabled=False):
-    """Run the Streamable HTTP server on the specified port"""
+async def run_streamable_http_server(
+    port=8080, oauth_enabled=False, host="localhost", sockets=None, stateless=False
+):
+    """
+    Run the Streamable HTTP server on the specified port
+
+    Worker processes pass the listening sockets they share with their siblings,
+    and run stateless so any worker can serve any request.
+    """
 
     # Initialize telemetry for HTTP transport
     init_telemetry(start_metrics=True)
+    init_tracing()
+    loop_monitor = create_loop_monitor_from_env()
+    loop_monitor.start()
 
     transport = StreamableHTTPServerTransport(
         mcp_session_id=None, is_json_response_enabled=True
     )
+    admission = create_admission_controller_from_env()
 
     # Setup OAuth if enabled
     oauth_server = None
@@ -2195,6 +2310,7 @@ async def run_streamable_http_server(port=8080, oauth_enabled=False):
         oauth_config = create_oauth_config_from_env()
         if oauth_config:
             oauth_server = OAuthResourceServer(oauth_config)
+            oauth_server.start()
             logger.info(
                 f"OAuth enabled for resource server: {oauth_config.resource_server_uri}"
             )
@@ -2216,9 +2332,17 @@ async def run_streamable_http_server(port=8080, oauth_enabled=False):
                         experimental_capabilities={},
                     ),
                 ),
+                stateless=stateless,
             )
         )
 
+        async def handle_mcp_request(scope, receive, send):
+            try:
+                await transport.handle_request(scope, receive, send)
+            except Exception as e:
+                logger.error(f"Error handling MCP request: {e}")
+                await send_error_response(send, 500, "Internal Server Error")
+
         # Create OAuth-enhanced ASGI app wrapper for the transport
         async def asgi_app(scope, receive, send):
             if scope["type"] != "http":
@@ -2234,6 +2358,8 @@ async def run_streamable_http_server(port=8080, oauth_enabled=False):
 
             # Handle MCP requests
             elif path.startswith("/mcp"):
+                subject = None
+
                 # OAuth authentication if enabled
                 if oauth_server:
                     # Extract session ID from request if present
@@ -2269,28 +2395,55 @@ async def run_streamable_http_server(port=8080, oauth_enabled=False):
                     logger.info(
                         f"Authenticated MCP request for user: {validation_result.subject}"
                     )
+                    subject = validation_result.subject
+
+                # Only POSTs carry calls; GET streams stay open for the session
+                if scope["method"] != "POST":
+                    return await handle_mcp_request(scope, receive, send)
 
-                # Process MCP request
+                subject = subject or request.headers.get("mcp-session-id")
+                if subject is None and request.client is not None:
+                    subject = request.client.host
                 try:
-                    await transport.handle_request(scope, receive, send)
-                except Exception as e:
-                    logger.error(f"Error handling MCP request: {e}")
-                    await send_error_response(send, 500, "Internal Server Error")
+                    async with admission.admit(subject or "anonymous"):
+                        await handle_mcp_request(scope, receive, send)
+                except AdmissionRejected as e:
+                    await send_error_response(
+                        send,
+                        e.status_code,
+                        "Too Many Requests"
+                        if e.status_code == 429
+                        else "Service Unavailable",
+                        headers=[[b"retry-after", str(e.retry_after).encode()]],
+                    )
 
             else:
                 # Return 404 for unknown paths
                 await send_404(send)
 
-        config = uvicorn.Config(asgi_app, host="localhost", port=port)
+        config = uvicorn.Config(CompressionMiddleware(asgi_app), host=host, port=port)
         uvicorn_server = uvicorn.Server(config)
-        http_task = asyncio.create_task(uvicorn_server.serve())
+        http_task = asyncio.create_task(uvicorn_server.serve(sockets=sockets))
 
         try:
-            await asyncio.gather(server_task, http_task)
+            # uvicorn returns on SIGINT/SIGTERM while the MCP server would
+            # keep reading its streams, so whichever finishes first stops both
+            done, _ = await asyncio.wait(
+                {server_task, http_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                task.result()
         finally:
+            for task in (server_task, http_task):
+                task.cancel()
+            await asyncio.gather(server_task, http_task, return_exceptions=True)
             # Cleanup OAuth resources
             if oauth_server:
                 await oauth_server.cleanup()
+            await loop_monitor.stop()
+            await close_http_client()
+            shutdown_executor()
+            shutdown_tracing()
 
 
 async def send_starlette_response(response: Response, send):
@@ -2339,13 +2492,13 @@ async def send_404(send):
     )
 
 
-async def send_error_response(send, status_code: int, message: str):
+async def send_error_response(send, status_code: int, message: str, headers=None):
     """Send an error response."""
     await send(
         {
             "type": "http.response.start",
             "status": status_code,
-            "headers": [[b"content-type", b"text/plain"]],
+            "headers": [[b"content-type", b"text/plain"], *(headers or [])],
         }
     )
     await send(
@@ -2356,14 +2509,25 @@ async def send_error_response(send, status_code: int, message: str):
     )
 
 
-async def main(server_type="stdio", port=8080, oauth_enabled=False):
+async def main(
+    server_type="stdio", port=8080, oauth_enabled=False, host="localhost", workers=1
+):
     """Main entry point with server type selection"""
     if server_type == "http":
         if oauth_enabled:
             logger.info(f"Starting Streamable HTTP server with OAuth on port {port}")
         else:
             logger.info(f"Starting Streamable HTTP server on port {port}")
-        await run_streamable_http_server(port=port, oauth_enabled=oauth_enabled)
+        if workers > 1:
+            from .workers import run_http_workers
+
+            await run_http_workers(
+                workers, host=host, port=port, oauth_enabled=oauth_enabled
+            )
+        else:
+            await run_streamable_http_server(
+                port=port, oauth_enabled=oauth_enabled, host=host
+            )
     else:
         logger.info("Starting stdio server")
         await run_stdio_server()
@@ -11,6 +11,8 @@ import threading
 from typing import Optional
 from prometheus_client import Counter, Histogram, Gauge, start_http_server
 
+from . import profiler
+
 logger = logging.getLogger(__name__)
 
 # Environment variable configuration
@@ -24,18 +26,32 @@ _telemetry_initialized = False
 _metrics_server_started = False
 _metrics_server_thread: Optional[threading.Thread] = None
 
-# Prometheus metrics - these will be initialized in init_telemetry()
+# Prometheus metrics - created at import time when telemetry is enabled, so
+# instrumented tools can bind their label children when they are decorated
 MCP_CALLS: Optional[Counter] = None
 MCP_ERRS: Optional[Counter] = None
 MCP_LAT: Optional[Histogram] = None
 MCP_REQ_B: Optional[Histogram] = None
 MCP_RES_B: Optional[Histogram] = None
 MCP_CONC: Optional[Gauge] = None
+MCP_TOKEN_CACHE: Optional[Counter] = None
+MCP_PHASE_LAT: Optional[Histogram] = None
+MCP_LOOP_LAG: Optional[Histogram] = None
+MCP_ADMISSION_IN_FLIGHT: Optional[Gauge] = None
+MCP_ADMISSION_QUEUED: Optional[Gauge] = None
+MCP_ADMISSION_WAIT: Optional[Histogram] = None
+MCP_ADMISSION_REJECTED: Optional[Counter] = None
 
 
 def _create_prometheus_metrics():
     """Create and return Prometheus metrics objects."""
     global MCP_CALLS, MCP_ERRS, MCP_LAT, MCP_REQ_B, MCP_RES_B, MCP_CONC
+    global MCP_TOKEN_CACHE, MCP_PHASE_LAT, MCP_LOOP_LAG
+    global MCP_ADMISSION_IN_FLIGHT, MCP_ADMISSION_QUEUED
+    global MCP_ADMISSION_WAIT, MCP_ADMISSION_REJECTED
+
+    if MCP_CALLS is not None:
+        return
 
     MCP_CALLS = Counter(
         "mcp_tool_calls_total",
@@ -76,6 +92,71 @@ def _create_prometheus_metrics():
         ["tool"],
     )
 
+    MCP_PHASE_LAT = Histogram(
+        "mcp_tool_phase_seconds",
+        "MCP tool call latency by phase (queue, connect, ttfb, download, "
+        "decode, postprocess, encode) in seconds",
+        ["tool", "server", "version", "phase"],
+        buckets=[
+            0.0001,
+            0.0005,
+            0.001,
+            0.005,
+            0.01,
+            0.025,
+            0.05,
+            0.1,
+            0.25,
+            0.5,
+            1.0,
+            2.5,
+            5.0,
+            10.0,
+        ],
+    )
+
+    MCP_TOKEN_CACHE = Counter(
+        "mcp_oauth_token_cache_lookups_total",
+        "OAuth validated-token cache lookups",
+        ["result"],
+    )
+
+    MCP_LOOP_LAG = Histogram(
+        "mcp_event_loop_lag_seconds",
+        "Delay between when an event loop timer was due and when it ran",
+        ["server", "version"],
+        buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0],
+    )
+
+    MCP_ADMISSION_IN_FLIGHT = Gauge(
+        "mcp_admission_in_flight",
+        "MCP HTTP requests currently admitted",
+        ["server", "version"],
+    )
+
+    MCP_ADMISSION_QUEUED = Gauge(
+        "mcp_admission_queued",
+        "MCP HTTP requests waiting for admission",
+        ["server", "version"],
+    )
+
+    MCP_ADMISSION_WAIT = Histogram(
+        "mcp_admission_wait_seconds",
+        "Time MCP HTTP requests spent queued for admission",
+        ["server", "version"],
+        buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0],
+    )
+
+    MCP_ADMISSION_REJECTED = Counter(
+        "mcp_admission_rejected_total",
+        "MCP HTTP requests refused admission",
+        ["server", "version", "reason"],
+    )
+
+
+if MCP_TELEMETRY_ENABLED:
+    _create_prometheus_metrics()
+
 
 def _start_metrics_server():
     """Start the Prometheus metrics HTTP server."""
@@ -85,10 +166,20 @@ def _start_metrics_server():
         return
 
     try:
+        if profiler.MCP_PROFILER_ENABLED:
+            # Profile the thread (and event loop) that initializes telemetry
+            profiler.attach_event_loop()
 
         def run_server():
             try:
-                start_http_server(MCP_METRICS_PORT, addr="127.0.0.1")
+                if profiler.MCP_PROFILER_ENABLED:
+                    profiler.start_metrics_server(MCP_METRICS_PORT, addr="127.0.0.1")
+                    logger.info(
+                        f"Profiler available at http://127.0.0.1:{MCP_METRICS_PORT}"
+                        f"{profiler.PROFILE_PATH}"
+                    )
+                else:
+                    start_http_server(MCP_METRICS_PORT, addr="127.0.0.1")
                 logger.info(
                     f"Prometheus metrics server started on 127.0.0.1:{MCP_METRICS_PORT}"
                 )
@@ -126,9 +217,8 @@ def init_telemetry(start_metrics: bool = True) -> None:
             f"Initializing telemetry for {MCP_SERVER_NAME} v{MCP_SERVER_VERSION}"
         )
 
-        # Initialize Prometheus metrics
+        # Metrics normally exist already; this is a no-op unless creation failed
         _create_prometheus_metrics()
-        logger.debug("Prometheus metrics created")
 
         # Start metrics server if requested
         if start_metrics:
@@ -143,8 +233,8 @@ def init_telemetry(start_metrics: bool = True) -> None:
 
 
 def is_telemetry_enabled() -> bool:
-    """Check if telemetry is enabled and initialized."""
-    return MCP_TELEMETRY_ENABLED and _telemetry_initialized
+    """Check if telemetry is enabled and its metrics are available."""
+    return MCP_TELEMETRY_ENABLED and MCP_CALLS is not None
 
 
 # Export the metric objects for use by other modules
@@ -157,6 +247,13 @@ __all__ = [
     "MCP_REQ_B",
     "MCP_RES_B",
     "MCP_CONC",
+    "MCP_TOKEN_CACHE",
+    "MCP_PHASE_LAT",
+    "MCP_LOOP_LAG",
+    "MCP_ADMISSION_IN_FLIGHT",
+    "MCP_ADMISSION_QUEUED",
+    "MCP_ADMISSION_WAIT",
+    "MCP_ADMISSION_REJECTED",
     "MCP_SERVER_NAME",
     "MCP_SERVER_VERSION",
 ]
@@ -6,23 +6,131 @@ with telemetry collection using Prometheus metrics.
 """
 
 import asyncio
+import contextlib
+import contextvars
 import functools
 import logging
+import os
+import random
 import time
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
 
+from . import telemetry_bootstrap
 from .telemetry_bootstrap import (
-    MCP_CALLS,
-    MCP_ERRS,
-    MCP_LAT,
-    MCP_REQ_B,
-    MCP_RES_B,
-    MCP_CONC,
+    MCP_SERVER_NAME,
+    MCP_SERVER_VERSION,
     is_telemetry_enabled,
 )
 
 logger = logging.getLogger(__name__)
 
+# Fraction of calls whose payload sizes are measured (1.0 = every call)
+MCP_TELEMETRY_SIZE_SAMPLE_RATE = float(
+    os.getenv("MCP_TELEMETRY_SIZE_SAMPLE_RATE", "1.0")
+)
+
+# Number of items per container inspected when estimating payload sizes
+_SIZE_ESTIMATE_SAMPLE = 16
+
+# (payload object, serialized size) of the last upstream response in this context
+_response_size: contextvars.ContextVar[Optional[Tuple[Any, int]]] = (
+    contextvars.ContextVar("mcp_response_size", default=None)
+)
+
+# Name of the instrumented tool currently executing in this context
+_current_tool: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "mcp_current_tool", default=None
+)
+
+# Error categories produced by _classify_error
+_ERROR_KINDS = ("timeout", "bad_input", "connection", "unknown")
+
+# Phase histogram children keyed by (tool, phase)
+_phase_children: Dict[Tuple[str, str], Any] = {}
+
+
+class _ToolMetrics:
+    """
+    Prometheus label children for one tool, bound once at decoration time.
+
+    Resolving labels takes a lock and a dict lookup per call; binding the
+    children up front keeps the per-call cost to plain inc/observe calls.
+    """
+
+    __slots__ = (
+        "calls_ok",
+        "calls_error",
+        "latency",
+        "request_bytes",
+        "response_bytes",
+        "concurrency",
+        "errors",
+    )
+
+    def __init__(self, tool_name: str):
+        labels = {
+            "tool": tool_name,
+            "server": MCP_SERVER_NAME,
+            "version": MCP_SERVER_VERSION,
+        }
+        self.calls_ok = telemetry_bootstrap.MCP_CALLS.labels(outcome="ok", **labels)
+        self.calls_error = telemetry_bootstrap.MCP_CALLS.labels(
+            outcome="error", **labels
+        )
+        self.latency = telemetry_bootstrap.MCP_LAT.labels(**labels)
+        self.request_bytes = telemetry_bootstrap.MCP_REQ_B.labels(tool=tool_name)
+        self.response_bytes = telemetry_bootstrap.MCP_RES_B.labels(tool=tool_name)
+        self.concurrency = telemetry_bootstrap.MCP_CONC.labels(tool=tool_name)
+        self.errors = {
+            kind: telemetry_bootstrap.MCP_ERRS.labels(tool=tool_name, error_kind=kind)
+            for kind in _ERROR_KINDS
+        }
+
+
+def observe_phase(phase: str, seconds: float, tool: Optional[str] = None) -> None:
+    """
+    Record the duration of one phase of a tool call.
+
+    Args:
+        phase: Phase name, e.g. "queue", "connect", "ttfb", "download",
+               "decode", "postprocess" or "encode"
+        seconds: Duration measured with time.perf_counter
+        tool: Tool name; defaults to the instrumented tool running in this context
+    """
+    tool = tool or _current_tool.get()
+    if tool is None:
+        return
+    child = _phase_children.get((tool, phase))
+    if child is None:
+        histogram = telemetry_bootstrap.MCP_PHASE_LAT
+        if histogram is None:
+            return
+        child = _phase_children[(tool, phase)] = histogram.labels(
+            tool=tool, server=MCP_SERVER_NAME, version=MCP_SERVER_VERSION, phase=phase
+        )
+    child.observe(seconds)
+
+
+@contextlib.contextmanager
+def time_phase(phase: str, tool: Optional[str] = None) -> Iterator[None]:
+    """Context manager recording the enclosed block as a phase of a tool call."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_phase(phase, time.perf_counter() - start, tool)
+
+
+def record_response_size(payload: Any, size: int) -> None:
+    """
+    Record the serialized size of a payload that was just produced.
+
+    Called by the API layer with the byte length of the upstream body it has
+    already read, so instrument_tool can reuse it instead of re-measuring the
+    parsed object. The size is only used if the tool returns that same object.
+    """
+    _response_size.set((payload, size))
+
 
 def _classify_error(error: Exception) -> str:
     """
@@ -48,6 +156,10 @@ def _get_size_bytes(obj: Any) -> int:
     """
     Calculate the approximate size of an object in bytes.
 
+    Strings and bytes are measured exactly. Containers are estimated from
+    their structure, inspecting at most a small sample of items per level and
+    extrapolating, so the cost does not grow with the payload size.
+
     Args:
         obj: Object to measure
 
@@ -55,17 +167,58 @@ def _get_size_bytes(obj: Any) -> int:
         Size in bytes (0 if measurement fails)
     """
     try:
-        if obj is None:
-            return 0
-        elif isinstance(obj, (str, bytes)):
-            return len(obj)
-        else:
-            # For other objects, convert to string and measure
-            return len(str(obj))
+        return _estimate_size(obj)
     except Exception:
         return 0
 
 
+def _estimate_size(obj: Any) -> int:
+    """Estimate the JSON-serialized size of obj from a sample of its items."""
+    if obj is None:
+        return 0
+    elif isinstance(obj, (str, bytes)):
+        return len(obj)
+    elif isinstance(obj, dict):
+        count = len(obj)
+        if not count:
+            return 2
+        sampled = 0
+        for i, (key, value) in enumerate(obj.items()):
+            if i == _SIZE_ESTIMATE_SAMPLE:
+                break
+            # Quotes around the key, colon and separator
+            sampled += _estimate_size(key) + _estimate_size(value) + 4
+        return sampled * count // min(count, _SIZE_ESTIMATE_SAMPLE) + 2
+    elif isinstance(obj, (list, tuple)):
+        count = len(obj)
+        if not count:
+            return 2
+        sampled = sum(_estimate_size(item) + 1 for item in obj[:_SIZE_ESTIMATE_SAMPLE])
+        return sampled * count // min(count, _SIZE_ESTIMATE_SAMPLE) + 2
+    elif isinstance(obj, bool):
+        return 5
+    elif isinstance(obj, (int, float)):
+        return len(repr(obj))
+    else:
+        return len(str(obj))
+
+
+def _should_measure_sizes() -> bool:
+    """Decide whether payload sizes are measured for this call."""
+    return (
+        MCP_TELEMETRY_SIZE_SAMPLE_RATE >= 1.0
+        or random.random() < MCP_TELEMETRY_SIZE_SAMPLE_RATE
+    )
+
+
+def _get_response_size(result: Any) -> int:
+    """Size of a tool result, reusing the upstream body length when available."""
+    recorded = _response_size.get()
+    if recorded is not None and recorded[0] is result:
+        return recorded[1]
+    return _get_size_bytes(result)
+
+
 def instrument_tool(tool_name: str, transport: Optional[str] = None) -> Callable:
     """
     Decorator to instrument MCP tool functions with telemetry collection.
@@ -90,111 +243,68 @@ def instrument_tool(tool_name: str, transport: Optional[str] = None) -> Callable
             # If telemetry is disabled, return the original function unchanged
             return func
 
+        metrics = _ToolMetrics(tool_name)
+
+        def before_call(args: tuple, kwargs: dict) -> bool:
+            metrics.concurrency.inc()
+            measure_sizes = _should_measure_sizes()
+            if measure_sizes:
+                # Measure request size (approximate)
+                metrics.request_bytes.observe(
+                    _get_size_bytes(args) + _get_size_bytes(kwargs)
+                )
+                _response_size.set(None)
+            return measure_sizes
+
+        def on_error(error: Exception) -> None:
+            error_kind = _classify_error(error)
+            metrics.errors[error_kind].inc()
+            logger.warning(f"Tool {tool_name} failed with {error_kind} error: {error}")
+
+        def after_call(start_time: float, ok: bool) -> None:
+            metrics.latency.observe(time.perf_counter() - start_time)
+            (metrics.calls_ok if ok else metrics.calls_error).inc()
+            metrics.concurrency.dec()
+
         @functools.wraps(func)
         async def async_wrapper(*args, **kwargs) -> Any:
             """Async wrapper for instrumented functions."""
-            start_time = time.time()
-            outcome = "error"
-            error_kind = None
-
-            # Increment active concurrency
-            if MCP_CONC:
-                MCP_CONC.labels(tool=tool_name).inc()
-
+            start_time = time.perf_counter()
+            ok = False
+            tool_token = _current_tool.set(tool_name)
             try:
-                # Measure request size (approximate)
-                request_data = {"args": args, "kwargs": kwargs}
-                request_size = _get_size_bytes(request_data)
-                if MCP_REQ_B:
-                    MCP_REQ_B.labels(tool=tool_name).observe(request_size)
-
-                # Execute the actual function
+                measure_sizes = before_call(args, kwargs)
                 result = await func(*args, **kwargs)
-
-                # Measure response size
-                response_size = _get_size_bytes(result)
-                if MCP_RES_B:
-                    MCP_RES_B.labels(tool=tool_name).observe(response_size)
-
-                outcome = "ok"
+                if measure_sizes:
+                    metrics.response_bytes.observe(_get_response_size(result))
+                ok = True
                 return result
-
             except Exception as e:
-                error_kind = _classify_error(e)
-
-                # Increment error counter
-                if MCP_ERRS:
-                    MCP_ERRS.labels(tool=tool_name, error_kind=error_kind).inc()
-
-                logger.warning(f"Tool {tool_name} failed with {error_kind} error: {e}")
+                on_error(e)
                 raise
-
             finally:
-                # Record execution time
-                duration = time.time() - start_time
-                if MCP_LAT:
-                    MCP_LAT.labels(tool=tool_name).observe(duration)
-
-                # Increment total calls counter
-                if MCP_CALLS:
-                    MCP_CALLS.labels(tool=tool_name, outcome=outcome).inc()
-
-                # Decrement active concurrency
-                if MCP_CONC:
-                    MCP_CONC.labels(tool=tool_name).dec()
+                after_call(start_time, ok)
+                _current_tool.reset(tool_token)
 
         @functools.wraps(func)
         def sync_wrapper(*args, **kwargs) -> Any:
             """Sync wrapper for instrumented functions."""
-            start_time = time.time()
-            outcome = "error"
-            error_kind = None
-
-            # Increment active concurrency
-            if MCP_CONC:
-                MCP_CONC.labels(tool=tool_name).inc()
-
+            start_time = time.perf_counter()
+            ok = False
+            tool_token = _current_tool.set(tool_name)
             try:
-                # Measure request size (approximate)
-                request_data = {"args": args, "kwargs": kwargs}
-                request_size = _get_size_bytes(request_data)
-                if MCP_REQ_B:
-                    MCP_REQ_B.labels(tool=tool_name).observe(request_size)
-
-                # Execute the actual function
+                measure_sizes = before_call(args, kwargs)
                 result = func(*args, **kwargs)
-
-                # Measure response size
-                response_size = _get_size_bytes(result)
-                if MCP_RES_B:
-                    MCP_RES_B.labels(tool=tool_name).observe(response_size)
-
-                outcome = "ok"
+                if measure_sizes:
+                    metrics.response_bytes.observe(_get_response_size(result))
+                ok = True
                 return result
-
             except Exception as e:
-                error_kind = _classify_error(e)
-
-                # Increment error counter
-                if MCP_ERRS:
-                    MCP_ERRS.labels(tool=tool_name, error_kind=error_kind).inc()
-
-                logger.warning(f"Tool {tool_name} failed with {error_kind} error: {e}")
+                on_error(e)
                 raise
-
             finally:
-                # Record execution time
-                duration = time.time() - start_time
-                if MCP_LAT:
-                    MCP_LAT.labels(tool=tool_name).observe(duration)
-
-                # Increment total calls counter
-                if MCP_CALLS:
-                    MCP_CALLS.labels(tool=tool_name, outcome=outcome).inc()
-
-                # Decrement active concurrency
-                if MCP_CONC:
-                    MCP_CONC.labels(tool=tool_name).dec()
+                after_call(start_time, ok)
+                _current_tool.reset(tool_token)
 
         # Return appropriate wrapper based on whether function is async
         if asyncio.iscoroutinefunction(func):
@@ -206,4 +316,4 @@ def instrument_tool(tool_name: str, transport: Optional[str] = None) -> Callable
 
 
 # Export the decorator
-__all__ = ["instrument_tool"]
+__all__ = ["instrument_tool", "observe_phase", "record_response_size", "time_phase"]
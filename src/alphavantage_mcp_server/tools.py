@@ -12,6 +12,7 @@ class AlphavantageTools(str, Enum):
     """Enumeration of all available AlphaVantage tools."""
 
     TIME_SERIES_INTRADAY = "time_series_intraday"
+    INTRADAY_HISTORY = "intraday_history"
     TIME_SERIES_DAILY = "time_series_daily"
     TIME_SERIES_DAILY_ADJUSTED = "time_series_daily_adjusted"
     TIME_SERIES_WEEKLY = "time_series_weekly"
@@ -29,10 +30,11 @@ class AlphavantageTools(str, Enum):
     INSIDER_TRANSACTIONS = "insider_transactions"
     ANALYTICS_FIXED_WINDOW = "analytics_fixed_window"
     ANALYTICS_SLIDING_WINDOW = "analytics_sliding_window"
+    CORRELATION_MATRIX = "correlation_matrix"
     COMPANY_OVERVIEW = "company_overview"
     ETF_PROFILE = "etf_profile"
     COMPANY_DIVIDENDS = "company_dividends"
-    COMPANY_SPLITS = "company_dividends"
+    COMPANY_SPLITS = "company_splits"
     INCOME_STATEMENT = "income_statement"
     BALANCE_SHEET = "balance_sheet"
     CASH_FLOW = "cash_flow"
@@ -42,6 +44,7 @@ class AlphavantageTools(str, Enum):
     EARNINGS_CALL_TRANSCRIPT = "earnings_call_transcript"
     IPO_CALENDAR = "ipo_calendar"
     EXCHANGE_RATE = "exchange_rate"
+    EXCHANGE_RATE_MATRIX = "exchange_rate_matrix"
     FX_INTRADAY = "fx_intraday"
     FX_DAILY = "fx_daily"
     FX_WEEKLY = "fx_weekly"
@@ -156,6 +159,34 @@ def tools_definitions():
                 "required": ["symbol", "interval"],
             },
         ),
+        types.Tool(
+            name=AlphavantageTools.INTRADAY_HISTORY.value,
+            description=(
+                "Fetch intraday history over a date range as one columnar series, "
+                "requesting the months it spans concurrently"
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "symbol": {"type": "string"},
+                    "start": {
+                        "type": "string",
+                        "description": "First day (YYYY-MM-DD) or month (YYYY-MM)",
+                    },
+                    "end": {
+                        "type": "string",
+                        "description": "Last day (YYYY-MM-DD) or month (YYYY-MM), included",
+                    },
+                    "interval": {
+                        "type": "string",
+                        "description": "1min, 5min, 15min, 30min or 60min (default: 1min)",
+                    },
+                    "adjusted": {"type": "boolean"},
+                    "extended_hours": {"type": "boolean"},
+                },
+                "required": ["symbol", "start", "end"],
+            },
+        ),
         types.Tool(
             name=AlphavantageTools.TIME_SERIES_DAILY.value,
             description="Fetch a time series daily",
@@ -178,6 +209,10 @@ def tools_definitions():
                     "symbol": {"type": "string"},
                     "outputsize": {"type": "string"},
                     "datatype": {"type": "string"},
+                    "adjusted_ohlc": {
+                        "type": "boolean",
+                        "description": "Adjust open, high, low and close for splits and dividends too (default: false, JSON only)",
+                    },
                 },
                 "required": ["symbol"],
             },
@@ -354,6 +389,37 @@ def tools_definitions():
                 ],
             },
         ),
+        types.Tool(
+            name=AlphavantageTools.CORRELATION_MATRIX.value,
+            description=(
+                "Compute the correlation matrix of the returns of many symbols, "
+                "as a symbol list and a flat array of correlations"
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "symbols": {"type": "array", "items": {"type": "string"}},
+                    "interval": {
+                        "type": "string",
+                        "description": "DAILY, WEEKLY or MONTHLY (default: DAILY)",
+                    },
+                    "series_range": {
+                        "type": "string",
+                        "description": "full, a trailing range such as 6month, or the first day (default: 1year)",
+                    },
+                    "ohlc": {"type": "string"},
+                    "layout": {
+                        "type": "string",
+                        "description": "upper: pairs above the diagonal, row by row; full: the whole matrix, row by row (default: upper)",
+                    },
+                    "min_abs": {
+                        "type": "number",
+                        "description": "Only list [row, column, correlation] triples at least this strongly correlated",
+                    },
+                },
+                "required": ["symbols"],
+            },
+        ),
         types.Tool(
             name=AlphavantageTools.COMPANY_OVERVIEW.value,
             description="Fetch company overview",
@@ -494,6 +560,24 @@ def tools_definitions():
                 "required": ["from_currency", "to_currency"],
             },
         ),
+        types.Tool(
+            name=AlphavantageTools.EXCHANGE_RATE_MATRIX.value,
+            description=(
+                "Compute the exchange rates between every pair of currencies, "
+                "derived from their rates against one base currency"
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "currencies": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Currency codes; the rates come back row by row, row i being the price of currency i",
+                    },
+                },
+                "required": ["currencies"],
+            },
+        ),
         types.Tool(
             name=AlphavantageTools.FX_INTRADAY.value,
             description="Fetch FX intraday",
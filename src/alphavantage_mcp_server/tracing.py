@@ -0,0 +1,167 @@
+"""
+Tracing Module
+
+Optional OpenTelemetry tracing for the AlphaVantage MCP server. Spans cover
+tool calls, response cache lookups, rate-limit waits and upstream HTTP
+requests, and join the caller's trace when a W3C traceparent header arrives
+over the streamable HTTP transport.
+
+Tracing is off unless MCP_TRACING_ENABLED is set and the OpenTelemetry SDK is
+installed (pip install "alphavantage-mcp[tracing]"). While it is off, the
+helpers below are no-ops.
+"""
+
+import contextlib
+import logging
+import os
+import sys
+from typing import Any, Iterator, Mapping, Optional
+
+from .telemetry_bootstrap import MCP_SERVER_NAME, MCP_SERVER_VERSION
+
+try:
+    from opentelemetry import propagate
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        SimpleSpanProcessor,
+        SpanExporter,
+    )
+    from opentelemetry.trace import SpanKind, Tracer
+except ImportError:
+    TracerProvider = None
+
+logger = logging.getLogger(__name__)
+
+# Environment variable configuration
+MCP_TRACING_ENABLED = os.getenv("MCP_TRACING_ENABLED", "false").lower() == "true"
+# "otlp" (OTEL_EXPORTER_OTLP_* variables apply) or "console" (stderr)
+MCP_TRACING_EXPORTER = os.getenv("MCP_TRACING_EXPORTER", "otlp").lower()
+
+# Global tracing state
+_tracer_provider: Optional["TracerProvider"] = None
+_tracer: Optional["Tracer"] = None
+
+
+def _create_exporter() -> "SpanExporter":
+    """Create the span exporter selected by MCP_TRACING_EXPORTER."""
+    if MCP_TRACING_EXPORTER == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        # stdout carries the MCP protocol on the stdio transport
+        return ConsoleSpanExporter(out=sys.stderr)
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+        OTLPSpanExporter,
+    )
+
+    return OTLPSpanExporter()
+
+
+def init_tracing(exporter: Optional["SpanExporter"] = None) -> bool:
+    """
+    Initialize tracing.
+
+    Args:
+        exporter: Exporter to use instead of the configured one, e.g. an
+                  InMemorySpanExporter in tests. Spans are then exported as
+                  soon as they end rather than in batches, and tracing is
+                  enabled regardless of MCP_TRACING_ENABLED.
+
+    Returns:
+        True if tracing is active
+    """
+    global _tracer_provider, _tracer
+
+    if _tracer is not None:
+        return True
+
+    if exporter is None and not MCP_TRACING_ENABLED:
+        return False
+
+    if TracerProvider is None:
+        logger.warning(
+            "MCP_TRACING_ENABLED is set but the OpenTelemetry SDK is not installed"
+        )
+        return False
+
+    try:
+        if exporter is None:
+            processor = BatchSpanProcessor(_create_exporter())
+        else:
+            processor = SimpleSpanProcessor(exporter)
+    except ImportError as e:
+        logger.warning(f"Tracing exporter unavailable: {e}")
+        return False
+
+    resource = Resource.create(
+        {"service.name": MCP_SERVER_NAME, "service.version": MCP_SERVER_VERSION}
+    )
+    _tracer_provider = TracerProvider(resource=resource)
+    _tracer_provider.add_span_processor(processor)
+    _tracer = _tracer_provider.get_tracer(__name__)
+    logger.info(f"Tracing enabled for {MCP_SERVER_NAME} v{MCP_SERVER_VERSION}")
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans and disable tracing."""
+    global _tracer_provider, _tracer
+
+    provider, _tracer_provider, _tracer = _tracer_provider, None, None
+    if provider is not None:
+        provider.shutdown()
+
+
+def is_tracing_enabled() -> bool:
+    """Check if tracing is initialized."""
+    return _tracer is not None
+
+
+@contextlib.contextmanager
+def start_span(
+    name: str,
+    attributes: Optional[Mapping[str, Any]] = None,
+    headers: Optional[Mapping[str, str]] = None,
+    client: bool = False,
+) -> Iterator[Any]:
+    """
+    Run the enclosed block inside a span.
+
+    Exceptions raised in the block are recorded on the span and mark it as
+    failed before propagating.
+
+    Args:
+        name: Span name
+        attributes: Initial span attributes
+        headers: Incoming request headers; when given, the span continues the
+                 trace named by their W3C traceparent header
+        client: Whether the span represents an outgoing request
+
+    Yields:
+        The span, or None when tracing is disabled
+    """
+    if _tracer is None:
+        yield None
+        return
+
+    context = None
+    kind = SpanKind.INTERNAL
+    if client:
+        kind = SpanKind.CLIENT
+    elif headers is not None:
+        context = propagate.extract(headers)
+        kind = SpanKind.SERVER
+    with _tracer.start_as_current_span(
+        name, context=context, kind=kind, attributes=attributes
+    ) as span:
+        yield span
+
+
+__all__ = [
+    "init_tracing",
+    "is_tracing_enabled",
+    "shutdown_tracing",
+    "start_span",
+]
@@ -0,0 +1,163 @@
+"""
+Multi-process serving for the Streamable HTTP transport.
+
+The supervisor binds the listening socket once and starts worker processes
+that all accept connections from it, so requests are spread across CPU cores.
+Workers share the upstream rate limit and response cache through a
+Coordinator running in the supervisor (see coordinator.py), and serve
+stateless MCP sessions so that any worker can answer any request.
+
+Each worker exposes its own Prometheus metrics on MCP_METRICS_PORT plus its
+worker index.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import tempfile
+
+from . import api, server, telemetry_bootstrap
+from .coordinator import (
+    Coordinator,
+    CoordinatorClient,
+    SharedRateLimiter,
+    SharedResponseCache,
+)
+from .rate_limit import RateLimiter, create_rate_limiter_from_env
+from .response_cache import create_response_cache_from_env
+
+logger = logging.getLogger(__name__)
+
+# Seconds a worker gets to finish in-flight requests on shutdown
+_SHUTDOWN_TIMEOUT = 10
+
+
+def _bind_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+async def _serve_worker(
+    sock: socket.socket,
+    host: str,
+    port: int,
+    oauth_enabled: bool,
+    path: str,
+    workers: int,
+) -> None:
+    client = CoordinatorClient(path)
+    await client.connect()
+
+    api.SHARED_CACHE = SharedResponseCache(client)
+    if api.RATE_LIMITER.enabled:
+        # This worker's share of the budget, should the coordinator be lost
+        share = RateLimiter(
+            requests_per_minute=api.RATE_LIMITER.requests_per_minute / workers,
+            burst=max(1, api.RATE_LIMITER.burst // workers),
+        )
+        api.RATE_LIMITER = SharedRateLimiter(client, share)
+
+    try:
+        await server.run_streamable_http_server(
+            port=port,
+            oauth_enabled=oauth_enabled,
+            host=host,
+            sockets=[sock],
+            stateless=True,
+        )
+    finally:
+        await client.close()
+
+
+def _worker_main(
+    index: int,
+    sock: socket.socket,
+    host: str,
+    port: int,
+    oauth_enabled: bool,
+    path: str,
+    workers: int,
+) -> None:
+    """Entry point of a worker process."""
+    telemetry_bootstrap.MCP_METRICS_PORT += index
+    try:
+        asyncio.run(_serve_worker(sock, host, port, oauth_enabled, path, workers))
+    except KeyboardInterrupt:
+        pass
+
+
+async def run_http_workers(
+    workers: int, host: str = "localhost", port: int = 8080, oauth_enabled=False
+) -> None:
+    """
+    Serve the Streamable HTTP transport from several worker processes.
+
+    Args:
+        workers: Number of worker processes
+        host: Address to bind
+        port: Port to bind
+        oauth_enabled: Whether workers require OAuth bearer tokens
+    """
+    sock = _bind_socket(host, port)
+    socket_dir = tempfile.mkdtemp(prefix="alphavantage-mcp-")
+    path = os.path.join(socket_dir, "coordinator.sock")
+
+    coordinator = Coordinator(
+        create_rate_limiter_from_env(), create_response_cache_from_env()
+    )
+    await coordinator.start(path)
+
+    context = multiprocessing.get_context("spawn")
+    processes = {}
+
+    def start_worker(index: int) -> None:
+        process = context.Process(
+            target=_worker_main,
+            args=(index, sock, host, port, oauth_enabled, path, workers),
+            name=f"alphavantage-worker-{index}",
+        )
+        process.start()
+        processes[index] = process
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stopping.set)
+
+    logger.info(f"Starting {workers} HTTP workers on {host}:{port}")
+    try:
+        for index in range(workers):
+            start_worker(index)
+
+        while not stopping.is_set():
+            try:
+                await asyncio.wait_for(stopping.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+            for index, process in list(processes.items()):
+                if not stopping.is_set() and not process.is_alive():
+                    logger.warning(
+                        f"Worker {index} exited with code {process.exitcode}; "
+                        "restarting"
+                    )
+                    start_worker(index)
+    finally:
+        loop.remove_signal_handler(signal.SIGTERM)
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in processes.values():
+            await asyncio.to_thread(process.join, _SHUTDOWN_TIMEOUT)
+            if process.is_alive():
+                process.kill()
+        await coordinator.close()
+        sock.close()
+        shutil.rmtree(socket_dir, ignore_errors=True)
@@ -0,0 +1,21 @@
+"""
+Fixtures for the offline benchmark suite.
+
+pytest-benchmark times synchronous callables, so async tool calls run on an
+event loop owned by the test.
+"""
+
+import asyncio
+
+import pytest
+
+from alphavantage_mcp_server import api
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine to completion on a loop kept for the whole test."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.run_until_complete(api.close_http_client())
+    loop.close()
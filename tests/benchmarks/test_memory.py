@@ -0,0 +1,168 @@
+"""
+Memory benchmarks of tool calls on large payloads.
+
+tracemalloc measures, per call, the peak traced memory and what is still held
+once the call has returned. Budgets are in units of the tool result's size,
+so a change that keeps one more full copy of a payload (raw body, parsed
+object, serialized text) fails them.
+
+The mock server runs in a subprocess so that only the server side's
+allocations are traced. The garbage collector is paused while measuring:
+reference cycles keep a payload alive until the next full collection, and
+count as held here.
+
+Run with:
+    ALPHAVANTAGE_API_KEY=demo pytest tests/benchmarks/test_memory.py --benchmark-only
+"""
+
+import asyncio
+import gc
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+import pytest
+
+from alphavantage_mcp_server import api
+from alphavantage_mcp_server.rate_limit import RateLimiter
+from alphavantage_mcp_server.response_cache import ResponseCache
+from alphavantage_mcp_server.server import handle_call_tool
+
+# A month of 1min bars, and an options chain of a heavily traded symbol
+FULL_SIZE = 20000
+LIST_SIZE = 10000
+
+# Memory held besides the result once a call returns, in result sizes
+HELD_BUDGET = 0.05
+# Memory retained once the result is dropped as well
+RETAINED_BUDGET_BYTES = 64 * 1024
+
+
+@dataclass
+class MemoryUsage:
+    result_bytes: int
+    peak_bytes: int
+    held_bytes: int
+    retained_bytes: int
+
+
+@pytest.fixture(scope="module")
+def mock_process():
+    """Mock Alpha Vantage server in its own process; yields its query URL."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "alphavantage_mcp_server.mock_upstream",
+            "--port",
+            str(port),
+            "--full-size",
+            str(FULL_SIZE),
+            "--list-size",
+            str(LIST_SIZE),
+            "--seed",
+            "0",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            break
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                pytest.fail("mock Alpha Vantage server did not start")
+            time.sleep(0.1)
+    yield f"http://127.0.0.1:{port}/query"
+    process.terminate()
+    process.wait()
+
+
+@pytest.fixture
+def large_upstream(mock_process, monkeypatch):
+    monkeypatch.setattr(api, "API_BASE_URL", mock_process)
+    monkeypatch.setattr(api, "RESPONSE_CACHE", ResponseCache(ttl_seconds=0))
+    monkeypatch.setattr(api, "RATE_LIMITER", RateLimiter())
+
+
+def measure(run, name, arguments) -> MemoryUsage:
+    async def call():
+        result = await handle_call_tool(name, arguments)
+        # An idle moment, as a serving loop has, lets the worker pool thread
+        # drop its last work item and its arguments
+        await asyncio.sleep(0.01)
+        return result
+
+    # Warm up the HTTP client, metrics and worker pool
+    run(call())
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = run(call())
+        current, peak = tracemalloc.get_traced_memory()
+        result_bytes = sys.getsizeof(result[0].text)
+        del result
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    return MemoryUsage(
+        result_bytes=result_bytes,
+        peak_bytes=peak - before,
+        held_bytes=current - before - result_bytes,
+        retained_bytes=retained,
+    )
+
+
+# Peak memory is budgeted per call in result sizes, with about half a copy
+# of headroom: the body, its decoded text, the parsed object and the
+# serialized result take about 5 for JSON and 3 for CSV
+@pytest.mark.parametrize(
+    "name,arguments,peak_budget",
+    [
+        ("historical_options", {"symbol": "IBM"}, 5.6),
+        (
+            "time_series_intraday",
+            {"symbol": "IBM", "interval": "1min", "outputsize": "full"},
+            5.9,
+        ),
+        (
+            "time_series_intraday",
+            {
+                "symbol": "IBM",
+                "interval": "1min",
+                "outputsize": "full",
+                "datatype": "csv",
+            },
+            3.5,
+        ),
+    ],
+    ids=["historical_options", "intraday_full_json", "intraday_full_csv"],
+)
+def test_memory_per_call(benchmark, large_upstream, run, name, arguments, peak_budget):
+    usage = benchmark.pedantic(
+        measure, args=(run, name, arguments), rounds=1, iterations=1
+    )
+
+    benchmark.extra_info.update(
+        result_bytes=usage.result_bytes,
+        peak_bytes=usage.peak_bytes,
+        held_bytes=usage.held_bytes,
+        retained_bytes=usage.retained_bytes,
+        peak_copies=round(usage.peak_bytes / usage.result_bytes, 2),
+    )
+    assert usage.result_bytes > 1024 * 1024
+    assert usage.peak_bytes <= peak_budget * usage.result_bytes
+    assert usage.held_bytes <= HELD_BUDGET * usage.result_bytes
+    assert usage.retained_bytes <= RETAINED_BUDGET_BYTES
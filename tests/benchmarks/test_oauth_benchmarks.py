@@ -0,0 +1,75 @@
+"""
+Benchmarks of OAuth access token validation, with and without the cache.
+
+Cold validations verify the RSA signature of every token; warm ones are
+served from the validated-token cache.
+"""
+
+import time
+
+import jwt
+import pytest
+
+from alphavantage_mcp_server.oauth import OAuthConfig, OAuthResourceServer
+
+rsa = pytest.importorskip("cryptography.hazmat.primitives.asymmetric.rsa")
+serialization = pytest.importorskip("cryptography.hazmat.primitives.serialization")
+
+RESOURCE_URI = "https://mcp.example.com"
+TOKENS = 50
+
+
+@pytest.fixture(scope="module")
+def signed_tokens():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_pem = (
+        private_key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+    claims = {"sub": "user-1", "aud": RESOURCE_URI, "exp": int(time.time()) + 3600}
+    tokens = [
+        jwt.encode({**claims, "jti": str(i)}, private_key, algorithm="RS256")
+        for i in range(TOKENS)
+    ]
+    return public_pem, tokens
+
+
+def make_server(public_pem, cache_entries):
+    return OAuthResourceServer(
+        OAuthConfig(
+            authorization_server_url="https://auth.example.com",
+            resource_server_uri=RESOURCE_URI,
+            jwt_public_key=public_pem,
+            token_cache_max_entries=cache_entries,
+        )
+    )
+
+
+async def validate_all(server, tokens):
+    return [await server.validate_access_token(token) for token in tokens]
+
+
+def test_cold_token_validation(benchmark, signed_tokens, run):
+    public_pem, tokens = signed_tokens
+    server = make_server(public_pem, cache_entries=0)
+
+    results = benchmark(lambda: run(validate_all(server, tokens)))
+
+    assert all(result.valid for result in results)
+    benchmark.extra_info["tokens_per_round"] = TOKENS
+
+
+def test_warm_token_validation(benchmark, signed_tokens, run):
+    public_pem, tokens = signed_tokens
+    server = make_server(public_pem, cache_entries=1024)
+    run(validate_all(server, tokens))
+
+    results = benchmark(lambda: run(validate_all(server, tokens)))
+
+    assert all(result.valid for result in results)
+    assert server.token_cache.misses == TOKENS
+    benchmark.extra_info["tokens_per_round"] = TOKENS
@@ -0,0 +1,103 @@
+"""
+Offline benchmarks of tool calls against the mock Alpha Vantage server.
+
+Run with:
+    ALPHAVANTAGE_API_KEY=demo pytest tests/benchmarks --benchmark-only
+"""
+
+import asyncio
+import json
+
+from alphavantage_mcp_server import api
+from alphavantage_mcp_server.offload import decode_json, encode_json
+from alphavantage_mcp_server.response_cache import ResponseCache
+from alphavantage_mcp_server.server import handle_call_tool
+
+DAILY_FULL = {"symbol": "IBM", "outputsize": "full"}
+
+
+def test_quote_latency(benchmark, mock_upstream, run):
+    result = benchmark(lambda: run(handle_call_tool("stock_quote", {"symbol": "IBM"})))
+
+    assert "Global Quote" in result[0].text
+
+
+def test_full_daily_history_latency(benchmark, mock_upstream, run):
+    result = benchmark.pedantic(
+        lambda: run(handle_call_tool("time_series_daily", DAILY_FULL)),
+        rounds=10,
+        warmup_rounds=1,
+    )
+
+    assert len(json.loads(result[0].text)["Time Series (Daily)"]) == 5000
+
+
+def test_historical_options_latency(benchmark, mock_upstream, run):
+    mock_upstream.list_size = 5000
+    result = benchmark.pedantic(
+        lambda: run(handle_call_tool("historical_options", {"symbol": "IBM"})),
+        rounds=10,
+        warmup_rounds=1,
+    )
+
+    assert len(json.loads(result[0].text)["data"]) == 5000
+
+
+def test_throughput_under_concurrency(benchmark, mock_upstream, run):
+    mock_upstream.latency = 0.02
+    calls = 50
+
+    async def burst():
+        return await asyncio.gather(
+            *(handle_call_tool("stock_quote", {"symbol": "IBM"}) for _ in range(calls))
+        )
+
+    results = benchmark.pedantic(lambda: run(burst()), rounds=5, warmup_rounds=1)
+
+    assert len(results) == calls
+    benchmark.extra_info["calls_per_round"] = calls
+    # No timings are kept under --benchmark-disable
+    if benchmark.stats is not None:
+        mean = benchmark.stats.stats.mean
+        benchmark.extra_info["calls_per_second"] = round(calls / mean, 1)
+        # Upstream latency overlaps rather than adding up
+        assert mean < calls * mock_upstream.latency / 2
+
+
+def test_cache_effectiveness(benchmark, mock_upstream, run, monkeypatch):
+    monkeypatch.setattr(api, "RESPONSE_CACHE", ResponseCache(ttl_seconds=60))
+    mock_upstream.latency = 0.02
+
+    benchmark(lambda: run(handle_call_tool("time_series_daily", {"symbol": "IBM"})))
+
+    upstream_calls = mock_upstream.requests["TIME_SERIES_DAILY"]
+    assert upstream_calls == 1
+    # No timings are kept under --benchmark-disable, which calls once
+    if benchmark.stats is not None:
+        total_calls = benchmark.stats.stats.rounds + 1
+        benchmark.extra_info["upstream_calls"] = upstream_calls
+        benchmark.extra_info["hit_ratio"] = round(1 - upstream_calls / total_calls, 4)
+        # Hits skip the upstream latency entirely
+        assert benchmark.stats.stats.median < mock_upstream.latency
+
+
+def test_decode_cost(benchmark, mock_upstream, run):
+    body, _ = mock_upstream.body_for(
+        {"function": "TIME_SERIES_DAILY", "outputsize": "full"}
+    )
+    benchmark.extra_info["bytes"] = len(body)
+
+    result = benchmark(lambda: run(decode_json(body)))
+
+    assert len(result["Time Series (Daily)"]) == 5000
+
+
+def test_encode_cost(benchmark, mock_upstream, run):
+    body, _ = mock_upstream.body_for(
+        {"function": "TIME_SERIES_DAILY", "outputsize": "full"}
+    )
+    payload = json.loads(body)
+
+    text = benchmark(lambda: run(encode_json(payload)))
+
+    benchmark.extra_info["bytes"] = len(text)
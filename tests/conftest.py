@@ -0,0 +1,67 @@
+"""
+Shared fixtures for the offline test suites.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class _QuoteHandler(BaseHTTPRequestHandler):
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        body = json.dumps({"Global Quote": {"01. symbol": "IBM"}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Local stand-in for the Alpha Vantage endpoint."""
+    from alphavantage_mcp_server import api
+    from alphavantage_mcp_server.rate_limit import RateLimiter
+    from alphavantage_mcp_server.response_cache import ResponseCache
+
+    _QuoteHandler.requests = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _QuoteHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(
+        api, "API_BASE_URL", f"http://127.0.0.1:{httpd.server_port}/query"
+    )
+    monkeypatch.setattr(api, "RESPONSE_CACHE", ResponseCache(ttl_seconds=60))
+    monkeypatch.setattr(api, "RATE_LIMITER", RateLimiter())
+    yield _QuoteHandler
+    httpd.shutdown()
+
+
+@pytest.fixture
+def mock_upstream(monkeypatch):
+    """
+    Replaying Alpha Vantage stand-in with caching and rate limiting off.
+
+    Yields the MockAlphaVantage app; its options can be changed per test.
+    """
+    from alphavantage_mcp_server import api
+    from alphavantage_mcp_server.mock_upstream import (
+        MockAlphaVantage,
+        MockUpstreamServer,
+    )
+    from alphavantage_mcp_server.rate_limit import RateLimiter
+    from alphavantage_mcp_server.response_cache import ResponseCache
+
+    with MockUpstreamServer(MockAlphaVantage(seed=0)) as server:
+        monkeypatch.setattr(api, "API_BASE_URL", server.url)
+        monkeypatch.setattr(api, "RESPONSE_CACHE", ResponseCache(ttl_seconds=0))
+        monkeypatch.setattr(api, "RATE_LIMITER", RateLimiter())
+        yield server.app
@@ -0,0 +1,167 @@
+"""
+Tests for daily series adjusted for splits and dividends locally.
+"""
+
+import random
+
+import pytest
+
+from alphavantage_mcp_server import adjust, api
+from alphavantage_mcp_server.adjust import adjust_daily, adjust_ohlc, adjustment_factors
+from alphavantage_mcp_server.response_cache import ResponseCache
+
+DAYS = {
+    "2024-03-04": "100.0000",
+    "2024-03-05": "102.0000",
+    "2024-03-06": "51.0000",
+    "2024-03-07": "52.0000",
+    "2024-03-11": "50.0000",
+}
+
+
+def daily_payload(closes):
+    return {
+        "Meta Data": {
+            "1. Information": "Daily Prices (open, high, low, close) and Volumes",
+            "2. Symbol": "IBM",
+            "3. Last Refreshed": max(closes),
+            "4. Output Size": "Full size",
+            "5. Time Zone": "US/Eastern",
+        },
+        "Time Series (Daily)": {
+            day: {
+                "1. open": close,
+                "2. high": close,
+                "3. low": close,
+                "4. close": close,
+                "5. volume": "1000",
+            }
+            for day, close in sorted(closes.items(), reverse=True)
+        },
+    }
+
+
+SPLITS = {
+    "symbol": "IBM",
+    "data": [{"effective_date": "2024-03-06", "split_factor": "2.0000"}],
+}
+DIVIDENDS = {
+    "symbol": "IBM",
+    "data": [
+        # Declared, and after the last bar
+        {"ex_dividend_date": "2024-06-10", "amount": "0.75"},
+        # On a Saturday, so applied from the next trading day
+        {"ex_dividend_date": "2024-03-09", "amount": "0.5"},
+        {"ex_dividend_date": "2024-03-01", "amount": "0.4"},
+        {"ex_dividend_date": "None", "amount": "None"},
+    ],
+}
+
+
+NUMPY_OR_NOT = pytest.mark.parametrize(
+    "use_numpy",
+    [
+        pytest.param(
+            True,
+            marks=pytest.mark.skipif(adjust.numpy is None, reason="needs numpy"),
+        ),
+        False,
+    ],
+)
+
+
+@NUMPY_OR_NOT
+def test_closes_are_back_adjusted_for_later_events(use_numpy, monkeypatch):
+    if not use_numpy:
+        monkeypatch.setattr(adjust, "numpy", None)
+    adjusted = adjust_daily(daily_payload(DAYS), SPLITS, DIVIDENDS)
+
+    assert adjusted["Meta Data"]["1. Information"] == (
+        "Daily Time Series with Splits and Dividend Events"
+    )
+    series = adjusted["Time Series (Daily)"]
+    assert list(series) == sorted(DAYS, reverse=True)
+    dividend = 1 - 0.5 / 52
+    assert {day: float(bar["5. adjusted close"]) for day, bar in series.items()} == {
+        "2024-03-11": 50.0,
+        "2024-03-07": pytest.approx(52 * dividend, abs=1e-4),
+        "2024-03-06": pytest.approx(51 * dividend, abs=1e-4),
+        "2024-03-05": pytest.approx(102 / 2 * dividend, abs=1e-4),
+        "2024-03-04": pytest.approx(100 / 2 * dividend, abs=1e-4),
+    }
+    assert series["2024-03-06"]["8. split coefficient"] == "2.0"
+    assert series["2024-03-11"]["7. dividend amount"] == "0.5000"
+    # Events before the first bar are not recorded on it
+    assert series["2024-03-04"]["7. dividend amount"] == "0.0000"
+    assert series["2024-03-04"]["6. volume"] == "1000"
+
+
+@pytest.mark.skipif(adjust.numpy is None, reason="needs numpy")
+def test_vectorized_factors_match_the_loop(monkeypatch):
+    rng = random.Random(7)
+    dates = [f"2020-{month:02d}-{day:02d}" for month in range(1, 13) for day in (3, 17)]
+    closes = [rng.uniform(20, 200) for _ in dates]
+    # Around, between, on and beyond the bars
+    days = ["2019-12-31", "2020-01-03", "2020-02-10", "2020-07-17", "2021-01-05"]
+    days += [
+        f"2020-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" for _ in range(8)
+    ]
+    splits = sorted(
+        ((day, rng.choice([2.0, 3.0, 0.5])) for day in days[::3]), reverse=True
+    )
+    dividends = sorted(((day, rng.uniform(0.1, 2.0)) for day in days), reverse=True)
+
+    vectorized = adjustment_factors(dates, closes, splits, dividends)
+    monkeypatch.setattr(adjust, "numpy", None)
+    looped = adjustment_factors(dates, closes, splits, dividends)
+
+    assert vectorized == pytest.approx(looped, rel=1e-12)
+    assert looped[-1] == 1.0
+
+
+def test_compact_output_and_unusable_payloads():
+    adjusted = adjust_daily(daily_payload(DAYS), SPLITS, DIVIDENDS, compact=True)
+
+    assert adjusted["Meta Data"]["4. Output Size"] == "Compact"
+    assert (
+        adjust_daily(daily_payload(DAYS), {"Information": "throttled"}, DIVIDENDS)
+        is None
+    )
+    assert adjust_daily(adjusted, SPLITS, DIVIDENDS) is None
+
+
+def test_adjusted_ohlc_scales_each_bar_by_its_factor():
+    adjusted = adjust_ohlc(adjust_daily(daily_payload(DAYS), SPLITS, DIVIDENDS))
+
+    bar = adjusted["Time Series (Daily)"]["2024-03-05"]
+    assert bar["1. open"] == bar["4. close"] == bar["5. adjusted close"]
+    assert float(bar["2. high"]) == pytest.approx(102 / 2 * (1 - 0.5 / 52), abs=1e-4)
+    assert adjust_ohlc("timestamp,open\n") == "timestamp,open\n"
+
+
+async def test_daily_adjusted_comes_from_cached_raw_bars(mock_upstream, monkeypatch):
+    monkeypatch.setattr(api, "RESPONSE_CACHE", ResponseCache(ttl_seconds=60))
+
+    await api.fetch_time_series_daily("IBM", outputsize="full")
+    await api.company_dividends("IBM")
+    # Splits are not cached yet, so this one goes upstream
+    await api.fetch_time_series_daily_adjusted("IBM")
+    await api.fetch_company_splits("IBM")
+    compact = await api.fetch_time_series_daily_adjusted("IBM")
+    full = await api.fetch_time_series_daily_adjusted(
+        "IBM", outputsize="full", adjusted_ohlc=True
+    )
+    await api.close_http_client()
+
+    assert len(compact["Time Series (Daily)"]) == 100
+    assert compact["Meta Data"]["4. Output Size"] == "Compact"
+    assert all(
+        bar["4. close"] == bar["5. adjusted close"]
+        for bar in full["Time Series (Daily)"].values()
+    )
+    assert mock_upstream.requests == {
+        "TIME_SERIES_DAILY": 1,
+        "DIVIDENDS": 1,
+        "SPLITS": 1,
+        "TIME_SERIES_DAILY_ADJUSTED": 1,
+    }
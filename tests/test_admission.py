@@ -0,0 +1,121 @@
+"""
+Tests for admission control on the /mcp endpoint.
+"""
+
+import asyncio
+
+import pytest
+
+from alphavantage_mcp_server import telemetry_bootstrap
+from alphavantage_mcp_server.admission import AdmissionController, AdmissionRejected
+
+
+def rejected_count(reason):
+    for family in telemetry_bootstrap.MCP_ADMISSION_REJECTED.collect():
+        for sample in family.samples:
+            if (
+                sample.name == "mcp_admission_rejected_total"
+                and sample.labels["reason"] == reason
+            ):
+                return sample.value
+    return 0.0
+
+
+async def test_subject_over_its_limit_is_rejected_with_429():
+    admission = AdmissionController(per_subject=2, retry_after=3)
+    before = rejected_count("subject_limit")
+
+    await admission.acquire("agent-a")
+    await admission.acquire("agent-a")
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await admission.acquire("agent-a")
+    # Other subjects are unaffected
+    await admission.acquire("agent-b")
+
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.retry_after == 3
+    assert rejected_count("subject_limit") - before == 1
+
+    admission.release("agent-a")
+    await admission.acquire("agent-a")
+
+
+async def test_queue_is_served_round_robin_across_subjects():
+    admission = AdmissionController(max_in_flight=1)
+    await admission.acquire("holder")
+
+    order = []
+
+    async def call(subject):
+        async with admission.admit(subject):
+            order.append(subject)
+            await asyncio.sleep(0)
+
+    tasks = [
+        asyncio.create_task(call(subject))
+        for subject in ["greedy", "greedy", "greedy", "polite"]
+    ]
+    await asyncio.sleep(0)
+    assert admission.queued == 4
+
+    admission.release("holder")
+    await asyncio.gather(*tasks)
+
+    # The polite subject does not wait behind the whole greedy burst
+    assert order == ["greedy", "polite", "greedy", "greedy"]
+    assert admission.in_flight == 0
+    assert admission.queued == 0
+
+
+async def test_full_queue_is_rejected_with_503():
+    admission = AdmissionController(max_in_flight=1, max_queue=1)
+    await admission.acquire("a")
+    waiting = asyncio.create_task(admission.acquire("b"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await admission.acquire("c")
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.reason == "queue_full"
+
+    admission.release("a")
+    await waiting
+    assert admission.in_flight == 1
+
+
+async def test_queue_timeout_is_rejected_with_503():
+    admission = AdmissionController(max_in_flight=1, queue_timeout=0.05)
+    await admission.acquire("a")
+
+    with pytest.raises(AdmissionRejected) as excinfo:
+        await admission.acquire("b")
+
+    assert excinfo.value.reason == "queue_timeout"
+    assert admission.queued == 0
+    admission.release("a")
+    assert admission.in_flight == 0
+
+
+async def test_cancelled_waiter_gives_up_its_place():
+    admission = AdmissionController(max_in_flight=1, per_subject=1)
+    await admission.acquire("a")
+    waiting = asyncio.create_task(admission.acquire("b"))
+    await asyncio.sleep(0)
+
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    assert admission.queued == 0
+    admission.release("a")
+    assert admission.in_flight == 0
+    # The cancelled request no longer counts against its subject
+    await admission.acquire("b")
+
+
+async def test_disabled_controller_admits_everything():
+    admission = AdmissionController()
+    assert not admission.enabled
+    async with admission.admit("a"):
+        async with admission.admit("a"):
+            pass
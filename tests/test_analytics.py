@@ -0,0 +1,250 @@
+"""
+Tests for window analytics computed from cached bars.
+"""
+
+import random
+import statistics
+
+import pytest
+
+from alphavantage_mcp_server import analytics, api
+from alphavantage_mcp_server.analytics import (
+    FIXED_CALCULATIONS,
+    correlation_matrix,
+    fixed_window,
+    parse_calculation,
+    range_start,
+    sliding_window,
+)
+from alphavantage_mcp_server.response_cache import ResponseCache
+
+DATES = [f"2024-{month:02d}-{day:02d}" for month in (1, 2, 3) for day in range(1, 29)]
+
+
+def random_walk(seed):
+    rng = random.Random(seed)
+    prices = [100.0]
+    for _ in DATES[1:]:
+        prices.append(prices[-1] * (1 + rng.gauss(0.0005, 0.02)))
+    return prices
+
+
+PRICES = {"IBM": random_walk(1), "AAPL": random_walk(2), "MSFT": random_walk(3)}
+
+
+def returns_of(prices):
+    return [b / a - 1 for a, b in zip(prices, prices[1:])]
+
+
+NUMPY_OR_NOT = pytest.mark.parametrize(
+    "use_numpy",
+    [
+        pytest.param(
+            True,
+            marks=pytest.mark.skipif(analytics.numpy is None, reason="needs numpy"),
+        ),
+        False,
+    ],
+)
+
+
+@NUMPY_OR_NOT
+def test_fixed_window_matches_direct_computation(use_numpy, monkeypatch):
+    if not use_numpy:
+        monkeypatch.setattr(analytics, "numpy", None)
+    result = fixed_window(
+        DATES,
+        PRICES,
+        ["MEAN", "STDDEV(annualized=True)", "COVARIANCE", "CORRELATION"],
+        "close",
+        "DAILY",
+    )
+
+    assert result["meta_data"] == {
+        "symbols": "IBM,AAPL,MSFT",
+        "min_dt": "2024-01-01",
+        "max_dt": "2024-03-28",
+        "ohlc": "Close",
+        "interval": "DAILY",
+    }
+    calculations = result["payload"]["RETURNS_CALCULATIONS"]
+    ibm, aapl = returns_of(PRICES["IBM"]), returns_of(PRICES["AAPL"])
+    assert calculations["MEAN"]["IBM"] == pytest.approx(statistics.mean(ibm))
+    assert calculations["STDDEV(annualized=True)"]["AAPL"] == pytest.approx(
+        statistics.stdev(aapl) * 252**0.5
+    )
+    correlation = calculations["CORRELATION"]
+    assert correlation["index"] == ["IBM", "AAPL", "MSFT"]
+    # Lower triangle, row by row
+    assert [len(row) for row in correlation["correlation"]] == [1, 2, 3]
+    assert correlation["correlation"][1][0] == pytest.approx(
+        statistics.correlation(ibm, aapl)
+    )
+    assert correlation["correlation"][2][2] == pytest.approx(1.0)
+    assert calculations["COVARIANCE"]["covariance"][1][0] == pytest.approx(
+        statistics.covariance(ibm, aapl)
+    )
+
+
+@NUMPY_OR_NOT
+def test_fixed_window_of_a_single_flat_series(use_numpy, monkeypatch):
+    if not use_numpy:
+        monkeypatch.setattr(analytics, "numpy", None)
+    calculations = fixed_window(
+        DATES[:5], {"IBM": [10.0] * 5}, ["VARIANCE", "CORRELATION"], "close", "DAILY"
+    )["payload"]["RETURNS_CALCULATIONS"]
+
+    assert calculations["VARIANCE"] == {"IBM": 0.0}
+    # Undefined for a series that does not vary
+    assert calculations["CORRELATION"]["correlation"] == [[None]]
+
+
+def test_max_drawdown_and_cumulative_return():
+    dates = DATES[:6]
+    prices = {"IBM": [10.0, 12.0, 9.0, 11.0, 13.0, 10.4]}
+
+    calculations = fixed_window(
+        dates, prices, ["MAX_DRAWDOWN", "CUMULATIVE_RETURN"], "close", "DAILY"
+    )["payload"]["RETURNS_CALCULATIONS"]
+
+    assert calculations["MAX_DRAWDOWN"]["IBM"] == {
+        "max_drawdown": pytest.approx(-0.25),
+        "drawdown_range": {"start_drawdown": dates[1], "end_drawdown": dates[2]},
+    }
+    assert calculations["CUMULATIVE_RETURN"]["IBM"] == pytest.approx(0.04)
+
+
+def test_sliding_window_matches_each_window():
+    window = 10
+    result = sliding_window(
+        DATES,
+        PRICES,
+        ["MEAN", "VARIANCE", "CORRELATION", "CUMULATIVE_RETURN"],
+        "close",
+        "DAILY",
+        window,
+    )
+
+    assert result["meta_data"]["window_size"] == window
+    calculations = result["payload"]["RETURNS_CALCULATIONS"]
+    ibm, msft = returns_of(PRICES["IBM"]), returns_of(PRICES["MSFT"])
+    means = calculations["MEAN"]["RUNNING_MEAN"]["IBM"]
+    variances = calculations["VARIANCE"]["RUNNING_VARIANCE"]["IBM"]
+    correlations = calculations["CORRELATION"]["RUNNING_CORRELATION"]["IBM,MSFT"]
+    cumulative = calculations["CUMULATIVE_RETURN"]["RUNNING_CUMULATIVE_RETURN"]["IBM"]
+    # Keyed by the last date of each window of returns
+    assert list(means) == DATES[window:]
+    for end, day in enumerate(DATES[window:], start=window):
+        ibm_window, msft_window = ibm[end - window : end], msft[end - window : end]
+        assert means[day] == pytest.approx(statistics.mean(ibm_window))
+        assert variances[day] == pytest.approx(statistics.variance(ibm_window))
+        assert correlations[day] == pytest.approx(
+            statistics.correlation(ibm_window, msft_window)
+        )
+        assert cumulative[day] == pytest.approx(
+            PRICES["IBM"][end] / PRICES["IBM"][end - window] - 1
+        )
+
+
+def test_calculations_and_ranges_not_computed_locally():
+    assert parse_calculation("CORRELATION(method=PEARSON)", FIXED_CALCULATIONS) == (
+        "CORRELATION",
+        False,
+    )
+    assert parse_calculation("CORRELATION(method=KENDALL)", FIXED_CALCULATIONS) is None
+    assert parse_calculation("HISTOGRAM(bins=10)", FIXED_CALCULATIONS) is None
+    assert fixed_window(DATES, PRICES, ["MEDIAN"], "close", "DAILY") is None
+    assert sliding_window(DATES[:5], PRICES, ["MEAN"], "close", "DAILY", 5) is None
+
+    assert range_start("full", "2024-03-31") == ""
+    assert range_start("1month", "2024-03-31") == "2024-02-29"
+    assert range_start("2week", "2024-03-31") == "2024-03-17"
+    assert range_start("2023-07-01", "2024-03-31") == "2023-07-01"
+    assert range_start("2023-07-01,2023-08-31", "2024-03-31") is None
+
+
+async def test_analytics_come_from_cached_daily_bars(mock_upstream, monkeypatch):
+    monkeypatch.setattr(api, "RESPONSE_CACHE", ResponseCache(ttl_seconds=60))
+
+    await api.fetch_time_series_daily("IBM", outputsize="full")
+    await api.fetch_time_series_daily_adjusted("AAPL")
+    fixed = await api.fetch_analytics_fixed_window(
+        ["IBM", "AAPL"], "DAILY", "2month", calculations=["MEAN", "MAX_DRAWDOWN"]
+    )
+    sliding = await api.fetch_analytics_sliding_window(
+        ["IBM", "AAPL"], "1month", interval="DAILY", calculations=["STDDEV"]
+    )
+    # The full history is not cached for AAPL
+    await api.fetch_analytics_fixed_window(
+        ["IBM", "AAPL"], "DAILY", "full", calculations=["MEAN"]
+    )
+    await api.close_http_client()
+
+    assert set(fixed["payload"]["RETURNS_CALCULATIONS"]["MEAN"]) == {"IBM", "AAPL"}
+    assert sliding["meta_data"]["window_size"] == 10
+    assert mock_upstream.requests == {
+        "TIME_SERIES_DAILY": 1,
+        "TIME_SERIES_DAILY_ADJUSTED": 1,
+        "ANALYTICS_FIXED_WINDOW": 1,
+    }
+
+
+@NUMPY_OR_NOT
+def test_correlation_matrix_layouts(use_numpy, monkeypatch):
+    if not use_numpy:
+        monkeypatch.setattr(analytics, "numpy", None)
+    prices = dict(PRICES, FLAT=[50.0] * len(DATES))
+    ibm, aapl, msft = (returns_of(PRICES[symbol]) for symbol in PRICES)
+    ibm_aapl = statistics.correlation(ibm, aapl)
+    ibm_msft = statistics.correlation(ibm, msft)
+    aapl_msft = statistics.correlation(aapl, msft)
+
+    upper = correlation_matrix(DATES, prices)
+    full = correlation_matrix(DATES, prices, layout="full")
+    pairs = sorted(
+        [[0, 1, ibm_aapl], [0, 2, ibm_msft], [1, 2, aapl_msft]],
+        key=lambda pair: -abs(pair[2]),
+    )
+    # Between the weakest pair and the others
+    strong = correlation_matrix(
+        DATES, prices, min_abs=(abs(pairs[1][2]) + abs(pairs[2][2])) / 2
+    )
+
+    assert upper["symbols"] == ["IBM", "AAPL", "MSFT", "FLAT"]
+    assert upper["observations"] == len(DATES) - 1
+    assert upper["layout"] == "upper"
+    # Pairs above the diagonal, row by row; a flat series correlates with nothing
+    assert upper["correlations"] == pytest.approx(
+        [ibm_aapl, ibm_msft, None, aapl_msft, None, None], abs=1e-6
+    )
+    assert full["correlations"][:5] == pytest.approx(
+        [1.0, ibm_aapl, ibm_msft, None, ibm_aapl], abs=1e-6
+    )
+    assert len(full["correlations"]) == 16
+    assert strong["layout"] == "pairs"
+    assert strong["pairs"] == [pytest.approx(pair, abs=1e-6) for pair in pairs[:2]]
+
+
+async def test_correlation_matrix_requests_uncached_symbols(mock_upstream):
+    await api.fetch_time_series_daily("IBM")
+
+    result = await api.fetch_correlation_matrix(
+        ["IBM", "AAPL", "MSFT"], series_range="1month", layout="full"
+    )
+    await api.close_http_client()
+
+    assert result["symbols"] == ["IBM", "AAPL", "MSFT"]
+    assert result["interval"] == "DAILY"
+    assert result["missing"] == {}
+    assert len(result["correlations"]) == 9
+    # The caching fixture is off, so every symbol's compact bars are requested
+    assert mock_upstream.requests == {"TIME_SERIES_DAILY": 4}
+
+
+async def test_long_ranges_request_full_daily_bars_directly(mock_upstream):
+    result = await api.fetch_correlation_matrix(["IBM", "AAPL"], series_range="1year")
+    await api.close_http_client()
+
+    assert result["missing"] == {}
+    # No compact request that could never span a year
+    assert mock_upstream.requests == {"TIME_SERIES_DAILY": 2}
@@ -0,0 +1,121 @@
+"""
+Tests for response compression on the Streamable HTTP transport.
+"""
+
+import gzip
+import json
+
+import pytest
+
+from alphavantage_mcp_server import http_compression
+from alphavantage_mcp_server.http_compression import (
+    CompressionMiddleware,
+    select_encoding,
+)
+
+BODY = json.dumps(
+    {f"2024-01-{day:02d}": {"1. open": "187.1500"} for day in range(1, 29)},
+    indent=2,
+).encode()
+
+
+def make_app(chunks, content_type=b"application/json"):
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", content_type),
+                    (b"content-length", str(sum(map(len, chunks))).encode()),
+                ],
+            }
+        )
+        for index, chunk in enumerate(chunks):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": index < len(chunks) - 1,
+                }
+            )
+
+    return app
+
+
+async def call(app, accept_encoding, **kwargs):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/mcp",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    await CompressionMiddleware(app, **kwargs)(scope, None, send)
+    headers = dict(messages[0]["headers"])
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    return headers, body
+
+
+def test_encoding_negotiation():
+    preferred = ["zstd", "br", "gzip"]
+    assert select_encoding("gzip, deflate, br, zstd", preferred) == "zstd"
+    assert select_encoding("gzip;q=1.0, br;q=0.5", preferred) == "gzip"
+    assert select_encoding("*;q=0.1, zstd;q=0", preferred) == "br"
+    assert select_encoding("identity", preferred) is None
+    assert select_encoding("", preferred) is None
+
+
+async def test_gzip_body_replaces_content_length():
+    headers, body = await call(make_app([BODY]), "gzip", threshold=64)
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"Accept-Encoding"
+    assert int(headers[b"content-length"]) == len(body) < len(BODY)
+    assert gzip.decompress(body) == BODY
+
+
+async def test_small_body_is_sent_as_is():
+    headers, body = await call(make_app([b"{}"]), "gzip", threshold=64)
+
+    assert b"content-encoding" not in headers
+    assert body == b"{}"
+
+
+async def test_streamed_body_is_compressed_incrementally():
+    chunks = [BODY[i : i + 500] for i in range(0, len(BODY), 500)]
+    headers, body = await call(make_app(chunks), "gzip", threshold=64)
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    assert gzip.decompress(body) == BODY
+
+
+async def test_event_stream_is_not_compressed():
+    app = make_app([BODY], content_type=b"text/event-stream")
+    headers, body = await call(app, "gzip", threshold=64)
+
+    assert b"content-encoding" not in headers
+    assert body == BODY
+
+
+@pytest.mark.skipif(http_compression.zstandard is None, reason="needs zstandard")
+async def test_zstd_is_preferred_when_accepted():
+    headers, body = await call(make_app([BODY]), "gzip, br, zstd", threshold=64)
+
+    assert headers[b"content-encoding"] == b"zstd"
+    decompressor = http_compression.zstandard.ZstdDecompressor()
+    assert decompressor.decompressobj().decompress(body) == BODY
+
+
+@pytest.mark.skipif(http_compression.brotli is None, reason="needs brotli")
+async def test_brotli_stream_round_trips():
+    chunks = [BODY[i : i + 500] for i in range(0, len(BODY), 500)]
+    headers, body = await call(make_app(chunks), "br", threshold=64)
+
+    assert headers[b"content-encoding"] == b"br"
+    assert http_compression.brotli.decompress(body) == BODY
@@ -0,0 +1,129 @@
+"""
+Tests for sharing the rate limit and response cache between worker processes.
+"""
+
+import contextlib
+import logging
+import time
+
+from alphavantage_mcp_server import api
+from alphavantage_mcp_server.coordinator import (
+    Coordinator,
+    CoordinatorClient,
+    SharedRateLimiter,
+    SharedResponseCache,
+)
+from alphavantage_mcp_server.rate_limit import RateLimiter
+from alphavantage_mcp_server.response_cache import ResponseCache, make_cache_key
+
+
+@contextlib.asynccontextmanager
+async def running_coordinator(tmp_path):
+    """Coordinator on a temporary socket, yielding a client factory."""
+    coordinator = Coordinator(
+        RateLimiter(requests_per_minute=600, burst=1), ResponseCache(ttl_seconds=60)
+    )
+    path = str(tmp_path / "coordinator.sock")
+    await coordinator.start(path)
+    clients = []
+
+    async def connect():
+        client = CoordinatorClient(path)
+        await client.connect()
+        clients.append(client)
+        return client
+
+    try:
+        yield connect
+    finally:
+        for client in clients:
+            await client.close()
+        await coordinator.close()
+
+
+async def test_workers_share_one_rate_limit(tmp_path):
+    async with running_coordinator(tmp_path) as connect:
+        limiters = [SharedRateLimiter(await connect(), RateLimiter()) for _ in range(2)]
+
+        start = time.perf_counter()
+        for limiter in limiters * 2:
+            await limiter.acquire()
+        elapsed = time.perf_counter() - start
+
+    # 600/min with a burst of 1 allows one request per 100 ms in total
+    assert elapsed >= 0.28
+
+
+async def test_cached_body_is_visible_to_other_workers(tmp_path):
+    key = make_cache_key({"function": "GLOBAL_QUOTE", "symbol": "IBM"})
+    async with running_coordinator(tmp_path) as connect:
+        first = SharedResponseCache(await connect())
+        second = SharedResponseCache(await connect())
+
+        assert await second.get(key) is None
+        first.set(key, b'{"Global Quote": {"01. symbol": "IBM"}}', "json")
+
+        value, ttl, size = await second.get(key)
+    assert value == {"Global Quote": {"01. symbol": "IBM"}}
+    assert 0 < ttl <= 60
+    assert size == len(b'{"Global Quote": {"01. symbol": "IBM"}}')
+
+
+async def test_shared_entries_keep_their_own_ttl(tmp_path):
+    key = make_cache_key({"function": "SPLITS", "symbol": "IBM"})
+    async with running_coordinator(tmp_path) as connect:
+        cache = SharedResponseCache(await connect())
+        cache.set(key, b'{"symbol": "IBM", "data": []}', "json", 3600)
+
+        _, ttl, _ = await cache.get(key)
+    assert 60 < ttl <= 3600
+
+
+async def test_worker_uses_shared_cache_before_upstream(
+    tmp_path, upstream, monkeypatch
+):
+    params = {"function": "GLOBAL_QUOTE", "symbol": "IBM", "apikey": "demo"}
+    async with running_coordinator(tmp_path) as connect:
+        monkeypatch.setattr(api, "SHARED_CACHE", SharedResponseCache(await connect()))
+        try:
+            await api._make_api_request(params, "json")
+
+            # Another worker starts with an empty local cache
+            monkeypatch.setattr(api, "RESPONSE_CACHE", ResponseCache(ttl_seconds=60))
+            result = await api._make_api_request(params, "json")
+        finally:
+            await api.close_http_client()
+
+    assert result == {"Global Quote": {"01. symbol": "IBM"}}
+    assert upstream.requests == 1
+
+
+async def test_lost_coordinator_falls_back_to_local_cache(tmp_path):
+    async with running_coordinator(tmp_path) as connect:
+        client = await connect()
+        cache = SharedResponseCache(client)
+        await client.close()
+        assert await cache.get(make_cache_key({"function": "GLOBAL_QUOTE"})) is None
+
+
+async def test_lost_coordinator_falls_back_to_the_worker_share(tmp_path, caplog):
+    coordinator = Coordinator(RateLimiter(), ResponseCache())
+    path = str(tmp_path / "coordinator.sock")
+    await coordinator.start(path)
+    client = CoordinatorClient(path)
+    await client.connect()
+    # Half of a 600/min budget with a burst of 1, as for one of two workers
+    limiter = SharedRateLimiter(client, RateLimiter(requests_per_minute=300, burst=1))
+    await limiter.acquire()
+
+    await coordinator.close()
+    start = time.perf_counter()
+    with caplog.at_level(logging.WARNING):
+        for _ in range(3):
+            await limiter.acquire()
+    elapsed = time.perf_counter() - start
+    await client.close()
+
+    # One request per 200 ms once the burst is spent
+    assert 0.38 <= elapsed < 1.0
+    assert sum("Coordinator lost" in r.message for r in caplog.records) == 1
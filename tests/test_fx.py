@@ -0,0 +1,134 @@
+"""
+Tests for FX cross rates triangulated through base-currency legs.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from alphavantage_mcp_server import api
+from alphavantage_mcp_server.fx import QUOTE_KEY, FxRateBook, create_fx_book_from_env
+
+
+def quote(from_currency, to_currency, rate, bid="-", ask="-"):
+    return {
+        QUOTE_KEY: {
+            "1. From_Currency Code": from_currency,
+            "2. From_Currency Name": from_currency,
+            "3. To_Currency Code": to_currency,
+            "4. To_Currency Name": to_currency,
+            "5. Exchange Rate": rate,
+            "6. Last Refreshed": "2024-03-28 16:00:01",
+            "7. Time Zone": "UTC",
+            "8. Bid Price": bid,
+            "9. Ask Price": ask,
+        }
+    }
+
+
+def test_crosses_are_derived_from_legs_either_way_round():
+    book = FxRateBook()
+
+    assert book.record(quote("EUR", "USD", "1.08000", "1.07990", "1.08010"))
+    assert book.record(quote("USD", "JPY", "157.000", "156.990", "157.010"))
+    assert not book.record(quote("EUR", "GBP", "0.85000"))
+    assert not book.record({"Information": "throttled"})
+
+    cross = book.cross("eur", "jpy")
+    assert float(cross[QUOTE_KEY]["5. Exchange Rate"]) == pytest.approx(1.08 * 157)
+    assert cross[QUOTE_KEY]["1. From_Currency Code"] == "EUR"
+    bid = float(cross[QUOTE_KEY]["8. Bid Price"])
+    ask = float(cross[QUOTE_KEY]["9. Ask Price"])
+    # The spread of both legs
+    assert bid == pytest.approx(1.0799 * 156.99)
+    assert ask == pytest.approx(1.0801 * 157.01)
+    assert cross["Derived"]["1. Via Currency"] == "USD"
+    assert cross["Derived"]["2. Legs"] == ["USD/EUR", "USD/JPY"]
+    assert book.rate("JPY", "EUR") == pytest.approx(1 / (1.08 * 157))
+    assert book.rate("USD", "JPY") == pytest.approx(157)
+    # Derived responses are never taken for legs
+    assert not book.record(cross)
+
+
+def test_stale_legs_are_dropped():
+    book = FxRateBook(max_age_seconds=60)
+    with patch("alphavantage_mcp_server.fx.time.monotonic", return_value=1000.0):
+        book.record(quote("USD", "EUR", "0.92"))
+        book.record(quote("USD", "JPY", "157.0"))
+    with patch("alphavantage_mcp_server.fx.time.monotonic", return_value=1030.0):
+        book.record(quote("USD", "JPY", "157.5"))
+        assert book.cross("EUR", "JPY")["Derived"]["3. Age Seconds"] == 30.0
+    with patch("alphavantage_mcp_server.fx.time.monotonic", return_value=1061.0):
+        assert book.cross("EUR", "JPY") is None
+        assert book.leg("JPY").rate == 157.5
+
+    disabled = FxRateBook(max_age_seconds=0)
+    assert not disabled.enabled
+    assert not disabled.record(quote("USD", "EUR", "0.92"))
+
+
+def test_legs_default_to_the_realtime_cache_ttl(monkeypatch):
+    monkeypatch.delenv("ALPHAVANTAGE_FX_MAX_AGE", raising=False)
+    monkeypatch.delenv("ALPHAVANTAGE_CACHE_REALTIME_TTL", raising=False)
+    assert create_fx_book_from_env().max_age_seconds == 5
+
+    monkeypatch.setenv("ALPHAVANTAGE_CACHE_REALTIME_TTL", "10")
+    assert create_fx_book_from_env().max_age_seconds == 10
+
+    monkeypatch.setenv("ALPHAVANTAGE_FX_MAX_AGE", "30")
+    assert create_fx_book_from_env().max_age_seconds == 30
+
+
+async def test_cold_cross_is_requested_directly(mock_upstream, monkeypatch):
+    monkeypatch.setattr(api, "FX_BOOK", FxRateBook(max_age_seconds=60))
+
+    eur_jpy = await api.fetch_exchange_rate("EUR", "JPY")
+    await api.close_http_client()
+
+    assert "Derived" not in eur_jpy
+    assert float(eur_jpy[QUOTE_KEY]["5. Exchange Rate"]) == pytest.approx(
+        157.26 / 0.92165
+    )
+    assert mock_upstream.requests == {"CURRENCY_EXCHANGE_RATE": 1}
+
+
+async def test_exchange_rates_reuse_base_legs(mock_upstream, monkeypatch):
+    monkeypatch.setattr(api, "FX_BOOK", FxRateBook(max_age_seconds=60))
+
+    # Quoted against the base, so requested directly and kept as legs
+    usd_eur = await api.fetch_exchange_rate("USD", "EUR")
+    await api.fetch_exchange_rate("JPY", "USD")
+    eur_jpy = await api.fetch_exchange_rate("eur", "jpy")
+    # GBP has no leg, so the pair goes upstream
+    gbp_jpy = await api.fetch_exchange_rate("GBP", "JPY")
+    await api.close_http_client()
+
+    assert "Derived" not in usd_eur
+    assert float(eur_jpy[QUOTE_KEY]["5. Exchange Rate"]) == pytest.approx(
+        157.26 / 0.92165
+    )
+    assert eur_jpy["Derived"]["2. Legs"] == ["USD/EUR", "USD/JPY"]
+    assert eur_jpy[QUOTE_KEY]["1. From_Currency Code"] == "EUR"
+    assert "Derived" not in gbp_jpy
+    assert mock_upstream.requests == {"CURRENCY_EXCHANGE_RATE": 3}
+
+
+async def test_exchange_rate_matrix(mock_upstream, monkeypatch):
+    monkeypatch.setattr(api, "FX_BOOK", FxRateBook(max_age_seconds=60))
+
+    matrix = await api.fetch_exchange_rate_matrix(["EUR", "usd", "JPY", "EUR", "GBP"])
+    await api.close_http_client()
+
+    assert matrix["base"] == "USD"
+    assert matrix["currencies"] == ["EUR", "USD", "JPY", "GBP"]
+    assert matrix["derived"] is True
+    assert matrix["missing"] == {}
+    rates = matrix["rates"]
+    assert len(rates) == 16
+    # Row by row: the diagonal is one, and transposed entries are inverses
+    assert rates[0::5] == [1.0] * 4
+    assert rates[1] == pytest.approx(1 / 0.92165)
+    assert rates[2 * 4 + 3] == pytest.approx(0.78495 / 157.26)
+    assert rates[3 * 4 + 2] * rates[2 * 4 + 3] == pytest.approx(1.0)
+    # One request per currency other than the base
+    assert mock_upstream.requests == {"CURRENCY_EXCHANGE_RATE": 3}
@@ -0,0 +1,102 @@
+"""
+Tests for intraday histories assembled month by month.
+"""
+
+import time
+
+import pytest
+
+from alphavantage_mcp_server import api
+from alphavantage_mcp_server.history import parse_bounds, plan_months
+from alphavantage_mcp_server.mock_upstream import THROTTLE_NOTE
+from alphavantage_mcp_server.response_cache import ResponseCache
+
+
+def test_months_are_planned_across_years():
+    first, last = parse_bounds("2023-11-20", "2024-02")
+
+    assert (first, last) == ("2023-11-20", "2024-02-29")
+    assert plan_months(first, last) == ["2023-11", "2023-12", "2024-01", "2024-02"]
+    assert plan_months(*parse_bounds("2024-03", "2024-03-01")) == ["2024-03"]
+
+
+@pytest.mark.parametrize(
+    "start, end",
+    [("2024-13", "2024-12"), ("2024-02-30", "2024-03"), ("2024-03", "2024-02")],
+)
+def test_malformed_or_empty_ranges_are_rejected(start, end):
+    with pytest.raises(ValueError):
+        parse_bounds(start, end)
+
+
+async def test_history_skips_cached_months_and_stitches_columns(
+    mock_upstream, monkeypatch
+):
+    monkeypatch.setattr(api, "RESPONSE_CACHE", ResponseCache(ttl_seconds=60))
+    # February's 1min bars give its 15min bars without another request
+    await api.fetch_intraday("IBM", "1min", outputsize="full", month="2024-02")
+    mock_upstream.latency = 0.3
+    reports = []
+
+    async def progress(done, total, month):
+        reports.append((done, total, month))
+
+    started = time.perf_counter()
+    history = await api.fetch_intraday_history(
+        "IBM", "2024-01-15", "2024-03-05", "15min", progress=progress
+    )
+    elapsed = time.perf_counter() - started
+    await api.close_http_client()
+
+    # January and March were requested side by side
+    assert elapsed < 0.55
+    assert mock_upstream.requests == {"TIME_SERIES_INTRADAY": 3}
+    assert history["months"] == {"planned": 3, "cached": 1, "fetched": 2, "failed": {}}
+    assert [report[:2] for report in reports] == [(1, 3), (2, 3), (3, 3)]
+    assert sorted(report[2] for report in reports) == ["2024-01", "2024-02", "2024-03"]
+
+    stamps = history["timestamp"]
+    assert stamps == sorted(stamps)
+    assert stamps[0][:10] >= "2024-01-15" and stamps[-1][:10] <= "2024-03-05"
+    # 21 trading days of 64 extended-hours quarter hours in February
+    assert sum(stamp.startswith("2024-02") for stamp in stamps) == 21 * 64
+    for column in ("open", "high", "low", "close", "volume"):
+        assert len(history[column]) == len(stamps)
+    assert isinstance(history["close"][0], float)
+    assert isinstance(history["volume"][0], int)
+
+
+async def test_history_reports_months_that_failed(mock_upstream):
+    mock_upstream.throttle_per_minute = 1
+
+    history = await api.fetch_intraday_history("IBM", "2024-01", "2024-02", "60min")
+    await api.close_http_client()
+
+    assert history["months"]["fetched"] == 1
+    assert list(history["months"]["failed"].values()) == [THROTTLE_NOTE]
+    assert history["timestamp"]
+
+
+async def test_undecodable_month_and_failing_progress_do_not_abort(
+    mock_upstream, monkeypatch
+):
+    body_for = mock_upstream.body_for
+
+    def garbled_january(params):
+        if params.get("month") == "2024-01":
+            return b"<html>Service Unavailable</html>", "text/html"
+        return body_for(params)
+
+    monkeypatch.setattr(mock_upstream, "body_for", garbled_january)
+
+    async def progress(done, total, month):
+        raise ConnectionError("client went away")
+
+    history = await api.fetch_intraday_history(
+        "IBM", "2024-01", "2024-03", "60min", progress=progress
+    )
+    await api.close_http_client()
+
+    assert history["months"]["fetched"] == 2
+    assert list(history["months"]["failed"]) == ["2024-01"]
+    assert history["timestamp"][0].startswith("2024-02")
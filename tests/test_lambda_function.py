@@ -0,0 +1,111 @@
+"""
+Tests for the stateless AWS Lambda handler.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(
+    0, str(Path(__file__).parent.parent / "deploy" / "aws-stateless-mcp-lambda")
+)
+
+lambda_function = pytest.importorskip("lambda_function")
+
+
+def _invoke(method, request_id=1, params=None, headers=None):
+    body = {"jsonrpc": "2.0", "id": request_id, "method": method}
+    if params is not None:
+        body["params"] = params
+    event = {"body": json.dumps(body), "headers": headers or {}}
+    return lambda_function.lambda_handler(event, None)
+
+
+def test_event_loop_is_reused_across_invocations():
+    first = _invoke("initialize", params={})
+    loop = lambda_function.get_event_loop()
+    second = _invoke("tools/list", request_id=2)
+
+    assert first["statusCode"] == 200
+    assert second["statusCode"] == 200
+    assert lambda_function.get_event_loop() is loop
+    assert not loop.is_closed()
+
+
+def test_tools_list_is_cached_across_invocations():
+    first = json.loads(_invoke("tools/list", request_id=1)["body"])
+    cached = lambda_function._tools_list_cache
+    second = json.loads(_invoke("tools/list", request_id=2)["body"])
+
+    assert cached is not None
+    assert lambda_function._tools_list_cache is cached
+    assert first["result"] == second["result"]
+    assert second["id"] == 2
+
+
+@pytest.fixture
+def oauth_env(monkeypatch):
+    monkeypatch.setenv("OAUTH_ENABLED", "true")
+    monkeypatch.setenv("OAUTH_AUTHORIZATION_SERVER_URL", "https://auth.example.com")
+    monkeypatch.setenv("OAUTH_RESOURCE_SERVER_URI", "https://mcp.example.com")
+    monkeypatch.setenv("OAUTH_TOKEN_VALIDATION_METHOD", "jwt")
+    monkeypatch.setenv("OAUTH_JWT_ALGORITHM", "HS256")
+    monkeypatch.setenv("OAUTH_JWT_PUBLIC_KEY", "test-secret-" + "x" * 32)
+    monkeypatch.setattr(lambda_function, "_oauth_server", None)
+    monkeypatch.setattr(lambda_function, "_oauth_initialized", False)
+
+
+def test_oauth_rejects_invalid_token(oauth_env):
+    response = _invoke("tools/list", headers={"Authorization": "Bearer not-a-jwt"})
+
+    assert response["statusCode"] == 401
+    assert "invalid_token" in response["headers"]["WWW-Authenticate"]
+
+
+def test_oauth_accepts_valid_token_and_reuses_server(oauth_env):
+    import time
+
+    import jwt
+
+    token = jwt.encode(
+        {
+            "sub": "user-1",
+            "aud": "https://mcp.example.com",
+            "exp": int(time.time()) + 300,
+        },
+        "test-secret-" + "x" * 32,
+        algorithm="HS256",
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+
+    first = _invoke("tools/list", headers=headers)
+    oauth_server = lambda_function._oauth_server
+    second = _invoke("tools/list", request_id=2, headers=headers)
+
+    assert first["statusCode"] == 200
+    assert second["statusCode"] == 200
+    assert lambda_function._oauth_server is oauth_server
+    assert len(oauth_server.token_cache) == 1
+    assert oauth_server.token_cache.hits >= 1
+
+
+def test_sigterm_between_invocations_closes_the_loop():
+    _invoke("initialize", params={})
+    loop = lambda_function.get_event_loop()
+
+    with pytest.raises(SystemExit):
+        lambda_function._handle_sigterm(15, None)
+    assert loop.is_closed()
+
+
+def test_sigterm_during_an_invocation_leaves_the_running_loop_alone():
+    loop = lambda_function.get_event_loop()
+
+    async def interrupted():
+        lambda_function._handle_sigterm(15, None)
+
+    with pytest.raises(SystemExit):
+        loop.run_until_complete(interrupted())
+    assert not loop.is_closed()
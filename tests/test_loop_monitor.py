@@ -0,0 +1,60 @@
+"""
+Tests for the event loop lag monitor and blocking-call watchdog.
+"""
+
+import asyncio
+import logging
+import time
+
+from alphavantage_mcp_server import telemetry_bootstrap
+from alphavantage_mcp_server.loop_monitor import EventLoopMonitor
+
+
+def block_loop(seconds):
+    time.sleep(seconds)
+
+
+def lag_sum():
+    for family in telemetry_bootstrap.MCP_LOOP_LAG.collect():
+        for sample in family.samples:
+            if sample.name == "mcp_event_loop_lag_seconds_sum":
+                return sample.value
+    return 0.0
+
+
+async def test_blocking_call_shows_up_as_lag():
+    monitor = EventLoopMonitor(interval=0.01)
+    before = lag_sum()
+    monitor.start()
+    try:
+        await asyncio.sleep(0.03)
+        block_loop(0.2)
+        await asyncio.sleep(0.03)
+    finally:
+        await monitor.stop()
+
+    assert monitor.max_lag >= 0.15
+    assert lag_sum() - before >= 0.15
+
+
+async def test_watchdog_logs_blocking_stack(caplog):
+    monitor = EventLoopMonitor(interval=0.01, block_threshold=0.05, debug=True)
+    monitor.start()
+    try:
+        with caplog.at_level(logging.WARNING, "alphavantage_mcp_server.loop_monitor"):
+            await asyncio.sleep(0.1)
+            block_loop(0.3)
+            await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    blocked = [r.getMessage() for r in caplog.records if "blocked" in r.getMessage()]
+    assert len(blocked) == 1
+    assert "block_loop" in blocked[0]
+
+
+async def test_disabled_monitor_starts_nothing():
+    monitor = EventLoopMonitor(interval=0)
+    monitor.start()
+    assert monitor._task is None
+    await monitor.stop()
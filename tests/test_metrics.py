@@ -0,0 +1,94 @@
+"""
+Tests that instrumented tools emit Prometheus metrics with the labels the
+metric definitions declare.
+"""
+
+import pytest
+
+from alphavantage_mcp_server import telemetry_bootstrap
+from alphavantage_mcp_server.telemetry_bootstrap import (
+    MCP_SERVER_NAME,
+    MCP_SERVER_VERSION,
+)
+from alphavantage_mcp_server.telemetry_instrument import instrument_tool
+
+pytestmark = pytest.mark.skipif(
+    not telemetry_bootstrap.is_telemetry_enabled(),
+    reason="telemetry disabled via MCP_TELEMETRY_ENABLED",
+)
+
+
+def sample_value(metric, name, **labels):
+    """Return the value of the sample matching name and labels, or None."""
+    for family in metric.collect():
+        for sample in family.samples:
+            if sample.name == name and all(
+                sample.labels.get(key) == value for key, value in labels.items()
+            ):
+                return sample.value
+    return None
+
+
+async def test_calls_and_latency_are_recorded():
+    @instrument_tool("metrics_test_ok")
+    async def tool(symbol):
+        return {"symbol": symbol}
+
+    labels = {
+        "tool": "metrics_test_ok",
+        "server": MCP_SERVER_NAME,
+        "version": MCP_SERVER_VERSION,
+    }
+
+    await tool("IBM")
+    await tool("AAPL")
+
+    calls = sample_value(
+        telemetry_bootstrap.MCP_CALLS, "mcp_tool_calls_total", outcome="ok", **labels
+    )
+    latency_count = sample_value(
+        telemetry_bootstrap.MCP_LAT, "mcp_tool_latency_seconds_count", **labels
+    )
+    assert calls == 2
+    assert latency_count == 2
+
+
+def test_errors_are_counted_by_kind():
+    @instrument_tool("metrics_test_error")
+    def tool():
+        raise ValueError("bad symbol")
+
+    with pytest.raises(ValueError):
+        tool()
+
+    labels = {
+        "tool": "metrics_test_error",
+        "server": MCP_SERVER_NAME,
+        "version": MCP_SERVER_VERSION,
+    }
+    assert (
+        sample_value(
+            telemetry_bootstrap.MCP_CALLS,
+            "mcp_tool_calls_total",
+            outcome="error",
+            **labels,
+        )
+        == 1
+    )
+    assert (
+        sample_value(
+            telemetry_bootstrap.MCP_ERRS,
+            "mcp_tool_errors_total",
+            tool="metrics_test_error",
+            error_kind="bad_input",
+        )
+        == 1
+    )
+    assert (
+        sample_value(
+            telemetry_bootstrap.MCP_CONC,
+            "mcp_tool_active_concurrency",
+            tool="metrics_test_error",
+        )
+        == 0
+    )
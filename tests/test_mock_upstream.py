@@ -0,0 +1,106 @@
+"""
+Tests for the local Alpha Vantage stand-in.
+"""
+
+import time
+
+import httpx
+
+from alphavantage_mcp_server import api
+from alphavantage_mcp_server.mock_upstream import THROTTLE_NOTE
+
+
+def get(params):
+    return httpx.get(api.API_BASE_URL, params={"apikey": "demo", **params})
+
+
+def test_replays_recording_per_function(mock_upstream):
+    quote = get({"function": "GLOBAL_QUOTE", "symbol": "IBM"}).json()
+    daily = get({"function": "TIME_SERIES_DAILY", "symbol": "IBM"}).json()
+
+    assert quote["Global Quote"]["01. symbol"] == "IBM"
+    assert len(daily["Time Series (Daily)"]) == 100
+    assert mock_upstream.requests == {"GLOBAL_QUOTE": 1, "TIME_SERIES_DAILY": 1}
+
+
+def test_full_output_extends_series_back_in_time(mock_upstream):
+    mock_upstream.full_size = 1000
+    daily = get(
+        {"function": "TIME_SERIES_DAILY", "symbol": "IBM", "outputsize": "full"}
+    ).json()["Time Series (Daily)"]
+
+    dates = list(daily)
+    assert len(dates) == 1000
+    assert dates == sorted(dates, reverse=True)
+    assert dates[0] == "2024-05-31"
+
+
+def test_intraday_honours_interval_and_month(mock_upstream):
+    payload = get(
+        {
+            "function": "TIME_SERIES_INTRADAY",
+            "symbol": "IBM",
+            "interval": "15min",
+            "month": "2024-02",
+            "outputsize": "full",
+        }
+    ).json()
+
+    series = payload["Time Series (15min)"]
+    assert payload["Meta Data"]["4. Interval"] == "15min"
+    assert next(iter(series)) == "2024-02-29 19:45:00"
+    assert all(stamp.startswith("2024-02") for stamp in series)
+    # 21 trading days of 64 bars each
+    assert len(series) == 21 * 64
+
+
+def test_csv_datatype(mock_upstream):
+    body = get(
+        {"function": "TIME_SERIES_DAILY", "symbol": "IBM", "datatype": "csv"}
+    ).text
+
+    lines = body.splitlines()
+    assert lines[0] == "timestamp,open,high,low,close,volume"
+    assert len(lines) == 101
+
+
+def test_throttle_note_after_budget(mock_upstream):
+    mock_upstream.throttle_per_minute = 2
+    bodies = [get({"function": "GLOBAL_QUOTE"}).json() for _ in range(3)]
+
+    assert "Global Quote" in bodies[1]
+    assert bodies[2] == {"Information": THROTTLE_NOTE}
+
+
+def test_error_injection(mock_upstream):
+    mock_upstream.error_rate = 1.0
+    mock_upstream.error_kinds = ("server_error",)
+    assert get({"function": "GLOBAL_QUOTE"}).status_code == 500
+
+    mock_upstream.error_kinds = ("invalid_call",)
+    assert "Error Message" in get({"function": "GLOBAL_QUOTE"}).json()
+
+
+def test_unknown_function_and_missing_key(mock_upstream):
+    assert "Error Message" in get({"function": "NOT_A_FUNCTION"}).json()
+    response = httpx.get(api.API_BASE_URL, params={"function": "GLOBAL_QUOTE"})
+    assert "apikey" in response.json()["Error Message"]
+
+
+async def test_tool_call_against_mock(mock_upstream):
+    try:
+        result = await api.fetch_time_series_daily("IBM", outputsize="full")
+    finally:
+        await api.close_http_client()
+
+    assert len(result["Time Series (Daily)"]) == mock_upstream.full_size
+
+
+async def test_added_latency(mock_upstream):
+    mock_upstream.latency = 0.05
+    start = time.perf_counter()
+    try:
+        await api.fetch_quote("IBM")
+    finally:
+        await api.close_http_client()
+    assert time.perf_counter() - start >= 0.05
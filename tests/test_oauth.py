@@ -0,0 +1,346 @@
+"""
+Unit tests for OAuth access token validation.
+"""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import jwt
+import pytest
+
+from alphavantage_mcp_server.oauth import (
+    OAuthConfig,
+    OAuthResourceServer,
+    SecureSessionManager,
+    TokenValidationCache,
+    TokenValidationResult,
+)
+
+rsa = pytest.importorskip("cryptography.hazmat.primitives.asymmetric.rsa")
+serialization = pytest.importorskip("cryptography.hazmat.primitives.serialization")
+
+RESOURCE_URI = "https://mcp.example.com"
+
+
+@pytest.fixture(scope="module")
+def rsa_keys():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_pem = (
+        private_key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+    return private_key, public_pem
+
+
+@pytest.fixture
+def oauth_server(rsa_keys):
+    _, public_pem = rsa_keys
+    config = OAuthConfig(
+        authorization_server_url="https://auth.example.com",
+        resource_server_uri=RESOURCE_URI,
+        jwt_public_key=public_pem,
+    )
+    return OAuthResourceServer(config)
+
+
+def make_token(private_key, **claims):
+    payload = {
+        "sub": "user-1",
+        "aud": RESOURCE_URI,
+        "exp": int(time.time()) + 300,
+        **claims,
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256")
+
+
+async def test_valid_jwt_is_accepted(oauth_server, rsa_keys):
+    token = make_token(rsa_keys[0])
+    result = await oauth_server.validate_access_token(token)
+
+    assert result.valid
+    assert result.subject == "user-1"
+
+
+async def test_wrong_audience_is_rejected(oauth_server, rsa_keys):
+    token = make_token(rsa_keys[0], aud="https://other.example.com")
+    result = await oauth_server.validate_access_token(token)
+
+    assert not result.valid
+    assert result.error == "Invalid audience"
+
+
+async def test_pem_with_escaped_newlines_is_parsed(rsa_keys):
+    private_key, public_pem = rsa_keys
+    config = OAuthConfig(
+        authorization_server_url="https://auth.example.com",
+        resource_server_uri=RESOURCE_URI,
+        jwt_public_key=public_pem.replace("\n", "\\n"),
+    )
+    server = OAuthResourceServer(config)
+
+    result = await server.validate_access_token(make_token(private_key))
+    assert result.valid
+
+
+async def test_repeated_token_skips_signature_verification(oauth_server, rsa_keys):
+    token = make_token(rsa_keys[0])
+    await oauth_server.validate_access_token(token)
+
+    with patch("alphavantage_mcp_server.oauth.jwt.decode") as decode:
+        result = await oauth_server.validate_access_token(token)
+
+    decode.assert_not_called()
+    assert result.valid
+
+
+async def test_cached_token_expires_with_exp_claim(oauth_server, rsa_keys):
+    token = make_token(rsa_keys[0], exp=int(time.time()) + 60)
+    assert (await oauth_server.validate_access_token(token)).valid
+
+    with (
+        patch(
+            "alphavantage_mcp_server.oauth.time.time", return_value=time.time() + 120
+        ),
+        patch(
+            "alphavantage_mcp_server.oauth.jwt.decode",
+            side_effect=jwt.ExpiredSignatureError,
+        ) as decode,
+    ):
+        result = await oauth_server.validate_access_token(token)
+
+    decode.assert_called_once()
+    assert not result.valid
+
+
+async def test_warm_validations_hit_the_cache(oauth_server, rsa_keys):
+    tokens = [make_token(rsa_keys[0], jti=str(i)) for i in range(50)]
+
+    with patch("alphavantage_mcp_server.oauth.jwt.decode", wraps=jwt.decode) as decode:
+        for _ in range(2):
+            for token in tokens:
+                assert (await oauth_server.validate_access_token(token)).valid
+
+    # Each signature is verified once; the second pass is served from the cache
+    assert decode.call_count == len(tokens)
+    assert oauth_server.token_cache.hits == len(tokens)
+    assert oauth_server.token_cache.misses == len(tokens)
+
+
+async def test_invalid_token_is_negatively_cached(oauth_server):
+    with patch(
+        "alphavantage_mcp_server.oauth.jwt.decode",
+        side_effect=jwt.InvalidSignatureError("bad signature"),
+    ) as decode:
+        first = await oauth_server.validate_access_token("forged")
+        second = await oauth_server.validate_access_token("forged")
+
+    assert not first.valid and not second.valid
+    decode.assert_called_once()
+
+
+async def test_introspection_result_is_cached():
+    config = OAuthConfig(
+        authorization_server_url="https://auth.example.com",
+        resource_server_uri=RESOURCE_URI,
+        token_validation_method="introspection",
+        introspection_endpoint="https://auth.example.com/introspect",
+    )
+    server = OAuthResourceServer(config)
+    response = MagicMock(status_code=200)
+    response.json.return_value = {
+        "active": True,
+        "sub": "user-1",
+        "aud": RESOURCE_URI,
+        "exp": int(time.time()) + 300,
+    }
+    server._http_client.post = AsyncMock(return_value=response)
+
+    for _ in range(10):
+        assert (await server.validate_access_token("opaque-token")).valid
+
+    server._http_client.post.assert_awaited_once()
+    assert server.token_cache.hits == 9
+    assert server.token_cache.hit_rate == pytest.approx(0.9)
+
+
+def test_token_cache_respects_max_ttl_and_exp():
+    cache = TokenValidationCache(max_entries=10, max_ttl=60, negative_ttl=5)
+    now = 1_000_000.0
+    with patch("alphavantage_mcp_server.oauth.time.time", return_value=now):
+        cache.set("long", TokenValidationResult(True, {"exp": now + 3600}))
+        cache.set("short", TokenValidationResult(True, {"exp": now + 10}))
+        cache.set("denied", TokenValidationResult(False, error="Invalid audience"))
+        cache.set("outage", TokenValidationResult(False, error="Introspection failed"))
+
+    with patch("alphavantage_mcp_server.oauth.time.time", return_value=now + 30):
+        assert cache.get("long") is not None
+        assert cache.get("short") is None
+        assert cache.get("denied") is None
+        assert cache.get("outage") is None
+
+    with patch("alphavantage_mcp_server.oauth.time.time", return_value=now + 61):
+        assert cache.get("long") is None
+
+
+def test_token_cache_is_bounded():
+    cache = TokenValidationCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, TokenValidationResult(True, {"sub": key}))
+
+    assert len(cache) == 2
+    assert cache.get("a") is None
+    assert cache.get("c").subject == "c"
+
+
+def make_jwks_server(public_keys, requests, status=None):
+    """Mock authorization server publishing metadata and a JWKS."""
+    status = status if status is not None else {"certs": 200}
+
+    def handler(request):
+        requests.append(request.url.path)
+        if request.url.path == "/.well-known/oauth-authorization-server/realms/mcp":
+            return httpx.Response(
+                200, json={"jwks_uri": "https://auth.example.com/realms/mcp/certs"}
+            )
+        if request.url.path == "/realms/mcp/certs":
+            if status["certs"] != 200:
+                return httpx.Response(status["certs"])
+            keys = []
+            for kid, public_key in public_keys.items():
+                jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(public_key))
+                keys.append({**jwk, "kid": kid, "use": "sig"})
+            return httpx.Response(200, json={"keys": keys})
+        return httpx.Response(404)
+
+    config = OAuthConfig(
+        authorization_server_url="https://auth.example.com/realms/mcp",
+        resource_server_uri=RESOURCE_URI,
+    )
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return OAuthResourceServer(config, http_client=http_client)
+
+
+async def test_jwks_keys_are_discovered_and_reused(rsa_keys):
+    private_key, _ = rsa_keys
+    requests = []
+    server = make_jwks_server({"key-1": private_key.public_key()}, requests)
+
+    for i in range(5):
+        token = jwt.encode(
+            {"sub": "user-1", "aud": RESOURCE_URI, "jti": str(i)},
+            private_key,
+            algorithm="RS256",
+            headers={"kid": "key-1"},
+        )
+        assert (await server.validate_access_token(token)).valid
+
+    assert requests.count("/realms/mcp/certs") == 1
+    assert server.jwks_cache.jwks_uri == "https://auth.example.com/realms/mcp/certs"
+
+
+async def test_unknown_kid_triggers_rate_limited_refresh(rsa_keys):
+    old_key, _ = rsa_keys
+    new_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    published = {"key-1": old_key.public_key()}
+    requests = []
+    server = make_jwks_server(published, requests)
+    await server.jwks_cache.refresh()
+
+    # The authorization server rotates to a new signing key
+    published["key-2"] = new_key.public_key()
+    server.jwks_cache._last_attempt -= server.jwks_cache.min_refresh_interval
+    rotated = jwt.encode(
+        {"sub": "user-1", "aud": RESOURCE_URI},
+        new_key,
+        algorithm="RS256",
+        headers={"kid": "key-2"},
+    )
+    assert (await server.validate_access_token(rotated)).valid
+    assert requests.count("/realms/mcp/certs") == 2
+
+    # Unknown key IDs cannot force another fetch within the rate limit
+    forged = jwt.encode(
+        {"sub": "user-1", "aud": RESOURCE_URI},
+        new_key,
+        algorithm="RS256",
+        headers={"kid": "key-3"},
+    )
+    result = await server.validate_access_token(forged)
+    assert result.error == "Unknown signing key"
+    assert requests.count("/realms/mcp/certs") == 2
+
+
+async def test_failing_jwks_endpoint_is_not_flooded(rsa_keys):
+    private_key, _ = rsa_keys
+    requests = []
+    status = {"certs": 503}
+    server = make_jwks_server({"key-1": private_key.public_key()}, requests, status)
+    tokens = [
+        jwt.encode(
+            {"sub": "user-1", "aud": RESOURCE_URI, "jti": str(i)},
+            private_key,
+            algorithm="RS256",
+            headers={"kid": "key-1"},
+        )
+        for i in range(20)
+    ]
+
+    sequential = [await server.validate_access_token(token) for token in tokens[:10]]
+    concurrent = await asyncio.gather(
+        *(server.validate_access_token(token) for token in tokens[10:])
+    )
+
+    assert not any(result.valid for result in sequential + concurrent)
+    assert requests.count("/realms/mcp/certs") == 1
+
+    # Once the rate limit allows, the next token retries and succeeds
+    status["certs"] = 200
+    server.jwks_cache._last_attempt -= server.jwks_cache.min_refresh_interval
+    server.token_cache.clear()
+    assert (await server.validate_access_token(tokens[0])).valid
+    assert requests.count("/realms/mcp/certs") == 2
+
+
+def test_session_store_is_bounded():
+    manager = SecureSessionManager(max_sessions=3)
+    session_ids = [manager.generate_session_id("user-1") for _ in range(5)]
+
+    assert len(manager) == 3
+    assert not manager.validate_session(session_ids[0], "user-1")
+    assert manager.validate_session(session_ids[-1], "user-1")
+    assert not manager.validate_session(session_ids[-1], "user-2")
+
+
+def test_expired_sessions_are_rejected_and_cleaned_up():
+    manager = SecureSessionManager(max_age_seconds=60)
+    with patch("alphavantage_mcp_server.oauth.time.monotonic", return_value=0):
+        old_session = manager.generate_session_id("user-1")
+    with patch("alphavantage_mcp_server.oauth.time.monotonic", return_value=50):
+        new_session = manager.generate_session_id("user-1")
+
+    with patch("alphavantage_mcp_server.oauth.time.monotonic", return_value=70):
+        assert not manager.validate_session(old_session, "user-1")
+        assert manager.validate_session(new_session, "user-1")
+
+    with patch("alphavantage_mcp_server.oauth.time.monotonic", return_value=200):
+        assert manager.cleanup_expired_sessions() == 1
+    assert len(manager) == 0
+
+
+async def test_periodic_cleanup_runs_until_stopped():
+    manager = SecureSessionManager(max_age_seconds=0)
+    manager.generate_session_id("user-1")
+    manager.start_periodic_cleanup(interval_seconds=0.01)
+
+    await asyncio.sleep(0.05)
+    await manager.stop_periodic_cleanup()
+
+    assert len(manager) == 0
+    assert manager._cleanup_task is None
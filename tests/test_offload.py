@@ -0,0 +1,53 @@
+"""
+Tests for the size-based offloading of payload processing.
+"""
+
+import json
+import threading
+
+import pytest
+
+from alphavantage_mcp_server import offload
+
+
+@pytest.fixture
+def threshold(monkeypatch):
+    monkeypatch.setattr(offload, "OFFLOAD_THRESHOLD_BYTES", 1024)
+    yield 1024
+    offload.shutdown_executor()
+
+
+def current_thread_name():
+    return threading.current_thread().name
+
+
+async def test_small_payloads_stay_on_the_loop_thread(threshold):
+    assert await offload.run_sized(100, current_thread_name) == (
+        threading.current_thread().name
+    )
+
+
+async def test_large_payloads_run_in_the_worker_pool(threshold):
+    name = await offload.run_sized(threshold, current_thread_name)
+    assert name.startswith("alphavantage-offload")
+
+
+async def test_zero_threshold_disables_offloading(monkeypatch):
+    monkeypatch.setattr(offload, "OFFLOAD_THRESHOLD_BYTES", 0)
+    assert not offload.should_offload(10**9)
+
+
+async def test_decode_and_encode_match_inline_json(threshold):
+    payload = {
+        "Meta Data": {"2. Symbol": "IBM"},
+        "Time Series (5min)": {
+            f"2024-01-02 {i // 60:02d}:{i % 60:02d}:00": {"4. close": f"{i}.00"}
+            for i in range(500)
+        },
+    }
+    body = json.dumps(payload).encode()
+    assert offload.should_offload(len(body))
+
+    decoded = await offload.decode_json(body)
+    assert decoded == payload
+    assert await offload.encode_json(decoded) == json.dumps(payload, indent=2)
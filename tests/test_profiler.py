@@ -0,0 +1,104 @@
+"""
+Tests for the event loop sampling profiler.
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from alphavantage_mcp_server import profiler
+
+
+def burn_cpu(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.fixture
+def busy_loop(monkeypatch):
+    """Event loop in a background thread running a task that blocks on CPU."""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    async def hog():
+        while True:
+            burn_cpu(0.05)
+            await asyncio.sleep(0.01)
+
+    def run():
+        asyncio.set_event_loop(loop)
+        profiler.attach_event_loop(loop)
+        task = loop.create_task(hog(), name="cpu-hog")
+        loop.call_soon(ready.set)
+        loop.run_forever()
+        task.cancel()
+        loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+
+    monkeypatch.setattr(profiler, "_loop", None)
+    monkeypatch.setattr(profiler, "_loop_thread_id", None)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    ready.wait()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def test_samples_are_attributed_to_blocking_task(busy_loop):
+    result = profiler.sample_thread(
+        profiler._loop_thread_id, seconds=0.3, hz=200, loop=busy_loop
+    )
+
+    assert result.samples > 10
+    hog_stacks = [stack for stack in result.stacks if stack.startswith("task:cpu-hog")]
+    assert any("test_profiler:burn_cpu" in stack for stack in hog_stacks)
+
+    (task,) = result.to_dict()["tasks"]
+    assert task["name"] == "cpu-hog"
+    assert task["coro"].endswith("hog")
+    assert task["longest_blocking_seconds"] >= 0.02
+
+
+def test_profile_endpoint_serves_collapsed_stacks_and_metrics(busy_loop):
+    httpd = profiler.start_metrics_server(0)
+    base = f"http://127.0.0.1:{httpd.server_port}"
+    try:
+        collapsed = httpx.get(f"{base}/debug/profile?seconds=0.2", timeout=5)
+        report = httpx.get(f"{base}/debug/profile?seconds=0.2&format=json", timeout=5)
+        metrics = httpx.get(f"{base}/metrics", timeout=5)
+    finally:
+        httpd.shutdown()
+
+    assert collapsed.status_code == 200
+    line = collapsed.text.splitlines()[0]
+    stack, count = line.rsplit(" ", 1)
+    assert int(count) > 0 and stack
+
+    assert report.status_code == 200
+    assert json.loads(report.text)["samples"] > 0
+    assert metrics.status_code == 200
+
+
+def test_profile_endpoint_rejects_remote_clients():
+    statuses = []
+    body = profiler.profile_app(
+        {"REMOTE_ADDR": "10.0.0.5", "QUERY_STRING": ""},
+        lambda status, headers: statuses.append(status),
+    )
+    assert statuses == ["403 Forbidden"]
+    assert body == [b"Forbidden"]
+
+
+def test_profile_endpoint_validates_duration():
+    statuses = []
+    profiler.profile_app(
+        {"REMOTE_ADDR": "127.0.0.1", "QUERY_STRING": "seconds=-1"},
+        lambda status, headers: statuses.append(status),
+    )
+    assert statuses == ["400 Bad Request"]
@@ -0,0 +1,314 @@
+"""
+Tests for series resampled from finer bars.
+"""
+
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from alphavantage_mcp_server import api, resample
+from alphavantage_mcp_server.resample import aggregate_intraday, resample_daily
+from alphavantage_mcp_server.response_cache import ResponseCache
+
+
+def daily_payload(bars, adjusted=False):
+    series = {}
+    for day, (open_, high, low, close, volume, *dividend) in bars.items():
+        bar = {
+            "1. open": open_,
+            "2. high": high,
+            "3. low": low,
+            "4. close": close,
+        }
+        if adjusted:
+            bar["5. adjusted close"] = close
+            bar["6. volume"] = volume
+            bar["7. dividend amount"] = dividend[0] if dividend else "0.0000"
+            bar["8. split coefficient"] = "1.0"
+        else:
+            bar["5. volume"] = volume
+        series[day] = bar
+    return {
+        "Meta Data": {
+            "1. Information": "Daily Prices (open, high, low, close) and Volumes",
+            "2. Symbol": "IBM",
+            "3. Last Refreshed": max(bars),
+            "4. Output Size": "Full size",
+            "5. Time Zone": "US/Eastern",
+        },
+        # Newest first, as upstream lists them
+        "Time Series (Daily)": dict(sorted(series.items(), reverse=True)),
+    }
+
+
+# 2024-03-29 was Good Friday, so that week ends on Thursday
+BARS = {
+    "2024-03-25": ("190.0000", "191.0000", "189.5000", "190.5000", "100"),
+    "2024-03-26": ("190.5000", "192.2500", "190.0000", "191.0000", "200"),
+    "2024-03-27": ("191.0000", "191.5000", "188.1000", "189.0000", "300"),
+    "2024-03-28": ("189.0000", "190.9000", "188.9000", "190.9600", "400", "1.6600"),
+    "2024-04-01": ("190.9600", "193.0000", "190.0000", "192.0000", "500"),
+    "2024-04-02": ("192.0000", "192.5000", "187.0000", "188.0000", "600"),
+}
+
+
+NUMPY_OR_NOT = pytest.mark.parametrize(
+    "use_numpy",
+    [
+        pytest.param(
+            True,
+            marks=pytest.mark.skipif(resample.numpy is None, reason="needs numpy"),
+        ),
+        False,
+    ],
+)
+
+
+@NUMPY_OR_NOT
+def test_weeks_are_keyed_by_their_last_trading_day(use_numpy, monkeypatch):
+    if not use_numpy:
+        monkeypatch.setattr(resample, "numpy", None)
+    weekly = resample_daily(daily_payload(BARS), "weekly")
+
+    assert weekly["Meta Data"] == {
+        "1. Information": "Weekly Prices (open, high, low, close) and Volumes",
+        "2. Symbol": "IBM",
+        "3. Last Refreshed": "2024-04-02",
+        "4. Time Zone": "US/Eastern",
+    }
+    series = weekly["Weekly Time Series"]
+    # Newest first, with the unfinished current week included
+    assert list(series) == ["2024-04-02", "2024-03-28"]
+    assert series["2024-03-28"] == {
+        "1. open": "190.0000",
+        "2. high": "192.2500",
+        "3. low": "188.1000",
+        "4. close": "190.9600",
+        "5. volume": "1000",
+    }
+
+
+@NUMPY_OR_NOT
+def test_months_are_keyed_by_their_last_trading_day(use_numpy, monkeypatch):
+    if not use_numpy:
+        monkeypatch.setattr(resample, "numpy", None)
+    monthly = resample_daily(daily_payload(BARS), "monthly")
+
+    series = monthly["Monthly Time Series"]
+    assert list(series) == ["2024-04-02", "2024-03-28"]
+    assert series["2024-04-02"] == {
+        "1. open": "190.9600",
+        "2. high": "193.0000",
+        "3. low": "187.0000",
+        "4. close": "188.0000",
+        "5. volume": "1100",
+    }
+
+
+@NUMPY_OR_NOT
+def test_adjusted_series_sum_dividends_and_keep_last_adjusted_close(
+    use_numpy, monkeypatch
+):
+    if not use_numpy:
+        monkeypatch.setattr(resample, "numpy", None)
+    monthly = resample_daily(daily_payload(BARS, adjusted=True), "monthly", True)
+
+    assert monthly["Meta Data"]["1. Information"] == (
+        "Monthly Adjusted Prices and Volumes"
+    )
+    assert monthly["Monthly Adjusted Time Series"]["2024-03-28"] == {
+        "1. open": "190.0000",
+        "2. high": "192.2500",
+        "3. low": "188.1000",
+        "4. close": "190.9600",
+        "5. adjusted close": "190.9600",
+        "6. volume": "1000",
+        "7. dividend amount": "1.6600",
+    }
+
+
+@pytest.mark.skipif(resample.numpy is None, reason="needs numpy")
+@pytest.mark.parametrize("period", ["weekly", "monthly"])
+def test_vectorized_resampling_matches_the_loop(period, monkeypatch):
+    rng = random.Random(11)
+    bars = {}
+    day = date(2019, 12, 27)
+    while len(bars) < 400:
+        day += timedelta(days=rng.choice([1, 1, 1, 3]))
+        # Few distinct highs and lows, so most periods have ties
+        high, low = rng.choice([101, 102, 103]), rng.choice([97, 98, 99])
+        bars[day.isoformat()] = (
+            "100.0000",
+            f"{high}.{rng.randint(0, 1)}000",
+            f"{low}.{rng.randint(0, 1)}000",
+            f"{rng.uniform(98, 101):.4f}",
+            str(rng.randint(1, 10**7)),
+            f"{rng.choice([0, 0, 0, rng.uniform(0, 2)]):.4f}",
+        )
+    payload = daily_payload(bars, adjusted=True)
+
+    vectorized = resample_daily(payload, period, adjusted=True)
+    monkeypatch.setattr(resample, "numpy", None)
+    looped = resample_daily(payload, period, adjusted=True)
+
+    assert vectorized == looped
+
+
+def test_unusable_payloads_are_not_resampled():
+    assert resample_daily(daily_payload(BARS), "weekly", adjusted=True) is None
+    assert resample_daily({"Note": "throttled"}, "weekly") is None
+    assert resample_daily("timestamp,open\n", "monthly") is None
+
+
+async def test_weekly_comes_from_cached_full_daily_history(mock_upstream, monkeypatch):
+    monkeypatch.setattr(api, "RESPONSE_CACHE", ResponseCache(ttl_seconds=60))
+    mock_upstream.full_size = 500
+
+    daily = await api.fetch_time_series_daily("IBM", outputsize="full")
+    weekly = await api.fetch_time_series_weekly("IBM")
+    monthly = await api.fetch_time_series_monthly("IBM")
+    # No full daily history of this symbol is cached
+    await api.fetch_time_series_weekly("AAPL")
+    await api.close_http_client()
+
+    assert weekly == resample_daily(daily, "weekly")
+    assert monthly == resample_daily(daily, "monthly")
+    assert mock_upstream.requests == {"TIME_SERIES_DAILY": 1, "TIME_SERIES_WEEKLY": 1}
+
+
+def intraday_payload(bars):
+    return {
+        "Meta Data": {
+            "1. Information": "Intraday (1min) open, high, low, close prices and volume",
+            "2. Symbol": "IBM",
+            "3. Last Refreshed": max(bars),
+            "4. Interval": "1min",
+            "5. Output Size": "Full size",
+            "6. Time Zone": "US/Eastern",
+        },
+        "Time Series (1min)": {
+            stamp: {
+                "1. open": open_,
+                "2. high": high,
+                "3. low": low,
+                "4. close": close,
+                "5. volume": volume,
+            }
+            for stamp, (open_, high, low, close, volume) in sorted(
+                bars.items(), reverse=True
+            )
+        },
+    }
+
+
+MINUTES = {
+    "2024-05-31 09:28:00": ("10.0000", "10.5000", "9.9000", "10.1000", "5"),
+    "2024-05-31 09:29:00": ("10.1000", "10.2000", "10.0000", "10.2000", "7"),
+    "2024-05-31 09:30:00": ("10.2000", "11.0000", "10.1000", "10.9000", "20"),
+    "2024-05-31 09:33:00": ("10.9000", "10.9500", "10.4000", "10.5000", "30"),
+    "2024-05-31 09:35:00": ("10.5000", "10.6000", "10.3000", "10.4000", "40"),
+}
+
+
+@NUMPY_OR_NOT
+def test_intraday_bars_are_keyed_by_the_start_of_their_interval(use_numpy, monkeypatch):
+    if not use_numpy:
+        monkeypatch.setattr(resample, "numpy", None)
+    aggregated = aggregate_intraday(intraday_payload(MINUTES), "5min")
+
+    assert aggregated["Meta Data"]["1. Information"] == (
+        "Intraday (5min) open, high, low, close prices and volume"
+    )
+    assert aggregated["Meta Data"]["3. Last Refreshed"] == "2024-05-31 09:35:00"
+    assert aggregated["Meta Data"]["4. Interval"] == "5min"
+    series = aggregated["Time Series (5min)"]
+    assert list(series) == [
+        "2024-05-31 09:35:00",
+        "2024-05-31 09:30:00",
+        "2024-05-31 09:25:00",
+    ]
+    assert series["2024-05-31 09:30:00"] == {
+        "1. open": "10.2000",
+        "2. high": "11.0000",
+        "3. low": "10.1000",
+        "4. close": "10.5000",
+        "5. volume": "50",
+    }
+
+
+@NUMPY_OR_NOT
+def test_regular_hours_drop_pre_and_post_market_bars(use_numpy, monkeypatch):
+    if not use_numpy:
+        monkeypatch.setattr(resample, "numpy", None)
+    aggregated = aggregate_intraday(
+        intraday_payload(MINUTES), "15min", extended_hours=False, compact=True
+    )
+
+    assert aggregated["Meta Data"]["5. Output Size"] == "Compact"
+    assert aggregated["Time Series (15min)"] == {
+        "2024-05-31 09:30:00": {
+            "1. open": "10.2000",
+            "2. high": "11.0000",
+            "3. low": "10.1000",
+            "4. close": "10.4000",
+            "5. volume": "90",
+        }
+    }
+
+
+@pytest.mark.skipif(resample.numpy is None, reason="needs numpy")
+@pytest.mark.parametrize("extended_hours", [True, False])
+@pytest.mark.parametrize("interval", ["5min", "30min", "60min"])
+def test_vectorized_intraday_aggregation_matches_the_loop(
+    interval, extended_hours, monkeypatch
+):
+    rng = random.Random(5)
+    start = datetime(2024, 5, 30, 4, 0)
+    bars = {}
+    for minute in range(2 * 24 * 60):
+        # Sparse bars, as thinly traded minutes are missing upstream
+        if rng.random() < 0.3:
+            stamp = (start + timedelta(minutes=minute)).strftime("%Y-%m-%d %H:%M:%S")
+            bars[stamp] = (
+                "10.0000",
+                f"{rng.choice([10.5, 10.6]):.4f}",
+                f"{rng.choice([9.4, 9.5]):.4f}",
+                f"{rng.uniform(9.5, 10.5):.4f}",
+                str(rng.randint(1, 1000)),
+            )
+    payload = intraday_payload(bars)
+
+    vectorized = aggregate_intraday(payload, interval, extended_hours)
+    monkeypatch.setattr(resample, "numpy", None)
+    looped = aggregate_intraday(payload, interval, extended_hours)
+
+    assert vectorized == looped
+
+
+def test_intervals_not_divisible_by_the_source_are_not_aggregated():
+    five_minutes = aggregate_intraday(intraday_payload(MINUTES), "5min")
+
+    assert aggregate_intraday(five_minutes, "1min") is None
+    assert aggregate_intraday(five_minutes, "7min") is None
+
+
+async def test_intraday_comes_from_cached_finer_bars(mock_upstream, monkeypatch):
+    monkeypatch.setattr(api, "RESPONSE_CACHE", ResponseCache(ttl_seconds=60))
+
+    await api.fetch_intraday("IBM", "1min", outputsize="full", month="2024-02")
+    extended = await api.fetch_intraday(
+        "IBM", "15min", outputsize="full", month="2024-02"
+    )
+    regular = await api.fetch_intraday(
+        "IBM", "60min", extended_hours=False, month="2024-02"
+    )
+    await api.close_http_client()
+
+    # 21 trading days of 64 extended-hours quarter hours
+    assert len(extended["Time Series (15min)"]) == 21 * 64
+    series = regular["Time Series (60min)"]
+    assert len(series) == 100
+    assert next(iter(series)) == "2024-02-29 15:00:00"
+    assert all("09:00:00" <= stamp[11:] <= "15:00:00" for stamp in series)
+    assert mock_upstream.requests == {"TIME_SERIES_INTRADAY": 1}
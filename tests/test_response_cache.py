@@ -0,0 +1,137 @@
+"""
+Unit tests for the upstream response cache.
+"""
+
+import copy
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from alphavantage_mcp_server import api
+from alphavantage_mcp_server.response_cache import (
+    ResponseCache,
+    is_cacheable,
+    make_cache_key,
+)
+
+
+def test_cache_key_ignores_apikey_and_order():
+    key_a = make_cache_key({"function": "GLOBAL_QUOTE", "symbol": "IBM", "apikey": "a"})
+    key_b = make_cache_key({"symbol": "IBM", "apikey": "b", "function": "GLOBAL_QUOTE"})
+    assert key_a == key_b
+
+
+def test_cache_hit_and_expiry():
+    cache = ResponseCache(max_entries=4, ttl_seconds=10)
+    with patch("alphavantage_mcp_server.response_cache.time.monotonic", return_value=0):
+        cache.set("k", {"v": 1})
+        assert cache.get("k") == {"v": 1}
+
+    with patch(
+        "alphavantage_mcp_server.response_cache.time.monotonic", return_value=11
+    ):
+        assert cache.get("k") is None
+
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_cache_evicts_by_size():
+    cache = ResponseCache(max_entries=10, max_bytes=100, ttl_seconds=60)
+    cache.set("a", 1, size_bytes=40)
+    cache.set("b", 2, size_bytes=40)
+    cache.get("a")
+    cache.set("c", 3, size_bytes=40)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.size_bytes == 80
+
+    # Replacing an entry releases its old size
+    cache.set("a", 1, size_bytes=10)
+    assert cache.size_bytes == 50
+
+    # A body that could never fit is not stored and evicts nothing
+    cache.set("huge", 4, size_bytes=101)
+    assert cache.get("huge") is None
+    assert len(cache) == 2
+
+
+def test_throttle_notes_are_not_cacheable():
+    assert is_cacheable({"Global Quote": {}})
+    assert is_cacheable("timestamp,open\n")
+    assert not is_cacheable({"Note": "Thank you for using Alpha Vantage!"})
+    assert not is_cacheable({"Error Message": "Invalid API call."})
+
+
+def test_ttl_depends_on_the_function():
+    cache = ResponseCache(ttl_seconds=60, realtime_ttl_seconds=0)
+
+    assert cache.ttl_for({"function": "GLOBAL_QUOTE", "symbol": "IBM"}) == 0
+    assert cache.ttl_for({"function": "TIME_SERIES_DAILY"}) == 60
+    assert (
+        cache.ttl_for({"function": "TIME_SERIES_DAILY", "outputsize": "full"}) == 3600
+    )
+    assert cache.ttl_for({"function": "TIME_SERIES_INTRADAY", "month": "2024-02"}) == (
+        3600
+    )
+    assert cache.ttl_for({"function": "SPLITS", "symbol": "IBM"}) == 3600
+
+    current_month = datetime.now(timezone.utc).strftime("%Y-%m")
+    assert (
+        cache.ttl_for({"function": "TIME_SERIES_INTRADAY", "month": current_month})
+        == 60
+    )
+
+    # A zero TTL stores nothing
+    cache.set("quote", {"Global Quote": {}}, 0)
+    assert len(cache) == 0
+
+
+async def test_local_derivations_leave_cached_responses_untouched(
+    mock_upstream, monkeypatch
+):
+    monkeypatch.setattr(api, "RESPONSE_CACHE", ResponseCache(ttl_seconds=60))
+    await api.fetch_time_series_daily("IBM", outputsize="full")
+    await api.fetch_time_series_daily("AAPL", outputsize="full")
+    await api.fetch_company_splits("IBM")
+    await api.company_dividends("IBM")
+    await api.fetch_intraday("IBM", "1min", outputsize="full", month="2024-02")
+    entries = copy.deepcopy(dict(api.RESPONSE_CACHE._entries))
+
+    await api.fetch_time_series_weekly("IBM")
+    await api.fetch_time_series_monthly("IBM")
+    await api.fetch_time_series_daily_adjusted("IBM", adjusted_ohlc=True)
+    await api.fetch_intraday("IBM", "15min", outputsize="full", month="2024-02")
+    await api.fetch_intraday_history("IBM", "2024-02-01", "2024-02-29", "30min")
+    await api.fetch_analytics_fixed_window(
+        ["IBM", "AAPL"], "DAILY", "full", calculations=["MEAN", "MAX_DRAWDOWN"]
+    )
+    await api.fetch_analytics_sliding_window(
+        ["IBM", "AAPL"],
+        "full",
+        interval="DAILY",
+        window_size=20,
+        calculations=["CORRELATION"],
+    )
+    await api.fetch_correlation_matrix(["IBM", "AAPL"], series_range="full")
+    await api.close_http_client()
+
+    assert mock_upstream.requests == {
+        "TIME_SERIES_DAILY": 2,
+        "SPLITS": 1,
+        "DIVIDENDS": 1,
+        "TIME_SERIES_INTRADAY": 1,
+    }
+    assert dict(api.RESPONSE_CACHE._entries) == entries
@@ -49,6 +49,35 @@ class TestTelemetryInstrumentation:
         assert _get_size_bytes(None) == 0
         assert _get_size_bytes(123) > 0
 
+    def test_size_estimate_tracks_serialized_size(self):
+        """Structural estimates stay close to the JSON size of large payloads."""
+        import json
+
+        from src.alphavantage_mcp_server.telemetry_instrument import _get_size_bytes
+
+        series = {
+            f"2024-01-{i:05d}": {"1. open": "187.1500", "5. volume": "44565711"}
+            for i in range(5000)
+        }
+        payload = {"Meta Data": {"2. Symbol": "IBM"}, "Time Series (Daily)": series}
+
+        estimate = _get_size_bytes(payload)
+        actual = len(json.dumps(payload))
+        assert 0.5 * actual < estimate < 2 * actual
+
+    def test_response_size_reuses_recorded_body_length(self):
+        """A size recorded by the API layer is reused for the same result object."""
+        from src.alphavantage_mcp_server.telemetry_instrument import (
+            _get_response_size,
+            record_response_size,
+        )
+
+        result = {"Global Quote": {"01. symbol": "IBM"}}
+        record_response_size(result, 12345)
+
+        assert _get_response_size(result) == 12345
+        assert _get_response_size(dict(result)) != 12345
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
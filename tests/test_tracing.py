@@ -0,0 +1,105 @@
+"""
+Tests for OpenTelemetry spans around tool calls and upstream requests.
+"""
+
+import pytest
+from starlette.requests import Request
+
+pytest.importorskip("opentelemetry.sdk")
+
+from mcp.server.lowlevel.server import request_ctx
+from mcp.shared.context import RequestContext
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+from opentelemetry.trace import SpanKind
+
+from alphavantage_mcp_server import api, tracing
+from alphavantage_mcp_server.rate_limit import RateLimiter
+from alphavantage_mcp_server.server import handle_call_tool
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemorySpanExporter()
+    assert tracing.init_tracing(exporter)
+    yield exporter
+    tracing.shutdown_tracing()
+
+
+def http_request(headers):
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/mcp",
+        "headers": [(k.encode(), v.encode()) for k, v in headers.items()],
+    }
+    return Request(scope)
+
+
+async def test_upstream_request_spans(exporter, upstream, monkeypatch):
+    monkeypatch.setattr(api, "RATE_LIMITER", RateLimiter(requests_per_minute=6000))
+    params = {"function": "GLOBAL_QUOTE", "symbol": "IBM", "apikey": "demo"}
+    try:
+        await api._make_api_request(params, "json")
+        await api._make_api_request(params, "json")
+    finally:
+        await api.close_http_client()
+
+    spans = exporter.get_finished_spans()
+    names = [span.name for span in spans]
+    assert names == [
+        "alphavantage.cache_lookup",
+        "alphavantage.rate_limit",
+        "GET GLOBAL_QUOTE",
+        "alphavantage.cache_lookup",
+    ]
+    assert [span.attributes["alphavantage.cache_hit"] for span in spans[::3]] == [
+        False,
+        True,
+    ]
+    request_span = spans[2]
+    assert request_span.kind == SpanKind.CLIENT
+    assert request_span.attributes["http.response.status_code"] == 200
+    assert "demo" not in request_span.attributes["url.full"]
+
+
+async def test_tool_call_continues_incoming_trace(exporter, upstream):
+    headers = {"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"}
+    context = RequestContext(
+        request_id=1,
+        meta=None,
+        session=None,
+        lifespan_context=None,
+        request=http_request(headers),
+    )
+    token = request_ctx.set(context)
+    try:
+        await handle_call_tool("stock_quote", {"symbol": "IBM"})
+    finally:
+        request_ctx.reset(token)
+        await api.close_http_client()
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    tool_span = spans["tools/call stock_quote"]
+    assert tool_span.kind == SpanKind.SERVER
+    assert format(tool_span.context.trace_id, "032x") == TRACE_ID
+    assert format(tool_span.parent.span_id, "016x") == PARENT_ID
+    assert spans["GET GLOBAL_QUOTE"].parent.span_id == tool_span.context.span_id
+
+
+async def test_failed_tool_call_is_recorded(exporter):
+    with pytest.raises(ValueError):
+        await handle_call_tool("stock_quote", {})
+
+    (span,) = exporter.get_finished_spans()
+    assert not span.status.is_ok
+    assert span.events[0].name == "exception"
+
+
+def test_spans_are_noops_when_disabled():
+    with tracing.start_span("unused") as span:
+        assert span is None
@@ -0,0 +1,83 @@
+"""
+Offline tests for the upstream request path: rate limiting, caching and
+per-phase latency metrics.
+"""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+from alphavantage_mcp_server import api, telemetry_bootstrap, telemetry_instrument
+from alphavantage_mcp_server.rate_limit import RateLimiter
+from alphavantage_mcp_server.telemetry_instrument import _current_tool
+
+
+async def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(requests_per_minute=600, burst=1)
+
+    start = time.perf_counter()
+    waits = [await limiter.acquire() for _ in range(3)]
+    elapsed = time.perf_counter() - start
+
+    assert waits[0] < 0.01
+    assert elapsed >= 0.18
+
+
+async def test_disabled_rate_limiter_never_waits():
+    limiter = RateLimiter()
+    waits = await asyncio.gather(*(limiter.acquire() for _ in range(100)))
+    assert max(waits) == 0.0
+
+
+async def test_repeated_request_is_served_from_cache(upstream):
+    params = {"function": "GLOBAL_QUOTE", "symbol": "IBM", "apikey": "demo"}
+
+    first = await api._make_api_request(params, "json")
+    second = await api._make_api_request(params, "json")
+
+    assert first == second == {"Global Quote": {"01. symbol": "IBM"}}
+    assert upstream.requests == 1
+    await api.close_http_client()
+
+
+async def test_upstream_phases_are_recorded(upstream, monkeypatch):
+    histogram = MagicMock()
+    monkeypatch.setattr(telemetry_bootstrap, "MCP_PHASE_LAT", histogram)
+    monkeypatch.setattr(telemetry_instrument, "_phase_children", {})
+    token = _current_tool.set("stock_quote")
+    try:
+        await api._make_api_request({"function": "GLOBAL_QUOTE"}, "json")
+    finally:
+        _current_tool.reset(token)
+        await api.close_http_client()
+
+    phases = {call.kwargs["phase"] for call in histogram.labels.call_args_list}
+    assert {"queue", "connect", "ttfb", "download", "decode"} <= phases
+    assert all(
+        call.kwargs["tool"] == "stock_quote" for call in histogram.labels.call_args_list
+    )
+
+
+async def test_queue_phase_includes_the_rate_limiter_wait(upstream, monkeypatch):
+    queued = []
+    monkeypatch.setattr(
+        api,
+        "observe_phase",
+        lambda phase, seconds: queued.append(seconds) if phase == "queue" else None,
+    )
+    try:
+        # Warm up the HTTP client and its connection
+        await api._make_api_request({"function": "GLOBAL_QUOTE", "symbol": "W"}, "json")
+        monkeypatch.setattr(
+            api, "RATE_LIMITER", RateLimiter(requests_per_minute=600, burst=1)
+        )
+        for symbol in ("A", "B"):
+            await api._make_api_request(
+                {"function": "GLOBAL_QUOTE", "symbol": symbol}, "json"
+            )
+    finally:
+        await api.close_http_client()
+
+    # 600 per minute with a burst of 1: the second request waits 100 ms
+    assert queued[1] < 0.05
+    assert queued[2] >= 0.09